@@ -1,32 +1,55 @@
-import pandas as pd
 import time
 import re
 import asyncio
-import aiohttp
-import random
-import nltk
-from collections import deque
-from nltk.corpus import stopwords
+import os
+import sys
+import glob
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from urllib.parse import urlparse
 from datetime import datetime, timedelta
 
-# fastText-based language detection
-try:
-    from fast_langdetect import detect as ft_detect
-    FASTTEXT_AVAILABLE = True
-    print("✅ fastText language detection loaded")
-except ImportError:
-    ft_detect = None
-    FASTTEXT_AVAILABLE = False
-    print("⚠️  fast-langdetect not installed. Using keyword-only detection.")
-    print("   Install with: pip install fast-langdetect")
+# Shared helpers live in the repo-level `redditscrape` package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from redditscrape.lazy import lazy_import, is_installed
+from redditscrape.stopwords import english_stopwords
+from redditscrape.writer import StreamingCSVWriter
+from redditscrape.dedup import CommentIdIndex, snapshot_index
+from redditscrape.parquet import StreamingParquetWriter, output_row, iter_batches
+from redditscrape.ratelimit import AdaptiveRateLimiter
+from redditscrape.httpcache import ResponseCache
+from redditscrape.httpclient import AsyncClient, RetryPolicy
+from redditscrape.archive import ThreadArchive, comment_record
+from redditscrape.metrics import metrics, MetricsExporter, Histogram, PHASE_BUCKETS, CLASSIFY_BUCKETS
+from redditscrape.crawlstate import CrawlState, VALIDATED, MISSING, FETCHED, FAILED, post_id_from_url
+from redditscrape.shards import ShardLeases, shard_of, shard_name
+from redditscrape.scheduler import YieldScheduler, subreddit_of
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Heavy dependencies load on first use, so importing this module (tests, the
+# CLI, RefilterArchive.py, worker processes) stays cheap
+pd = lazy_import("pandas")
 
-english_stops = set(stopwords.words('english'))
+# fastText-based language detection (imported, and its model loaded, on the first call)
+FASTTEXT_AVAILABLE = is_installed("fast_langdetect")
+_ft_detect = None
+
+def ft_detect(text, **kwargs):
+    global _ft_detect
+    if _ft_detect is None:
+        from fast_langdetect import detect as _ft_detect
+    return _ft_detect(text, **kwargs)
+
+def ft_top(text):
+    """Top (lang, score) of ft_detect(text, model='lite'), or None if detection failed."""
+    try:
+        results = ft_detect(text, model='lite')
+    except Exception:
+        return None
+    return (results[0].get('lang', ''), results[0].get('score', 0)) if results else None
+
+english_stops = english_stopwords()
 
 # ROMAN URDU MARKERS
 urdu_markers = {
@@ -89,7 +112,48 @@ URDU_BIGRAMS = {
 # FILE CONFIGURATION
 INPUT_FILE = r"C:\Users\DeLL\Desktop\Reddit Scraping\ScrapeLinks\links1.csv"
 OUTPUT_FILE = "commentsScrape1.csv"
-PROGRESS_FILE = "scrape_progress1.txt"
+STATE_DB = "crawl_state1.sqlite"  # Per-post status (pending/validated/missing/fetched/failed)
+# Persistent hash index of every comment ever stored; point both scrapers at
+# the same file to share it (one process at a time)
+DEDUP_INDEX = "comment_hashes.idx"
+# Persistent set of every comment ID already processed (kept or rejected).
+# Known comments are skipped before their text is touched and left out of
+# /api/morechildren requests, on reruns, overlapping link files and threads
+# fetched again. Off by default: rejected comments are never classified
+# again, so delete the file (and its .log) after changing the filter. Don't
+# share it with the Slow scraper, whose filter differs. e.g. "comment_ids.idx"
+SEEN_IDS_INDEX = None
+
+# Output backend: "csv" (one text column, OUTPUT_FILE) or "parquet" (needs
+# pyarrow): PARQUET_DIR/subreddit=<name>/*.parquet with comment_id, post_id,
+# subreddit, score, created_utc and classifier_score next to the text. Read it
+# back with redditscrape.parquet.read_comments(columns=..., subreddits=...).
+OUTPUT_FORMAT = "csv"
+PARQUET_DIR = "commentsScrape1_parquet"
+
+# MEMORY BOUNDS
+# Nothing held in RAM grows with the number of links or comments:
+# - links are read and registered LINKS_CHUNK_ROWS at a time;
+# - pending posts are paged out of the crawl state per subreddit;
+# - each thread's comments go from the response through the classifier to
+#   the writer, which appends them to disk at every checkpoint;
+# - the dedup and comment-ID indexes keep at most INDEX_MEMORY_ENTRIES new
+#   entries in RAM (~70 bytes each) before merging them into their on-disk tables.
+# benchmarks/bench_memory.py checks this with tracemalloc.
+LINKS_CHUNK_ROWS = 50_000
+INDEX_MEMORY_ENTRIES = 200_000
+
+# Revisits: fetched posts older than this many seconds are checked again.
+# Phase 1 compares /api/info's num_comments with the count stored at the last
+# fetch and skips threads that did not grow; changed threads are refetched
+# newest-first, and comments already seen are neither classified nor
+# requested through /api/morechildren again. None = never revisit.
+REVISIT_AFTER = None  # e.g. 7 * 24 * 3600
+
+# Raw archive of every fetched comment (before filtering), so detection can
+# be improved and re-run offline with RefilterArchive.py. None = disabled.
+ARCHIVE_DIR = None  # e.g. "raw_archive"
+ARCHIVE_CHUNK_BYTES = 64 * 1024 ** 2
 
 # SCRAPING CONFIGURATION
 '''HYBRID BATCH APPROACH + MORE CHILDREN:
@@ -98,15 +162,92 @@ PROGRESS_FILE = "scrape_progress1.txt"
     Phase 3: Fetch hidden "more children" comments via /api/morechildren
     Result: Skip deleted/404 posts AND get ALL comments!'''
 
+API_BASE_URL = "https://api.reddit.com"  # /api/info and /api/morechildren
 BATCH_CHECK_SIZE = 100
-REQUESTS_PER_MINUTE = 10
+REQUESTS_PER_MINUTE = 10  # Starting budget; X-Ratelimit-* headers take over once seen
 CONCURRENT_REQUESTS = 2
-MAX_RETRIES = 5  # Increased from 3
+MAX_RETRIES = 5  # Attempts per request (timeouts, 5xx, 429s); backoff 1, 2, 4, 8 s with jitter
+
+# RESPONSE CACHE (optional)
+# Thread and /api/morechildren responses are kept compressed on disk and
+# checked before the rate limiter, so reruns (e.g. after tuning the filter)
+# replay hits for free. /api/info always goes to Reddit, since its comment
+# counts decide which threads REVISIT_AFTER fetches again. None disables it.
+RESPONSE_CACHE_FILE = None  # e.g. "response_cache.sqlite"
+RESPONSE_CACHE_TTL = 7 * 24 * 3600        # seconds
+RESPONSE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # LRU eviction above this
+
+# METRICS
+# Requests by endpoint/status, rate-limiter waits, phase latencies and
+# classification outcomes. ".json" -> JSON, otherwise OpenMetrics text.
+METRICS_FILE = "scrape_metrics.prom"  # None disables the file
+METRICS_FLUSH_SECONDS = 15
+METRICS_PORT = None  # e.g. 9108 -> http://127.0.0.1:9108/metrics
+
+# SHARDED CRAWL
+# "single": one process, STATE_DB + OUTPUT_FILE as usual.
+# "sharded": posts are split into NUM_SHARDS shards by post-ID hash and
+# SHARD_WORKERS processes claim shards through lease files in SHARD_DIR.
+# Run the same script on other hosts pointing at the same (shared) SHARD_DIR
+# to add machines. Each shard keeps its own crawl state and writes its own
+# output segment; once every shard is done the segments are merged into
+# OUTPUT_FILE. A worker that dies stops renewing its lease, and its shard is
+# picked up by another worker after LEASE_SECONDS.
+CRAWL_MODE = "single"
+NUM_SHARDS = 64
+SHARD_DIR = "shards"
+SHARD_WORKERS = 4          # Worker processes started on this host
+SHARD_RATE_SHARE = None    # Fraction of the client's rate budget per worker (None = 1/SHARD_WORKERS)
+LEASE_SECONDS = 120        # Lease lifetime; renewed every LEASE_SECONDS/4
+
+# SCHEDULING
+# "yield": learn kept comments per request for every subreddit (persisted in
+# the crawl state) and give high-yield subreddits most of the requests, while
+# every subreddit keeps at least YIELD_FLOOR x an average share so all links
+# are still processed. "file": links-file order.
+SCHEDULE = "yield"
+YIELD_PRIOR_REQUESTS = 20  # How many requests of evidence the average yield counts as
+YIELD_SHARPNESS = 2.0      # Share ~ (yield / mean) ** sharpness
+YIELD_FLOOR = 0.05
+
+# PIPELINE
+VALIDATE_AHEAD = 200      # Validated posts queued ahead of the fetch workers
+CHECKPOINT_POSTS = 1      # Finished posts per checkpoint. 1: each post's rows and its "done" are
+                          # made durable together before the next post is recorded, so a crash
+                          # never re-fetches a finished post. Higher values save fsyncs on very
+                          # fast crawls, at the cost of re-fetching up to that many after a crash
+CHECKPOINT_ROWS = 500     # ...or as soon as this many new rows are buffered
+CHECKPOINT_SECONDS = 30   # ...and at least this often (also saves the learned subreddit yields)
+
+# CLASSIFICATION STAGE
+# Comment bodies are classified off the event loop so network I/O keeps flowing
+# while big threads are filtered. "process" uses all cores, "thread" only helps
+# where fastText releases the GIL, "inline" keeps the old on-loop behaviour.
+CLASSIFY_EXECUTOR = "process"
+CLASSIFY_WORKERS = os.cpu_count() or 2
+CLASSIFY_CHUNK_SIZE = 250   # Bodies per job handed to a worker
+CLASSIFY_MAX_PENDING = 32   # Bounded queue: jobs in flight before fetchers wait
+FASTTEXT_CACHE_SIZE = 100_000  # fastText verdicts remembered per worker, keyed by text hash (0 = off)
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) RomanUrduHunter/3.0 by ScrapeUmer'
 }
 
+# WORKER PROCESS SETTINGS
+# Spawned processes (Windows, macOS) import this module afresh, so settings
+# changed after import (--set, --no-fasttext) are handed to them explicitly.
+_SETTING_TYPES = (bool, int, float, str, tuple, list, dict, set, frozenset, type(None))
+
+def current_settings():
+    """This module's configuration constants (UPPER_CASE names with plain values)."""
+    return {name: value for name, value in globals().items()
+            if name.isupper() and isinstance(value, _SETTING_TYPES)}
+
+def apply_settings(settings):
+    """Process initializer: take over the parent's current_settings()."""
+    globals().update(settings)
+    configure()
+
 # TIMING UTILITIES
 def format_duration(seconds):
     """Format seconds into human-readable string."""
@@ -131,6 +272,174 @@ def estimate_eta(elapsed, done, total):
 
 
 # ROMAN URDU DETECTION (Enhanced with fastText + Bigrams)
+class RomanUrduScorer:
+    """
+    Compiled keyword scorer for Roman Urdu.
+    
+    Every token maps to one packed weight (Urdu hits in the low bits, English
+    stop-word hits in the high bits), so a single C-level pass over the words
+    yields both counts. Bigrams are found with one precompiled lookahead
+    regex instead of a substring scan per bigram. Decisions are identical to
+    the original keyword scoring: ratio >= min_ratio and urdu score >= min_score,
+    with each distinct bigram found in the text worth `bigram_weight` hits.
+    """
+    ENG_SHIFT = 32
+    URDU_MASK = (1 << ENG_SHIFT) - 1
+    
+    def __init__(self, markers, stops, bigrams, min_ratio=0.4, min_score=2, bigram_weight=2):
+        table = {}
+        for word in markers:
+            table[word] = table.get(word, 0) + 1
+        for word in stops:
+            table[word] = table.get(word, 0) + (1 << self.ENG_SHIFT)
+        self._weight = table.get
+        
+        # Longest first, so the lookahead prefers the longest bigram at a position.
+        # Bigrams that are a prefix of another can be shadowed that way, so those
+        # few are checked with a plain substring test.
+        ordered = sorted(bigrams, key=len, reverse=True)
+        self._bigram_re = re.compile('(?=(' + '|'.join(map(re.escape, ordered)) + '))') if ordered else None
+        self._shadowed = [b for b in ordered if any(o != b and o.startswith(b) for o in ordered)]
+        
+        self.min_ratio = min_ratio
+        self.min_score = min_score
+        self.bigram_weight = bigram_weight
+    
+    def count_bigrams(self, text_lower):
+        """Number of distinct bigrams occurring anywhere in the lowercased text."""
+        if self._bigram_re is None:
+            return 0
+        found = set(self._bigram_re.findall(text_lower))
+        for bigram in self._shadowed:
+            if bigram not in found and bigram in text_lower:
+                found.add(bigram)
+        return len(found)
+    
+    def score_tokens(self, text_lower, words):
+        """Return (urdu_score, eng_score) for already lowercased/split text."""
+        packed = sum(map(self._weight, words, repeat(0)))
+        urdu_score = packed & self.URDU_MASK
+        eng_score = packed >> self.ENG_SHIFT
+        return urdu_score + self.count_bigrams(text_lower) * self.bigram_weight, eng_score
+    
+    def score(self, text):
+        text_lower = text.lower()
+        return self.score_tokens(text_lower, text_lower.split())
+    
+    def passes(self, urdu_score, eng_score):
+        total_meaningful = urdu_score + eng_score
+        if total_meaningful == 0:
+            return False
+        return urdu_score / total_meaningful >= self.min_ratio and urdu_score >= self.min_score
+    
+    def matches_tokens(self, text_lower, words):
+        # Bigrams can only raise the Urdu score, so skip the regex when the
+        # unigrams alone already pass.
+        packed = sum(map(self._weight, words, repeat(0)))
+        urdu_score = packed & self.URDU_MASK
+        eng_score = packed >> self.ENG_SHIFT
+        if self.passes(urdu_score, eng_score):
+            return True
+        bigram_hits = self.count_bigrams(text_lower)
+        if not bigram_hits:
+            return False
+        return self.passes(urdu_score + bigram_hits * self.bigram_weight, eng_score)
+    
+    def matches(self, text):
+        text_lower = text.lower()
+        return self.matches_tokens(text_lower, text_lower.split())
+    
+    def score_batch(self, texts):
+        """Score a list of comments at once -> list of (urdu_score, eng_score)."""
+        return [self.score(t) for t in texts]
+    
+    def match_batch(self, texts):
+        """Keyword decision for a list of comments at once -> list of bools."""
+        matches_tokens = self.matches_tokens
+        out = []
+        for text in texts:
+            text_lower = text.lower()
+            out.append(matches_tokens(text_lower, text_lower.split()))
+        return out
+
+ROMAN_URDU_SCORER = RomanUrduScorer(urdu_markers, english_stops, URDU_BIGRAMS)
+
+def configure():
+    """Rebuild what is derived from the settings (the keyword scorer) after they changed."""
+    global ROMAN_URDU_SCORER
+    ROMAN_URDU_SCORER = RomanUrduScorer(urdu_markers, english_stops, URDU_BIGRAMS)
+
+NON_URDU_LANGS = {'fr', 'es', 'de', 'it', 'pt', 'nl', 'pl', 'ro', 'sv',
+                  'da', 'no', 'fi', 'cs', 'hr', 'id', 'ms', 'tr', 'vi'}
+
+# fastText verdicts by text hash (per process; oldest dropped past FASTTEXT_CACHE_SIZE)
+_ft_verdicts = {}
+
+def fasttext_rejects_many(texts, stats=None):
+    """
+    fasttext_rejects for a list of texts -> list of bools: cached per-text
+    detection, not a batched model call (fast-langdetect has no public one).
+    Verdicts seen before are reused from the cache; the rest are predicted
+    one text at a time. If `stats` is a dict, its 'fasttext_model'
+    (predictions made) and 'fasttext_cached' counts are increased.
+    """
+    verdicts = [False] * len(texts)
+    todo, keys = [], []
+    for i, text in enumerate(texts):
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+        verdict = _ft_verdicts.get(key)
+        if verdict is None:
+            todo.append(i)
+            keys.append(key)
+        else:
+            verdicts[i] = verdict
+    for i, key in zip(todo, keys):
+        top = ft_top(texts[i])
+        if top is None:
+            continue   # detection failed: keep the comment, as before, and ask again next time
+        lang, score = top
+        # If high confidence in a non-English, non-Urdu language → reject
+        verdicts[i] = lang in NON_URDU_LANGS and score > 0.5
+        if not FASTTEXT_CACHE_SIZE:
+            continue
+        if len(_ft_verdicts) >= FASTTEXT_CACHE_SIZE:
+            del _ft_verdicts[next(iter(_ft_verdicts))]
+        _ft_verdicts[key] = verdicts[i]
+    if stats is not None:
+        stats['fasttext_model'] = stats.get('fasttext_model', 0) + len(todo)
+        stats['fasttext_cached'] = stats.get('fasttext_cached', 0) + len(texts) - len(todo)
+    return verdicts
+
+def fasttext_rejects(text):
+    """True if fastText is confident the text is another Latin-script language."""
+    return fasttext_rejects_many([text])[0]
+
+def roman_urdu_reject_reason(text):
+    """
+    Why is_roman_urdu would reject `text`: 'too_short', 'low_ratio' or
+    'fasttext'; None if it is accepted. Cheapest check first: fastText can
+    only reject, so it only runs on text the keywords accept.
+    """
+    text_lower = text.lower()
+    words = text_lower.split()
+    if len(words) < 3:
+        return 'too_short'
+    
+    # Methods 2 + 3: bigrams + keyword ratio
+    if not ROMAN_URDU_SCORER.matches_tokens(text_lower, words):
+        return 'low_ratio'
+    
+    # Method 1: fastText negative filter
+    if FASTTEXT_AVAILABLE and fasttext_rejects(text):
+        return 'fasttext'
+    return None
+
+def roman_urdu_score(text):
+    """Share of Urdu hits among all keyword hits (bigrams included), 0..1: the classifier_score column."""
+    urdu_score, eng_score = ROMAN_URDU_SCORER.score(text)
+    total = urdu_score + eng_score
+    return urdu_score / total if total else 0.0
+
 def is_roman_urdu(text):
     """
     Enhanced Roman Urdu detection using:
@@ -140,82 +449,248 @@ def is_roman_urdu(text):
     
     Note: fastText sees Roman Urdu as "English" (Latin script), so we can't use it
     for positive detection. Instead we use it to filter out French, Spanish, etc.
+    Steps 2 and 3 run in one pass through ROMAN_URDU_SCORER.
     """
-    words = text.lower().split()
-    if len(words) < 3:
-        return False
-    
-    # Method 1: fastText negative filter
-    # Reject text that is clearly another Latin-script language (not en/ur)
+    return roman_urdu_reject_reason(text) is None
+
+def is_roman_urdu_batch(texts):
+    """is_roman_urdu for a list of texts -> list of bools, same decisions (fastText cache shared)."""
+    matches_tokens = ROMAN_URDU_SCORER.matches_tokens
+    out = []
+    for text in texts:
+        text_lower = text.lower()
+        words = text_lower.split()
+        out.append(len(words) >= 3 and matches_tokens(text_lower, words))
     if FASTTEXT_AVAILABLE:
-        try:
-            results = ft_detect(text, model='lite')
-            if results:
-                lang = results[0].get('lang', '')
-                score = results[0].get('score', 0)
-                # If high confidence in a non-English, non-Urdu language → reject
-                non_urdu_langs = {'fr', 'es', 'de', 'it', 'pt', 'nl', 'pl', 'ro', 'sv',
-                                  'da', 'no', 'fi', 'cs', 'hr', 'id', 'ms', 'tr', 'vi'}
-                if lang in non_urdu_langs and score > 0.5:
-                    return False
-        except:
-            pass
-    
-    # Method 2: Bigram matching
-    text_lower = text.lower()
-    bigram_hits = sum(1 for bg in URDU_BIGRAMS if bg in text_lower)
-    
-    # Method 3: Extended keyword scoring
-    urdu_score = sum(1 for w in words if w in urdu_markers)
-    eng_score = sum(1 for w in words if w in english_stops)
-    
-    # Add bigram weight (each bigram counts as 2 keyword hits)
-    urdu_score += bigram_hits * 2
-    
-    # Ratio-based detection
-    total_meaningful = urdu_score + eng_score
-    if total_meaningful == 0:
-        return False
-    
-    urdu_ratio = urdu_score / total_meaningful
-    return urdu_ratio >= 0.4 and urdu_score >= 2
+        passed = [i for i, ok in enumerate(out) if ok]
+        for i, rejects in zip(passed, fasttext_rejects_many([texts[i] for i in passed])):
+            out[i] = not rejects
+    return out
+
+URDU_SCRIPT_RE = re.compile(r'[\u0600-\u06FF]')
 
 def contains_urdu_script(text):
-    return bool(re.search(r'[\u0600-\u06FF]', text))
+    return URDU_SCRIPT_RE.search(text) is not None
 
 # ============================================================
 # COMMENT EXTRACTION (with "more children" tracking)
 # ============================================================
-def get_comments_from_json(data, comments_list, more_ids=None):
+# Cascade order: cheap checks first, fastText last and only on what is left.
+# A rejected comment is counted under the first tier that rejects it.
+CLASSIFY_TIERS = ('empty', 'nastaliq', 'too_short', 'low_ratio', 'fasttext')
+
+def classify_cheap(body):
+    """
+    Every tier of classify_comment except fastText -> (cleaned text, None)
+    if the comment survives the script, length and keyword checks, else
+    (None, reason).
+    """
+    if not body:
+        return None, 'empty'
+    if contains_urdu_script(body):
+        return None, 'nastaliq'
+    text_lower = body.lower()
+    words = text_lower.split()
+    if len(words) < 3:
+        return None, 'too_short'
+    clean_text = body.replace("\n", " ").replace("\r", " ").strip()
+    if len(clean_text) <= 10:
+        return None, 'too_short'
+    if not ROMAN_URDU_SCORER.matches_tokens(text_lower, words):
+        return None, 'low_ratio'
+    return clean_text, None
+
+def classify_comment(body):
+    """
+    -> (cleaned text, None) if the comment is kept as Roman Urdu, else
+    (None, reason) with reason the first of CLASSIFY_TIERS that rejects it.
+    fastText can only reject, so it runs only on comments every cheaper
+    tier accepts; the kept set is the same as checking it first.
     """
-    Recursively extract comments from Reddit JSON response.
-    Also collects 'more' comment IDs that need separate fetching.
+    clean_text, reason = classify_cheap(body)
+    if reason is None and FASTTEXT_AVAILABLE and fasttext_rejects(body):
+        return None, 'fasttext'
+    return clean_text, reason
+
+def clean_comment(body):
+    """Return the cleaned comment text if it is kept as Roman Urdu, else None."""
+    return classify_comment(body)[0]
+
+def filter_comment_bodies(bodies):
+    """Classify raw comment bodies -> kept, cleaned texts (order preserved)."""
+    return classify_bodies(bodies)[0]
+
+def filter_comment_records(records):
+    """Classify archive records -> output_row() dicts of the kept comments (order preserved)."""
+    kept = classify_bodies([r['body'] for r in records], scored=True)[0]
+    return [output_row(records[i], text, score) for i, text, score in kept]
+
+def classify_bodies(bodies, scored=False):
+    """
+    filter_comment_bodies plus telemetry, for the worker pool:
+    -> (kept texts, {reject reason: count}, Histogram of seconds per comment,
+    {fastText counter: count}). The cheap tiers run per comment; the
+    survivors go through fastText after them (one prediction per text not
+    in the cache), and that time is shared out evenly among them in the
+    histogram.
+    With scored=True kept entries are (position in bodies, text, classifier score).
+    """
+    kept = []
+    rejected = {}
+    fasttext = {}
+    timings = Histogram(CLASSIFY_BUCKETS)
+    clock = time.perf_counter
+    candidates = []
+    for i, body in enumerate(bodies):
+        start = clock()
+        clean_text, reason = classify_cheap(body)
+        elapsed = clock() - start
+        if reason is None:
+            candidates.append((i, clean_text, elapsed))
+        else:
+            rejected[reason] = rejected.get(reason, 0) + 1
+            timings.observe(elapsed)
+    
+    verdicts = repeat(False)
+    share = 0.0
+    if candidates and FASTTEXT_AVAILABLE:
+        start = clock()
+        verdicts = fasttext_rejects_many([bodies[i] for i, _, _ in candidates], fasttext)
+        share = (clock() - start) / len(candidates)
+    for (i, clean_text, elapsed), rejects in zip(candidates, verdicts):
+        timings.observe(elapsed + share)
+        if rejects:
+            rejected['fasttext'] = rejected.get('fasttext', 0) + 1
+        else:
+            kept.append((i, clean_text, roman_urdu_score(bodies[i])) if scored else clean_text)
+    return kept, rejected, timings, fasttext
+
+def iter_comment_tree(data, stats=None):
+    """
+    Iteratively walk a Reddit comment response, following only
+    Listing -> children -> t1 replies edges (post/t3 payloads, awards, flair,
+    media etc. are never entered). Accepts a thread response (list of
+    listings), a single Listing, a list of things, or a /api/morechildren
+    response. Lazily yields, in the same pre-order as a recursive walk:
+        ('t1', comment_data_dict)
+        ('more', [hidden comment ids])
+    If `stats` is a dict, stats['nodes'] is increased by the nodes visited.
+    """
+    stack = [data]
+    nodes = 0
+    try:
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+                continue
+            if not isinstance(node, dict):
+                continue
+            
+            kind = node.get('kind')
+            payload = node.get('data') or {}
+            if kind == 't1':
+                yield 't1', payload
+                replies = payload.get('replies')
+                if replies:
+                    stack.append(replies)
+            elif kind == 'more':
+                children = payload.get('children')
+                if children:
+                    yield 'more', children
+            elif kind == 'Listing':
+                children = payload.get('children')
+                if children:
+                    stack.extend(reversed(children))
+            elif 'json' in node:
+                # /api/morechildren: {"json": {"data": {"things": [...]}}}
+                things = node['json'].get('data', {}).get('things')
+                if things:
+                    stack.extend(reversed(things))
+    finally:
+        if stats is not None:
+            stats['nodes'] = stats.get('nodes', 0) + nodes
+
+def extract_comment_bodies(data, bodies, more_ids=None, records=None, seen_ids=None):
+    """
+    Collect raw t1 comment bodies from a Reddit JSON response, without
+    classifying them. Also collects 'more' comment IDs that need separate
+    fetching, and, if `records` is a list, one archive record per comment.
+    If `seen_ids` is a set, comments (and hidden IDs) already in it are
+    skipped and the IDs of new comments are added to it.
     """
     if more_ids is None:
         more_ids = []
     
-    if isinstance(data, dict):
-        if data.get('kind') == 't1':
-            body = data.get('data', {}).get('body', '')
-            if body and not contains_urdu_script(body) and is_roman_urdu(body):
-                clean_text = body.replace("\n", " ").replace("\r", " ").strip()
-                if len(clean_text) > 10:
-                    comments_list.append(clean_text)
-        elif data.get('kind') == 'more':
+    for kind, payload in iter_comment_tree(data):
+        if kind == 't1':
+            if seen_ids is not None:
+                cid = payload.get('id')
+                if cid in seen_ids:
+                    continue
+                seen_ids.add(cid)
+            body = payload.get('body', '')
+            if body:
+                bodies.append(body)
+                if records is not None:
+                    records.append(comment_record(payload))
+        elif seen_ids is not None:
+            more_ids.extend(cid for cid in payload if cid not in seen_ids)
+        else:
             # Collect hidden comment IDs for Phase 3!
-            children = data.get('data', {}).get('children', [])
-            if children:
-                more_ids.extend(children)
-        
-        for key, value in data.items():
-            get_comments_from_json(value, comments_list, more_ids)
-    
-    elif isinstance(data, list):
-        for item in data:
-            get_comments_from_json(item, comments_list, more_ids)
+            more_ids.extend(payload)
     
     return more_ids
 
+def get_comments_from_json(data, comments_list, more_ids=None, seen_ids=None):
+    """
+    Extract Roman Urdu comments from Reddit JSON response (inline classification).
+    Also collects 'more' comment IDs that need separate fetching. Comments
+    whose ID is in `seen_ids` (a set or SeenComments) are skipped unread.
+    """
+    bodies = []
+    more_ids = extract_comment_bodies(data, bodies, more_ids, seen_ids=seen_ids)
+    comments_list.extend(filter_comment_bodies(bodies))
+    return more_ids
+
+class SeenComments:
+    """
+    Comment IDs to skip while reading one thread: the IDs stored for this
+    thread at earlier visits, plus everything in the persistent
+    CommentIdIndex. New IDs are only collected here; the Checkpointer adds
+    them to the index once the thread's output is durable. len() and
+    iteration cover the thread's own IDs, so a first visit still looks empty.
+    """
+    def __init__(self, thread_ids=None, index=None):
+        self.ids = thread_ids if thread_ids is not None else set()
+        self.index = index
+        self.skipped = 0   # hits in the persistent index
+    
+    def __contains__(self, cid):
+        if cid in self.ids:
+            return True
+        if self.index is not None and cid and cid in self.index:
+            self.skipped += 1
+            return True
+        return False
+    
+    def add(self, cid):
+        self.ids.add(cid)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __iter__(self):
+        return iter(self.ids)
+
+def thread_num_comments(data):
+    """num_comments of the post in a thread response, or None."""
+    try:
+        return data[0]['data']['children'][0]['data'].get('num_comments')
+    except (KeyError, IndexError, TypeError):
+        return None
+
 def extract_post_id(url):
     """Extract post ID from Reddit URL"""
     match = re.search(r'/comments/([a-z0-9]+)', url)
@@ -224,33 +699,78 @@ def extract_post_id(url):
     return None
 
 # ============================================================
-# RATE LIMITER (Token Bucket)
+# CLASSIFICATION STAGE (off the event loop)
 # ============================================================
-class TokenBucketRateLimiter:
-    def __init__(self, requests_per_minute):
-        self.requests_per_minute = requests_per_minute
-        self.request_times = deque()
-        self.lock = asyncio.Lock()
-        
-    async def acquire(self):
-        async with self.lock:
-            now = time.time()
-            while self.request_times and now - self.request_times[0] > 60:
-                self.request_times.popleft()
-            if len(self.request_times) >= self.requests_per_minute:
-                wait_time = 60 - (now - self.request_times[0]) + 1
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
-                    now = time.time()
-                    while self.request_times and now - self.request_times[0] > 60:
-                        self.request_times.popleft()
-            self.request_times.append(now)
+class ClassificationStage:
+    """
+    Runs classify_bodies on a worker pool. Large threads are split into
+    CLASSIFY_CHUNK_SIZE jobs so they spread across cores, and at most
+    `max_pending` jobs are in flight; further callers wait on the semaphore,
+    which keeps memory bounded when fetching outruns classification.
+    Results are exactly what filter_comment_bodies returns, in the same
+    order; reject reasons and per-comment timings go to the metrics registry.
+    Given the bodies' archive records, it returns output_row() dicts instead.
+    Arguments left as None take the CLASSIFY_* settings at construction
+    time, so overrides made after import (--set) apply.
+    """
+    def __init__(self, mode=None, workers=None, chunk_size=None, max_pending=None):
+        mode = mode or CLASSIFY_EXECUTOR
+        workers = workers or CLASSIFY_WORKERS
+        self.mode = mode
+        self.chunk_size = chunk_size or CLASSIFY_CHUNK_SIZE
+        self.slots = asyncio.Semaphore(max_pending or CLASSIFY_MAX_PENDING)
+        if mode == "process":
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=apply_settings,
+                                                initargs=(current_settings(),))
+        elif mode == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            self.executor = None
+    
+    async def _run_chunk(self, chunk, scored):
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, classify_bodies, chunk, scored)
+    
+    @staticmethod
+    def _record(kept, rejected, timings, fasttext):
+        metrics.inc('comments_classified', len(kept), result='kept')
+        for reason, count in rejected.items():
+            metrics.inc('comments_classified', count, result=reason)
+        metrics.merge('classify_seconds_per_comment', timings)
+        if fasttext:
+            metrics.inc('fasttext_texts', fasttext['fasttext_model'], source='model')
+            metrics.inc('fasttext_texts', fasttext['fasttext_cached'], source='cache')
+    
+    async def classify(self, bodies, records=None):
+        if not bodies:
+            return []
+        scored = records is not None
+        if self.executor is None:
+            results = [classify_bodies(bodies, scored)]
+        else:
+            chunks = [bodies[i:i + self.chunk_size] for i in range(0, len(bodies), self.chunk_size)]
+            results = await asyncio.gather(*(self._run_chunk(c, scored) for c in chunks))
+        for result in results:
+            self._record(*result)
+        if not scored:
+            return [text for kept, *_ in results for text in kept]
+        return [output_row(records[n * self.chunk_size + i], text, score)
+                for n, (kept, *_) in enumerate(results) for i, text, score in kept]
+    
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
 
 # ============================================================
 # PHASE 1: BATCH CHECK POSTS
 # ============================================================
-async def batch_check_posts(session, urls, rate_limiter):
-    """Batch check if posts exist using /api/info (1 request per 100 posts)"""
+async def batch_check_posts(client, urls):
+    """
+    Batch check if posts exist using /api/info (1 request per 100 posts).
+    Returns {url: num_comments} for the posts that still exist (None if the
+    count is unknown because the check itself failed).
+    """
     post_ids = []
     url_to_id = {}
     
@@ -261,63 +781,60 @@ async def batch_check_posts(session, urls, rate_limiter):
             url_to_id[post_id] = url
     
     if not post_ids:
-        return []
+        return {}
     
-    valid_urls = []
+    valid_urls = {}
     
     for i in range(0, len(post_ids), BATCH_CHECK_SIZE):
         batch = post_ids[i:i + BATCH_CHECK_SIZE]
         batch_str = ",".join(batch)
         
-        await rate_limiter.acquire()
-        
         try:
-            api_url = f"https://api.reddit.com/api/info.json?id={batch_str}"
-            async with session.get(api_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    for child in data.get('data', {}).get('children', []):
-                        post_id = child.get('data', {}).get('id')
-                        if post_id and post_id in url_to_id:
-                            valid_urls.append(url_to_id[post_id])
-                    
-                    print(f"   ✓ Batch check: {len(batch)} IDs → {len(data.get('data', {}).get('children', []))} valid")
-                    
-                elif response.status == 429:
-                    reset_after = int(response.headers.get('X-Ratelimit-Reset', 60))
-                    print(f"   ⚠️ 429 during batch check, waiting {reset_after}s...")
-                    await asyncio.sleep(reset_after + 1)
-                    
+            api_url = f"{API_BASE_URL}/api/info.json?id={batch_str}"
+            status, data, _ = await client.get_json(api_url, endpoint="info")
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}")
+            for child in data.get('data', {}).get('children', []):
+                post_id = child.get('data', {}).get('id')
+                if post_id and post_id in url_to_id:
+                    valid_urls[url_to_id[post_id]] = child['data'].get('num_comments')
+            
+            print(f"   ✓ Batch check: {len(batch)} IDs → {len(data.get('data', {}).get('children', []))} valid")
+        
         except Exception as e:
+            # Retries are used up: fetch them anyway, with an unknown comment count
             print(f"   ⚠️ Batch check error: {str(e)[:50]}")
             for post_id in [pid.replace('t3_', '') for pid in batch]:
                 if post_id in url_to_id:
-                    valid_urls.append(url_to_id[post_id])
-        
-        await asyncio.sleep(0.5)
+                    valid_urls[url_to_id[post_id]] = None
     
     return valid_urls
 
 # ============================================================
 # PHASE 3: FETCH "MORE CHILDREN" COMMENTS
 # ============================================================
-async def fetch_more_children(session, link_id, children_ids, rate_limiter):
+async def fetch_more_children(client, link_id, children_ids, classifier, records=None,
+                              seen_ids=None, stats=None, rows=False):
     """
     Fetch hidden comments using Reddit's /api/morechildren endpoint.
-    Processes in chunks of 100 (API limit).
+    Processes in chunks of 100 (API limit). Archive records are appended to
+    `records` if given. IDs in `seen_ids` are skipped; new ones are added.
+    If `stats` is a dict, stats['requests'] is increased per request sent.
+    With rows=True (and `records`) kept comments come back as output rows.
     """
-    all_comments = []
+    bodies = []
+    first_record = len(records) if records is not None else 0
     
     if not children_ids:
-        return all_comments
+        return []
     
-    # Filter out empty strings
-    children_ids = [c for c in children_ids if c]
+    # Filter out empty strings and comments processed before
+    children_ids = [c for c in children_ids if c and (seen_ids is None or c not in seen_ids)]
     
     for i in range(0, len(children_ids), 100):
         chunk = children_ids[i:i + 100]
         
-        url = "https://api.reddit.com/api/morechildren.json"
+        url = f"{API_BASE_URL}/api/morechildren.json"
         params = {
             'link_id': f't3_{link_id}',
             'children': ','.join(chunk),
@@ -325,256 +842,618 @@ async def fetch_more_children(session, link_id, children_ids, rate_limiter):
             'sort': 'controversial'
         }
         
-        for attempt in range(3):
-            try:
-                await rate_limiter.acquire()
-                async with session.get(url, params=params, headers=headers, 
-                                       timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        things = data.get('json', {}).get('data', {}).get('things', [])
-                        for thing in things:
-                            if thing.get('kind') == 't1':
-                                body = thing.get('data', {}).get('body', '')
-                                if body and not contains_urdu_script(body) and is_roman_urdu(body):
-                                    clean_text = body.replace("\n", " ").replace("\r", " ").strip()
-                                    if len(clean_text) > 10:
-                                        all_comments.append(clean_text)
-                        break  # Success
-                    elif resp.status == 429:
-                        reset_after = int(resp.headers.get('X-Ratelimit-Reset', 60))
-                        await asyncio.sleep(reset_after + 1)
-                    else:
-                        await asyncio.sleep(2 ** attempt)
-                        
-            except Exception as e:
-                await asyncio.sleep(2 ** attempt)
-    
-    return all_comments
+        try:
+            status, data, _ = await client.get_json(url, params=params, endpoint="morechildren", stats=stats)
+        except Exception:
+            continue  # Retries are used up: the rest of the thread still counts
+        if status != 200:
+            continue
+        things = data.get('json', {}).get('data', {}).get('things', [])
+        for thing in things:
+            if thing.get('kind') == 't1':
+                if seen_ids is not None:
+                    cid = thing.get('data', {}).get('id')
+                    if cid in seen_ids:
+                        continue
+                    seen_ids.add(cid)
+                body = thing.get('data', {}).get('body', '')
+                if body:
+                    bodies.append(body)
+                    if records is not None:
+                        records.append(comment_record(thing['data']))
+    
+    return await classifier.classify(bodies, records[first_record:] if rows else None)
 
 # ============================================================
-# PHASE 2: FETCH COMMENTS WITH EXPONENTIAL BACKOFF
+# PHASE 2: FETCH COMMENTS (retries/backoff in the shared HTTP client)
 # ============================================================
-async def fetch_comments(session, url, index, total, semaphore, rate_limiter):
-    """Fetch comments for a single valid post, including 'more children'."""
+async def fetch_comments(client, url, index, total, classifier, records=None, seen_ids=None,
+                         stats=None, rows=False):
+    """
+    Fetch comments for a single valid post, including 'more children'.
+    Returns (status, kept_comments, comments_seen, num_comments) where status
+    is FETCHED, MISSING or FAILED. If `records` is a list, every fetched
+    comment's archive record is appended to it, whether or not it was kept.
+    If `seen_ids` is a set, every comment ID found is added to it; when it
+    already holds IDs from an earlier fetch this is a revisit: the thread is
+    read newest-first and only unseen comments are processed. If `stats` is
+    a dict, stats['requests'] counts the requests sent (retries included).
+    With rows=True (which needs `records`) the kept comments are output_row()
+    dicts with their metadata instead of plain texts.
+    """
     # limit=500 to get maximum comments in one request
-    json_url = url.rstrip('/') + ".json?sort=controversial&limit=500"
+    sort = "new" if seen_ids else "controversial"
+    json_url = url.rstrip('/') + f".json?sort={sort}&limit=500"
     post_id = extract_post_id(url)
+    phase_start = time.perf_counter()
     
-    async with semaphore:
-        for attempt in range(MAX_RETRIES):
-            try:
-                await rate_limiter.acquire()
-                await asyncio.sleep(random.uniform(0.1, 0.3))
-                
-                async with session.get(json_url, headers=headers, 
-                                       timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        json_data = await response.json()
-                        thread_comments = []
-                        
-                        # Phase 2: Extract visible comments + collect "more" IDs
-                        more_ids = get_comments_from_json(json_data, thread_comments)
-                        
-                        # Phase 3: Fetch hidden "more children" comments
-                        more_comments = []
-                        if more_ids and post_id:
-                            more_comments = await fetch_more_children(
-                                session, post_id, more_ids, rate_limiter
-                            )
-                            thread_comments.extend(more_comments)
-                        
-                        more_info = f" (+{len(more_comments)} hidden)" if more_comments else ""
-                        print(f"   [{index+1}/{total}] ✓ {len(thread_comments)} comments{more_info}")
-                        return thread_comments
-                    
-                    elif response.status == 429:
-                        # Read rate limit headers for smarter backoff
-                        reset_after = int(response.headers.get('X-Ratelimit-Reset', 60))
-                        print(f"   [{index+1}/{total}] ⚠️ 429, waiting {reset_after}s...")
-                        await asyncio.sleep(reset_after + 1)
-                        continue
-                    
-                    elif response.status in [404, 403]:
-                        print(f"   [{index+1}/{total}] ⊘ {response.status}")
-                        return []
-                    
-                    else:
-                        # Exponential backoff for other errors
-                        wait = 2 ** attempt
-                        if attempt < MAX_RETRIES - 1:
-                            await asyncio.sleep(wait)
-                            continue
-                        return []
-            
-            except Exception as e:
-                wait = 2 ** attempt
-                if attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(wait)
-                    continue
-                print(f"   [{index+1}/{total}] ⚠️ Error: {str(e)[:30]}")
-                return []
+    try:
+        status, json_data, _ = await client.get_json(json_url, endpoint="thread", stats=stats)
+        if status in (404, 403):
+            print(f"   [{index+1}/{total}] ⊘ {status}")
+            return MISSING, [], 0, None
+        if status != 200:
+            print(f"   [{index+1}/{total}] ⚠️ HTTP {status}")
+            return FAILED, [], 0, None
         
-        return []
+        bodies = []
+        first_record = len(records) if records is not None else 0
+        
+        # Phase 2: Extract visible comments + collect "more" IDs,
+        # classifying them in the background while Phase 3 fetches
+        more_ids = extract_comment_bodies(json_data, bodies, records=records, seen_ids=seen_ids)
+        visible = asyncio.ensure_future(
+            classifier.classify(bodies, records[first_record:] if rows else None))
+        metrics.observe('phase_seconds', time.perf_counter() - phase_start, PHASE_BUCKETS, phase='2_thread')
+        
+        # Phase 3: Fetch hidden "more children" comments
+        more_comments = []
+        if more_ids and post_id:
+            with metrics.time('phase_seconds', PHASE_BUCKETS, phase='3_more'):
+                more_comments = await fetch_more_children(
+                    client, post_id, more_ids, classifier, records, seen_ids, stats, rows
+                )
+        thread_comments = await visible
+        thread_comments.extend(more_comments)
+        
+        more_info = f" (+{len(more_comments)} hidden)" if more_comments else ""
+        print(f"   [{index+1}/{total}] ✓ {len(thread_comments)} comments{more_info}")
+        return FETCHED, thread_comments, len(bodies) + len(more_ids), thread_num_comments(json_data)
+    
+    except Exception as e:
+        print(f"   [{index+1}/{total}] ⚠️ Error: {str(e)[:30]}")
+        return FAILED, [], 0, None
 
 # ============================================================
-# BATCH PROCESSING (2-Phase + More Children)
+# PIPELINE: validate ahead -> fetch workers -> timed checkpoints
 # ============================================================
-async def process_batch(session, batch, start_index, total, semaphore, rate_limiter):
-    """Process a batch with 3-phase approach"""
+class Checkpointer:
+    """
+    Collects finished posts. Their rows are appended to the writer straight
+    away, and a checkpoint fsyncs them and then marks their posts done in
+    the crawl state, every CHECKPOINT_POSTS posts, CHECKPOINT_ROWS rows or
+    CHECKPOINT_SECONDS, whichever comes first.
+    With the default CHECKPOINT_POSTS = 1 every finished post is checkpointed
+    before the next one is recorded, so a crash only loses posts still being
+    fetched. With a larger value a crash loses up to that many finished
+    posts: on restart the writer rolls their rows back and they are fetched
+    again, re-requested but never duplicated.
+    """
+    def __init__(self, writer, state, archive=None, scheduler=None, seen_index=None):
+        self.writer = writer
+        self.state = state
+        self.archive = archive
+        self.scheduler = scheduler
+        self.seen_index = seen_index
+        self.finished = []
+        self.threads = []
+        self.comments_found = 0
+        self.posts_done = 0
+        self.started = 0
+        self.last_posts = 0
+        self.last_time = time.time()
     
-    # Phase 1: Batch check which posts exist
-    print(f"\n   📋 Phase 1: Batch checking {len(batch)} posts...")
-    valid_urls = await batch_check_posts(session, batch, rate_limiter)
+    def record(self, post_id, status, comments, seen, records=None, thread=None):
+        """Buffer a finished post; returns how many of its comments were new."""
+        added = self.writer.write_batch(comments, flush=False)
+        if self.archive is not None and status == FETCHED:
+            self.archive.write_thread(records)
+        self.finished.append((post_id, status, seen, len(comments)))
+        if thread is not None and status == FETCHED:
+            self.threads.append((post_id, *thread))
+        metrics.inc('posts', status=status)
+        self.comments_found += len(comments)
+        self.posts_done += 1
+        if self.writer.pending_rows >= CHECKPOINT_ROWS or len(self.finished) >= CHECKPOINT_POSTS:
+            self.flush()
+        return added
     
-    skipped = len(batch) - len(valid_urls)
-    if skipped > 0:
-        print(f"   ⚡ Skipped {skipped} deleted/invalid posts (saved {skipped} requests!)")
+    def flush(self):
+        # Rows must be durable before their posts are marked done
+        self.writer.flush()
+        if self.archive is not None:
+            self.archive.flush()
+        if self.finished:
+            if self.seen_index is not None:
+                # After the rows: an ID may only be skipped once its comment is stored
+                for _, _, ids in self.threads:
+                    self.seen_index.add_many(ids)
+                self.seen_index.flush()
+                if self.seen_index.needs_merge():
+                    self.seen_index.merge()
+            self.state.mark_results(self.finished, self.threads)
+            self.finished = []
+            self.threads = []
+        if self.scheduler is not None:
+            self.state.add_yields(self.scheduler.take_unsaved())
     
-    # Phase 2+3: Fetch comments for valid posts (including more children)
-    if valid_urls:
-        print(f"   📥 Phase 2+3: Fetching comments from {len(valid_urls)} valid posts...")
-        tasks = [
-            fetch_comments(session, url, start_index + i, total, semaphore, rate_limiter)
-            for i, url in enumerate(valid_urls)
-        ]
-        return await asyncio.gather(*tasks)
+    def report(self, total, scrape_start):
+        now = time.time()
+        interval = now - self.last_time
+        urls_per_min = (self.posts_done - self.last_posts) / interval * 60 if interval > 0 else 0
+        self.last_posts, self.last_time = self.posts_done, now
+        eta = estimate_eta(now - scrape_start, self.posts_done, total)
+        metrics.set('posts_done', self.posts_done)
+        metrics.set('posts_scheduled', total)
+        metrics.set('unique_comments', self.writer.count)
+        if self.scheduler is not None:
+            for sub, row in self.scheduler.snapshot().items():
+                metrics.set('subreddit_yield', row['yield'], subreddit=sub)
+                metrics.set('subreddit_pending', row['pending'], subreddit=sub)
+        print(f"\n   📊 {self.posts_done}/{total} posts | {self.writer.count} unique comments "
+              f"| {urls_per_min:.1f} URLs/min | ⏱️ {format_duration(now - scrape_start)} | ETA: {eta}")
+        print(f"   💾 Checkpoint saved\n")
+
+async def validate_ahead(client, state, queue, n_workers, checkpointer, scheduler=None):
+    """
+    Phase 1, running ahead of the fetchers: batch-check the next unfinished
+    posts (100 IDs per request) and queue the valid ones. The bounded queue
+    keeps validation at most VALIDATE_AHEAD posts in front. "Next" is links
+    file order, or the scheduler's choice if one is given.
+    """
+    after_seq = -1
+    while True:
+        if scheduler is not None:
+            chunk = scheduler.take(BATCH_CHECK_SIZE)
+        else:
+            chunk = state.next_pending(BATCH_CHECK_SIZE, after_seq=after_seq)
+        if not chunk:
+            break
+        after_seq = chunk[-1][2]
+        
+        # Posts validated by an earlier run don't need checking again
+        unchecked = [url for _, url, _, status in chunk if status != VALIDATED]
+        valid_set = {}
+        unchanged = set()
+        if unchecked:
+            print(f"\n   📋 Phase 1: Batch checking {len(unchecked)} posts...")
+            with metrics.time('phase_seconds', PHASE_BUCKETS, phase='1_validate'):
+                valid_set = await batch_check_posts(client, unchecked)
+            missing = [pid for pid, url, _, status in chunk if status != VALIDATED and url not in valid_set]
+            # Revisits: a thread whose comment count did not grow has nothing new
+            previous = state.known_counts(pid for pid, url, _, _ in chunk if url in valid_set)
+            unchanged = {pid for pid, url, _, _ in chunk
+                         if pid in previous and valid_set.get(url) is not None and valid_set[url] <= previous[pid]}
+            state.mark_many([pid for pid, url, _, _ in chunk if url in valid_set and pid not in unchanged], VALIDATED)
+            if missing:
+                state.mark_many(missing, MISSING)
+                metrics.inc('posts', len(missing), status=MISSING)
+                checkpointer.posts_done += len(missing)
+                print(f"   ⚡ Skipped {len(missing)} deleted/invalid posts (saved {len(missing)} requests!)")
+            if unchanged:
+                state.mark_unchanged(unchanged)
+                metrics.inc('posts', len(unchanged), status='unchanged')
+                checkpointer.posts_done += len(unchanged)
+                print(f"   ⚡ Skipped {len(unchanged)} unchanged threads since last visit")
+        
+        for pid, url, _, status in chunk:
+            if status == VALIDATED or (url in valid_set and pid not in unchanged):
+                await queue.put((pid, url))
     
-    return []
+    for _ in range(n_workers):
+        await queue.put(None)
+
+async def fetch_worker(client, queue, total, classifier, checkpointer):
+    """Phase 2+3: take the next validated post as soon as this slot is free."""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        post_id, url = item
+        index = checkpointer.started
+        checkpointer.started += 1
+        # Records feed the archive and the Parquet output's metadata columns
+        rows = isinstance(checkpointer.writer, StreamingParquetWriter)
+        records = [] if checkpointer.archive is not None or rows else None
+        # Comment IDs from an earlier visit (empty on a first fetch) + the persistent index
+        seen_ids = SeenComments(checkpointer.state.comment_ids(post_id), checkpointer.seen_index)
+        stats = {'requests': 0}
+        status, comments, seen, num_comments = await fetch_comments(
+            client, url, index, total, classifier, records, seen_ids, stats, rows
+        )
+        if seen_ids.skipped:
+            metrics.inc('comments_skipped_seen', seen_ids.skipped)
+        added = checkpointer.record(post_id, status, comments, seen, records, (num_comments, seen_ids.ids))
+        if checkpointer.scheduler is not None:
+            checkpointer.scheduler.observe(subreddit_of(url), added, stats['requests'])
 
 # ============================================================
 # MAIN SCRAPING LOOP
 # ============================================================
-async def scrape_all_urls(urls, start_from_batch=0):
-    """Main scraping function with hybrid batch approach + timing"""
-    all_comments = []
+def print_yields(scheduler, top=10):
+    """Learned yields, highest first (also exported as the subreddit_yield metric)."""
+    rows = [(sub, row) for sub, row in scheduler.snapshot().items() if row['requests']]
+    if not rows:
+        return
+    print(f"\n   📈 Yield per subreddit (kept comments / request, all runs):")
+    for sub, row in rows[:top]:
+        print(f"      r/{sub:<24} {row['yield']:6.2f}  ({row['kept']} kept / {row['requests']} requests)")
+    if len(rows) > top:
+        print(f"      ... {len(rows) - top} more in the subreddit_yield metric")
+
+def output_path():
+    return PARQUET_DIR if OUTPUT_FORMAT == "parquet" else OUTPUT_FILE
+
+def open_output(path, dedup_index):
+    """Writer for OUTPUT_FORMAT: StreamingParquetWriter (a directory) or StreamingCSVWriter."""
+    if OUTPUT_FORMAT == "parquet":
+        return StreamingParquetWriter(path, dedup_index, merge_threshold=INDEX_MEMORY_ENTRIES)
+    return StreamingCSVWriter(path, dedup_index, merge_threshold=INDEX_MEMORY_ENTRIES)
+
+def iter_link_chunks():
+    """URLs of INPUT_FILE, LINKS_CHUNK_ROWS at a time."""
+    for chunk in pd.read_csv(INPUT_FILE, usecols=['url'], chunksize=LINKS_CHUNK_ROWS):
+        yield chunk['url'].dropna().tolist()
+
+async def keep_lease(leases, shard, pipeline):
+    """Renew the shard lease while the pipeline runs; cancel it if the lease is lost."""
+    while True:
+        await asyncio.sleep(leases.ttl / 4)
+        if not leases.renew(shard):
+            print(f"   ⚠️ Lease on {shard_name(shard)} lost (reclaimed by another worker), stopping")
+            pipeline.cancel()
+            return
+
+async def scrape_all_urls(state, output_file=None, dedup_index=None, archive_dir=None,
+                          rate_share=1.0, lease=None, seen_ids_index=None, classify_workers=None):
+    """
+    Main scraping function: a continuous pipeline instead of fixed batches.
+    Validation runs ahead, CONCURRENT_REQUESTS fetch workers pull posts as
+    soon as they are free, and checkpoints happen on a timer/row count, so one
+    slow thread never stalls the others. Returns (posts_processed, unique_comments).
     
-    # Load existing
-    if start_from_batch > 0:
-        try:
-            existing_df = pd.read_csv(OUTPUT_FILE)
-            all_comments = existing_df['text'].tolist()
-            print(f"📂 Loaded {len(all_comments)} existing comments")
-        except:
-            pass
+    Output, indexes and archive default to OUTPUT_FILE (PARQUET_DIR for
+    Parquet output), DEDUP_INDEX, SEEN_IDS_INDEX and ARCHIVE_DIR. In sharded mode `lease` is (ShardLeases, shard): the lease is
+    renewed while running and the run stops early if it is lost.
+    `classify_workers` overrides CLASSIFY_WORKERS for this run's pool.
+    """
+    output_file = output_file or output_path()
+    dedup_index = dedup_index or DEDUP_INDEX
+    archive_dir = archive_dir or ARCHIVE_DIR
+    seen_ids_index = seen_ids_index or SEEN_IDS_INDEX
+    response_cache = None
+    if RESPONSE_CACHE_FILE:
+        response_cache = ResponseCache(RESPONSE_CACHE_FILE, ttl=RESPONSE_CACHE_TTL,
+                                       max_bytes=RESPONSE_CACHE_MAX_BYTES)
+        print(f"🗄️ Response cache: {RESPONSE_CACHE_FILE} ({response_cache.total_bytes / 1024**2:.1f} MB stored)")
     
-    rate_limiter = TokenBucketRateLimiter(REQUESTS_PER_MINUTE)
-    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
+    # Output accumulates across runs; the dedup index keeps earlier comments out
+    writer = open_output(output_file, dedup_index)
+    if writer.count:
+        print(f"📂 Appending to {writer.count} existing comments ({len(writer.index):,} hashes indexed)")
     
-    connector = aiohttp.TCPConnector(limit=10)
-    timeout = aiohttp.ClientTimeout(total=60)
+    rate_limiter = AdaptiveRateLimiter(REQUESTS_PER_MINUTE * rate_share, share=rate_share)
+    exporter = MetricsExporter(metrics, path=METRICS_FILE, interval=METRICS_FLUSH_SECONDS, port=METRICS_PORT)
+    classifier = ClassificationStage(workers=classify_workers)
+    archive = None
+    if archive_dir:
+        archive = ThreadArchive(archive_dir, chunk_bytes=ARCHIVE_CHUNK_BYTES)
+        print(f"🗃️ Archiving raw comments to {archive_dir}/")
+    scheduler = None
+    if SCHEDULE == "yield":
+        scheduler = YieldScheduler(state.yield_totals(), prior_requests=YIELD_PRIOR_REQUESTS,
+                                   floor=YIELD_FLOOR, sharpness=YIELD_SHARPNESS)
+        scheduler.add_source(state.pending_by_subreddit(), state.next_pending_in)
+    seen_index = None
+    if seen_ids_index:
+        seen_index = CommentIdIndex(seen_ids_index, INDEX_MEMORY_ENTRIES)
+        if len(seen_index):
+            print(f"🆔 Skipping {len(seen_index):,} comment IDs processed before ({seen_ids_index}); "
+                  f"they are not reclassified, delete the index to run them through a changed filter")
+    checkpointer = Checkpointer(writer, state, archive, scheduler, seen_index)
+    queue = asyncio.Queue(maxsize=VALIDATE_AHEAD)
     
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-        batch_size = 20
-        total_batches = (len(urls) + batch_size - 1) // batch_size
-        
-        scrape_start = time.time()
-        
-        for batch_idx in range(start_from_batch, total_batches):
-            i = batch_idx * batch_size
-            batch = urls[i:i + batch_size]
-            
-            elapsed_total = time.time() - scrape_start
-            batches_done = batch_idx - start_from_batch
-            eta = estimate_eta(elapsed_total, batches_done, total_batches - start_from_batch)
-            
-            print(f"\n{'='*70}")
-            print(f"📦 Batch {batch_idx + 1}/{total_batches} (URLs {i+1} to {i+len(batch)})")
-            print(f"⏱️  Elapsed: {format_duration(elapsed_total)} | ETA: {eta}")
-            print(f"{'='*70}")
-            
-            batch_start = time.time()
-            results = await process_batch(session, batch, i, len(urls), semaphore, rate_limiter)
-            batch_time = time.time() - batch_start
-            
-            batch_comments = 0
-            for comments in results:
-                batch_comments += len(comments)
-                all_comments.extend(comments)
-            
-            # Calculate speed metrics
-            urls_per_min = (len(batch) / batch_time * 60) if batch_time > 0 else 0
-            
-            print(f"\n   ✅ Batch complete! {batch_comments} comments in {format_duration(batch_time)}")
-            print(f"   📊 Total: {len(all_comments)} comments | Speed: {urls_per_min:.1f} URLs/min")
+    # One pooled connection per fetch worker plus the validator, per host
+    client = AsyncClient(headers, rate_limiter, connections=CONCURRENT_REQUESTS + 1, cache=response_cache,
+                         retry=RetryPolicy(MAX_RETRIES))
+    
+    total = state.remaining()
+    
+    try:
+        async with client:
+            scrape_start = time.time()
             
-            # Save checkpoint AND progress
-            if all_comments:
-                df = pd.DataFrame(all_comments, columns=["text"]).drop_duplicates()
-                df.to_csv(OUTPUT_FILE, index=False)
-                save_progress(batch_idx + 1, total_batches)
-                print(f"   💾 Saved: {len(df)} unique | Progress: {batch_idx + 1}/{total_batches}")
-            else:
-                save_progress(batch_idx + 1, total_batches)
+            async def checkpoint_timer():
+                while True:
+                    await asyncio.sleep(CHECKPOINT_SECONDS)
+                    checkpointer.flush()
+                    checkpointer.report(total, scrape_start)
             
-            await asyncio.sleep(1)
+            timer = asyncio.ensure_future(checkpoint_timer())
+            pipeline = asyncio.gather(
+                validate_ahead(client, state, queue, CONCURRENT_REQUESTS, checkpointer, scheduler),
+                *(fetch_worker(client, queue, total, classifier, checkpointer)
+                  for _ in range(CONCURRENT_REQUESTS)),
+            )
+            keeper = asyncio.ensure_future(keep_lease(*lease, pipeline)) if lease else None
+            try:
+                await pipeline
+            except asyncio.CancelledError:
+                if keeper is None or not keeper.done():
+                    raise
+                # Lease lost: keep what was fetched (this generation's own segment)
+            finally:
+                timer.cancel()
+                if keeper is not None:
+                    keeper.cancel()
+                checkpointer.flush()
+            checkpointer.report(total, scrape_start)
+        
+        if scheduler is not None:
+            print_yields(scheduler)
+        writer.compact()
+    finally:
+        classifier.close()
+        writer.close()
+        if seen_index is not None:
+            seen_index.close()
+        exporter.close()
+        if archive is not None:
+            print(f"🗃️ Archived {archive.records} comments from {archive.threads} threads")
+            archive.close()
+        if response_cache is not None:
+            print(f"🗄️ Response cache: {response_cache.hits} hits, {response_cache.misses} misses")
+            response_cache.close()
     
-    return all_comments
+    return checkpointer.posts_done, writer.count
 
 # ============================================================
-# PROGRESS SAVE/LOAD
+# SHARDED CRAWL (several processes / hosts, lease files)
 # ============================================================
-def save_progress(batch_num, total):
-    with open(PROGRESS_FILE, 'w') as f:
-        f.write(f"{batch_num}/{total}")
+def sync_shard_links(state, shard):
+    """Register the links of one shard, streaming INPUT_FILE; returns how many were new."""
+    added = 0
+    for urls in iter_link_chunks():
+        mine = []
+        for url in urls:
+            post_id = post_id_from_url(url)
+            if post_id and shard_of(post_id, NUM_SHARDS) == shard:
+                mine.append(url)
+        added += state.sync_links(mine)
+    return added
+
+GEN_IDS_RE = re.compile(r"comments\.gen-(\d+)\.ids\.idx(\.log)?$")
+
+def seed_generation_ids(shard_dir, gen):
+    """
+    Path of lease generation `gen`'s comment-ID index, started as a copy of
+    the newest earlier generation's (whose worker may still be running, so
+    the two never share files). Copies older than the one copied from are
+    deleted.
+    """
+    path = os.path.join(shard_dir, f"comments.gen-{gen:06d}.ids.idx")
+    if os.path.exists(path + ".log"):
+        return path   # this generation already started (and seeded) its index
+    earlier = set()
+    for candidate in glob.glob(os.path.join(shard_dir, "comments.gen-*.ids.idx*")):
+        match = GEN_IDS_RE.search(os.path.basename(candidate))
+        if match and int(match.group(1)) < gen:
+            earlier.add((int(match.group(1)), os.path.join(shard_dir, f"comments.gen-{int(match.group(1)):06d}.ids.idx")))
+    earlier = sorted(earlier)
+    if earlier:
+        snapshot_index(earlier[-1][1], path)
+        for _, stale in earlier[:-1]:
+            for leftover in (stale, stale + ".log"):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+    return path
+
+def run_shard_worker(worker_no, settings=None):
+    """
+    One worker process: claim a shard, crawl it to the end (or until the
+    lease is lost), release it, repeat until every shard is done.
+    Output goes to SHARD_DIR/shard-NNNN/comments.gen-GGGGGG.csv (or a
+    .parquet directory), one segment per lease generation, so a reclaimed shard never shares files with the
+    worker that lost it. The same goes for the comment-ID index
+    (comments.gen-GGGGGG.ids.idx, seeded from the previous generation's)
+    and the archive (ARCHIVE_DIR/shard-NNNN/gen-GGGGGG/). `settings` are
+    the parent's current_settings().
+    """
+    global METRICS_FILE, METRICS_PORT
+    if settings:
+        apply_settings(settings)
+    leases = ShardLeases(os.path.join(SHARD_DIR, "leases"), NUM_SHARDS, ttl=LEASE_SECONDS)
+    worker_id = leases.worker_id
+    # The host's cores are split between the workers' classifier pools
+    classify_workers = max(1, (os.cpu_count() or 2) // SHARD_WORKERS)
+    if METRICS_FILE:
+        os.makedirs(os.path.join(SHARD_DIR, "metrics"), exist_ok=True)
+        METRICS_FILE = os.path.join(SHARD_DIR, "metrics", f"{worker_id}{os.path.splitext(METRICS_FILE)[1]}")
+    if METRICS_PORT is not None:
+        METRICS_PORT += worker_no
+    rate_share = SHARD_RATE_SHARE or 1.0 / SHARD_WORKERS
+    
+    prefer = worker_no * NUM_SHARDS // SHARD_WORKERS
+    
+    while True:
+        shard = leases.claim(prefer)
+        if shard is None:
+            if leases.all_done():
+                break
+            status = leases.status()
+            print(f"   [{worker_id}] waiting: {status['leased']} shards leased by other workers, {status['done']} done")
+            time.sleep(LEASE_SECONDS / 4)
+            continue
+        
+        gen = leases.held[shard]
+        shard_dir = os.path.join(SHARD_DIR, shard_name(shard))
+        os.makedirs(shard_dir, exist_ok=True)
+        state = CrawlState(os.path.join(shard_dir, "crawl_state.sqlite"))
+        done = False
+        try:
+            sync_shard_links(state, shard)
+            state.requeue_failed()
+            if REVISIT_AFTER:
+                state.requeue_stale(REVISIT_AFTER)
+            if state.remaining():
+                print(f"\n🧩 [{worker_id}] {shard_name(shard)} (lease gen {gen}): {state.remaining()} posts")
+                segment = os.path.join(shard_dir, f"comments.gen-{gen:06d}")
+                asyncio.run(scrape_all_urls(
+                    state, output_file=segment + (".parquet" if OUTPUT_FORMAT == "parquet" else ".csv"),
+                    dedup_index=segment + ".idx",
+                    # A post's comments never leave its shard, so the shard's own index is complete
+                    seen_ids_index=seed_generation_ids(shard_dir, gen) if SEEN_IDS_INDEX else None,
+                    archive_dir=os.path.join(ARCHIVE_DIR, shard_name(shard), f"gen-{gen:06d}") if ARCHIVE_DIR else None,
+                    rate_share=rate_share, lease=(leases, shard), classify_workers=classify_workers,
+                ))
+            # Failures with attempts left keep the shard open for another pass
+            state.requeue_failed()
+            done = state.remaining() == 0 and shard in leases.held
+        finally:
+            state.close()
+            leases.release(shard, done=done)
+        if done:
+            print(f"   ✅ [{worker_id}] {shard_name(shard)} done")
 
-def load_progress():
+def merge_shard_segments():
+    """Fold every shard segment into the output (deduplicated through DEDUP_INDEX)."""
+    parquet = OUTPUT_FORMAT == "parquet"
+    pattern = "comments.gen-*.parquet" if parquet else "comments.gen-*.csv"
+    segments = sorted(glob.glob(os.path.join(SHARD_DIR, "shard-*", pattern)))
+    writer = open_output(output_path(), DEDUP_INDEX)
+    before = writer.count
     try:
-        with open(PROGRESS_FILE, 'r') as f:
-            batch_num, _ = f.read().strip().split('/')
-            return int(batch_num)
-    except:
-        return 0
+        for path in segments:
+            if parquet:
+                # Publishes rows a killed worker left staged at its last checkpoint
+                StreamingParquetWriter(path, os.path.splitext(path)[0] + ".idx").close()
+                for batch in iter_batches(path):
+                    writer.write_batch(batch.to_pylist(), flush=False)
+            else:
+                for chunk in pd.read_csv(path, chunksize=50_000, keep_default_na=False):
+                    writer.write_batch(chunk['text'].tolist(), flush=False)
+            writer.flush()
+        writer.compact()
+    finally:
+        writer.close()
+    return len(segments), writer.count - before, writer.count
+
+def main_sharded():
+    leases = ShardLeases(os.path.join(SHARD_DIR, "leases"), NUM_SHARDS, ttl=LEASE_SECONDS)
+    status = leases.status()
+    print(f"\n{'='*70}")
+    print(f"🧩 SHARDED REDDIT COMMENT SCRAPER")
+    print(f"{'='*70}")
+    print(f"  Links: {INPUT_FILE}")
+    print(f"  Shards: {NUM_SHARDS} in {SHARD_DIR}/ ({status['done']} done, {status['leased']} leased, {status['free']} free)")
+    print(f"  Workers on this host: {SHARD_WORKERS} × {CONCURRENT_REQUESTS} fetchers, "
+          f"{SHARD_RATE_SHARE or 1.0 / SHARD_WORKERS:.2f} of the rate budget each")
+    print(f"  Lease: {LEASE_SECONDS}s")
+    print(f"  Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*70}\n")
+    
+    start_time = time.time()
+    settings = current_settings()
+    workers = [multiprocessing.Process(target=run_shard_worker, args=(i, settings)) for i in range(SHARD_WORKERS)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    
+    if not leases.all_done():
+        status = leases.status()
+        print(f"\n⚠️ {NUM_SHARDS - status['done']} shards unfinished; run again (here or on another host) to continue.")
+        return
+    
+    # Only one host merges; the others see the lock and leave it
+    lock = os.path.join(SHARD_DIR, "merge.lock")
+    try:
+        os.close(os.open(lock, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        print(f"\n✅ All shards done; another process is merging (remove {lock} if it died).")
+        return
+    try:
+        n_segments, added, total = merge_shard_segments()
+    finally:
+        os.remove(lock)
+    
+    print(f"\n{'='*70}")
+    print(f"🎉 SHARDED SCRAPE COMPLETE!")
+    print(f"{'='*70}")
+    print(f"  Segments merged: {n_segments} (+{added} new comments)")
+    print(f"  Unique comments: {total}")
+    print(f"  Total time:      {format_duration(time.time() - start_time)}")
+    print(f"  Output file:     {output_path()}")
+    print(f"{'='*70}\n")
 
 # ============================================================
 # MAIN ENTRY POINT
 # ============================================================
 def main():
+    if CRAWL_MODE == "sharded":
+        main_sharded()
+        return
     try:
-        targets_df = pd.read_csv(INPUT_FILE)
-        links = targets_df['url'].tolist()
-        
-        start_batch = load_progress()
+        state = CrawlState(STATE_DB)
+        n_links = added = 0
+        for urls in iter_link_chunks():
+            n_links += len(urls)
+            added += state.sync_links(urls)
+        retried = state.requeue_failed()
+        revisits = state.requeue_stale(REVISIT_AFTER) if REVISIT_AFTER else 0
+        counts = state.counts()
         
         print(f"\n{'='*70}")
         print(f"🚀 HYBRID BATCH REDDIT COMMENT SCRAPER v3.0")
         print(f"{'='*70}")
-        print(f"  Total URLs: {len(links)}")
+        print(f"  Total URLs: {n_links}")
         print(f"  Strategy: 3-Phase Hybrid")
         print(f"    Phase 1: Batch check 100 IDs = 1 request")
         print(f"    Phase 2: Fetch comments (limit=500) from valid posts")
         print(f"    Phase 3: Fetch hidden 'more children' comments")
-        print(f"  Roman Urdu: {'fastText + Keywords + Bigrams' if FASTTEXT_AVAILABLE else 'Keywords + Bigrams (fastText not installed)'}")
-        print(f"  Rate: {REQUESTS_PER_MINUTE} req/min")
-        print(f"  Batch size: 20 URLs")
+        print(f"  Roman Urdu: {'fastText + Keywords + Bigrams' if FASTTEXT_AVAILABLE else 'Keywords + Bigrams (fastText off; pip install fast-langdetect to enable)'}")
+        print(f"  Rate: {REQUESTS_PER_MINUTE} req/min to start, then adaptive (X-Ratelimit headers)")
+        print(f"  Pipeline: {CONCURRENT_REQUESTS} fetch workers, validating up to {VALIDATE_AHEAD} posts ahead")
+        print(f"  Checkpoint: every {CHECKPOINT_POSTS} finished post(s), {CHECKPOINT_ROWS} rows or {CHECKPOINT_SECONDS}s")
+        if METRICS_FILE or METRICS_PORT is not None:
+            targets = [METRICS_FILE] if METRICS_FILE else []
+            if METRICS_PORT is not None:
+                targets.append(f"http://127.0.0.1:{METRICS_PORT}/metrics")
+            print(f"  Metrics: {' + '.join(targets)} (every {METRICS_FLUSH_SECONDS}s)")
         print(f"  Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        if start_batch > 0:
-            print(f"  🔄 RESUMING from batch {start_batch + 1}")
+        print(f"  Crawl state: {STATE_DB} (+{added} new posts, {retried} failed requeued, {revisits} due for a revisit)")
+        print(f"    " + " | ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
         print(f"{'='*70}\n")
         
         start_time = time.time()
-        all_comments = asyncio.run(scrape_all_urls(links, start_from_batch=start_batch))
-        
-        df = pd.DataFrame(all_comments, columns=["text"]).drop_duplicates()
-        df.to_csv(OUTPUT_FILE, index=False)
-        
-        # Clean up progress file on completion
         try:
-            import os
-            os.remove(PROGRESS_FILE)
-        except:
-            pass
+            processed, unique_comments = asyncio.run(scrape_all_urls(state))
+        finally:
+            state.close()
         
         elapsed = time.time() - start_time
         
         print(f"\n{'='*70}")
         print(f"🎉 SCRAPE COMPLETE!")
         print(f"{'='*70}")
-        print(f"  Unique comments: {len(df)}")
+        print(f"  Unique comments: {unique_comments}")
         print(f"  Total time:      {format_duration(elapsed)}")
-        print(f"  Avg per URL:     {elapsed/max(len(links),1):.1f}s")
+        print(f"  Posts processed: {processed}")
+        print(f"  Avg per URL:     {elapsed/max(processed,1):.1f}s")
         print(f"  Finished:        {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"  Output file:     {OUTPUT_FILE}")
+        print(f"  Output file:     {output_path()}")
         print(f"{'='*70}\n")
         
     except KeyboardInterrupt:
@@ -0,0 +1,161 @@
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Shared helpers live in the repo-level `redditscrape` package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from redditscrape.archive import chunk_paths, iter_archive
+from redditscrape.writer import StreamingCSVWriter
+from redditscrape.parquet import StreamingParquetWriter
+
+# Same classifier the scraper uses (fastText + keywords + bigrams)
+import CommentScraper
+from CommentScraper import filter_comment_bodies, filter_comment_records, format_duration, apply_settings, current_settings
+
+# ============================================================
+# OFFLINE RE-FILTER
+# Streams the raw archive written by CommentScraper.py (ARCHIVE_DIR) through
+# the current Roman Urdu filter and regenerates the output CSV. No network.
+# ============================================================
+
+# FILE CONFIGURATION
+ARCHIVE_DIR = "raw_archive"
+OUTPUT_FILE = "commentsRefiltered.csv"   # Regenerated from scratch (not the scraper's commentsScrape.csv)
+DEDUP_INDEX = "commentsRefiltered.idx"   # Rebuilt alongside the output
+OVERWRITE = False                        # Replace an existing output; otherwise refuse to start
+# "csv" or "parquet" (PARQUET_DIR, partitioned by subreddit, with the
+# archived id/post/score/created_utc and the classifier score; needs pyarrow)
+OUTPUT_FORMAT = "csv"
+PARQUET_DIR = "commentsRefiltered_parquet"
+
+# PARALLELISM
+WORKERS = os.cpu_count() or 2
+BATCH_SIZE = 2000           # Comment bodies per job
+MAX_PENDING = None          # Jobs in flight, bounds memory on huge archives (None = 4 per worker)
+REPORT_EVERY = 100_000      # Print progress every N archived comments
+
+
+def output_path():
+    return PARQUET_DIR if OUTPUT_FORMAT == "parquet" else OUTPUT_FILE
+
+
+def existing_output():
+    """Paths refilter() would delete that hold data, if any."""
+    paths = [PARQUET_DIR] if OUTPUT_FORMAT == "parquet" else [OUTPUT_FILE]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def remove_previous_output():
+    """Start from an empty output and index, since the whole archive is replayed."""
+    paths = [DEDUP_INDEX, DEDUP_INDEX + ".log"]
+    if OUTPUT_FORMAT == "parquet":
+        if os.path.isdir(PARQUET_DIR):
+            shutil.rmtree(PARQUET_DIR)
+    else:
+        paths += [OUTPUT_FILE, OUTPUT_FILE + ".ckpt"]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def iter_batches():
+    """Bodies (CSV output) or whole records (Parquet output) with a body, BATCH_SIZE at a time."""
+    batch = []
+    for record in iter_archive(ARCHIVE_DIR):
+        body = record.get('body')
+        if body:
+            batch.append(body if OUTPUT_FORMAT == "csv" else record)
+            if len(batch) >= BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def refilter():
+    """Classify every archived comment on a process pool; returns (seen, written)."""
+    remove_previous_output()
+    if OUTPUT_FORMAT == "parquet":
+        writer = StreamingParquetWriter(PARQUET_DIR, DEDUP_INDEX)
+        classify = filter_comment_records
+    else:
+        writer = StreamingCSVWriter(OUTPUT_FILE, DEDUP_INDEX)
+        classify = filter_comment_bodies
+    max_pending = MAX_PENDING or WORKERS * 4
+    seen = 0
+    next_report = REPORT_EVERY
+    start = time.time()
+
+    try:
+        # Spawned workers re-import CommentScraper; give them its current settings (--no-fasttext, --set)
+        with ProcessPoolExecutor(max_workers=WORKERS, initializer=apply_settings,
+                                 initargs=(current_settings(),)) as pool:
+            pending = deque()
+
+            def drain_one():
+                # Oldest job first, so output keeps archive order
+                writer.write_batch(pending.popleft().result(), flush=False)
+
+            for batch in iter_batches():
+                pending.append(pool.submit(classify, batch))
+                seen += len(batch)
+                if len(pending) >= max_pending:
+                    drain_one()
+                if seen >= next_report:
+                    next_report += REPORT_EVERY
+                    rate = seen / max(time.time() - start, 1e-9)
+                    print(f"   📊 {seen:,} comments | {writer.count:,} kept | {rate:,.0f} comments/s")
+
+            while pending:
+                drain_one()
+
+        writer.compact()
+    finally:
+        writer.close()
+
+    return seen, writer.count
+
+
+def main():
+    chunks = chunk_paths(ARCHIVE_DIR)
+    if not chunks:
+        print(f"❌ No archive chunks found in {ARCHIVE_DIR}/ (set ARCHIVE_DIR in CommentScraper.py and scrape first)")
+        return
+
+    existing = existing_output()
+    if existing and not OVERWRITE:
+        print(f"❌ {', '.join(existing)} already exists and would be replaced. Pick another output "
+              f"(OUTPUT_FILE / --output) or set OVERWRITE = True (--overwrite)")
+        return
+
+    archive_mb = sum(os.path.getsize(p) for p in chunks) / 1024 ** 2
+    print(f"\n{'='*70}")
+    print(f"🔁 OFFLINE RE-FILTER")
+    print(f"{'='*70}")
+    print(f"  Archive: {ARCHIVE_DIR}/ ({len(chunks)} chunks, {archive_mb:.1f} MB)")
+    print(f"  Output: {output_path()} (regenerated)")
+    print(f"  Roman Urdu: {'fastText + Keywords + Bigrams' if CommentScraper.FASTTEXT_AVAILABLE else 'Keywords + Bigrams (fastText not installed)'}")
+    print(f"  Workers: {WORKERS}")
+    print(f"  Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*70}\n")
+
+    start_time = time.time()
+    seen, kept = refilter()
+    elapsed = time.time() - start_time
+
+    print(f"\n{'='*70}")
+    print(f"🎉 RE-FILTER COMPLETE!")
+    print(f"{'='*70}")
+    print(f"  Archived comments: {seen:,}")
+    print(f"  Roman Urdu comments: {kept:,}")
+    print(f"  Total time: {format_duration(elapsed)}")
+    print(f"  Output: {output_path()}")
+    print(f"{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,20 @@
-import pandas as pd
 import time
 import re
-import requests
+import os
+import sys
 import random
-import nltk
-from nltk.corpus import stopwords
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from redditscrape.lazy import lazy_import
+from redditscrape.writer import StreamingCSVWriter
+from redditscrape.dedup import CommentIdIndex
+from redditscrape.stopwords import english_stopwords
 
-english_stops = set(stopwords.words('english'))
+# Heavy dependencies load on first use
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+english_stops = english_stopwords()
 urdu_markers = {
     # Pronouns
     'main', 'mein', 'mjhe', 'mujhe', 'mera', 'meri', 'mere', 'hum', 'humein', 'hm', 'hamara', 
@@ -41,6 +44,8 @@ urdu_markers = {
 
 INPUT_FILE = "links1.csv"
 OUTPUT_FILE = "commentsScrape.csv"
+DEDUP_INDEX = "comment_hashes.idx"  # shared with the Fast scraper if pointed at the same file
+SEEN_IDS_INDEX = None  # e.g. "comment_ids.idx": skip comment IDs processed before (delete it after changing the filter)
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) RomanUrduHunter/1.1 by ScrapeUmer'
@@ -56,73 +61,87 @@ def is_roman_urdu(text):
 def contains_urdu_script(text):
     return bool(re.search(r'[\u0600-\u06FF]', text))
 
-def get_comments_from_json(data, comments_list):
+def get_comments_from_json(data, comments_list, seen=None, new_ids=None):
+    # Comments in `seen` are skipped (their replies are still read); IDs of
+    # the others go to `new_ids`
     if isinstance(data, dict):
         if data.get('kind') == 't1': 
-            body = data.get('data', {}).get('body', '')
-            if body and not contains_urdu_script(body) and is_roman_urdu(body):
-                clean_text = body.replace("\n", " ").replace("\r", " ").strip()
-                if len(clean_text) > 10:
-                    comments_list.append(clean_text)
+            cid = data.get('data', {}).get('id')
+            if seen is None or not cid or cid not in seen:
+                if new_ids is not None and cid:
+                    new_ids.append(cid)
+                body = data.get('data', {}).get('body', '')
+                if body and not contains_urdu_script(body) and is_roman_urdu(body):
+                    clean_text = body.replace("\n", " ").replace("\r", " ").strip()
+                    if len(clean_text) > 10:
+                        comments_list.append(clean_text)
         for key, value in data.items():
-            get_comments_from_json(value, comments_list)
+            get_comments_from_json(value, comments_list, seen, new_ids)
     elif isinstance(data, list):
         for item in data:
-            get_comments_from_json(item, comments_list)
+            get_comments_from_json(item, comments_list, seen, new_ids)
 
 # MAIN
-try:
-    targets_df = pd.read_csv(INPUT_FILE)
-    links = targets_df['url'].tolist()
-    
-    # load existing data to resume
+def main():
     try:
-        final_dataset = pd.read_csv(OUTPUT_FILE)['text'].tolist()
-        print(f"Resuming from {len(final_dataset)} existing records...")
-    except:
-        final_dataset = []
+        targets_df = pd.read_csv(INPUT_FILE)
+        links = targets_df['url'].tolist()
+    
+        # append to existing output; the hash index skips anything stored before
+        writer = StreamingCSVWriter(OUTPUT_FILE, DEDUP_INDEX)
+        if writer.count:
+            print(f"Resuming from {writer.count} existing records...")
+        seen = CommentIdIndex(SEEN_IDS_INDEX) if SEEN_IDS_INDEX else None
+        if seen is not None and len(seen):
+            print(f"Skipping {len(seen)} comment IDs processed before ({SEEN_IDS_INDEX}); delete it to reclassify them")
 
-    print(f" Scrapping... ({len(links)} links) ---")
+        print(f" Scrapping... ({len(links)} links) ---")
     
-    for index, url in enumerate(links):
-        # Skip if we already have it
-        json_url = url.rstrip('/') + ".json?sort=controversial"
+        for index, url in enumerate(links):
+            # Skip if we already have it
+            json_url = url.rstrip('/') + ".json?sort=controversial"
         
-        success = False
-        while not success:
-            try:
-                response = requests.get(json_url, headers=headers)
+            success = False
+            while not success:
+                try:
+                    response = requests.get(json_url, headers=headers)
                 
-                if response.status_code == 200:
-                    json_data = response.json()
-                    thread_comments = []
-                    get_comments_from_json(json_data, thread_comments)
-                    final_dataset.extend(thread_comments)
-                    print(f"[{index+1}/{len(links)}] Captured {len(thread_comments)} | Total: {len(final_dataset)}")
-                    success = True
-                    time.sleep(random.uniform(2, 4)) # 2-4 sec sleep
+                    if response.status_code == 200:
+                        json_data = response.json()
+                        thread_comments = []
+                        new_ids = []
+                        get_comments_from_json(json_data, thread_comments, seen, new_ids)
+                        new_rows = writer.write_batch(thread_comments)
+                        if seen is not None:
+                            # Only after write_batch flushed the rows
+                            seen.add_many(new_ids)
+                            seen.flush()
+                        print(f"[{index+1}/{len(links)}] Captured {len(thread_comments)} ({new_rows} new) | Total: {writer.count}")
+                        success = True
+                        time.sleep(random.uniform(2, 4)) # 2-4 sec sleep
 
-                elif response.status_code == 429:
-                    print("(429)... Sleep for 60 seconds")
-                    time.sleep(60) # reset block
+                    elif response.status_code == 429:
+                        print("(429)... Sleep for 60 seconds")
+                        time.sleep(60) # reset block
                 
-                else:
-                    print(f"[{index+1}] Failed status {response.status_code}. Skipping thread.")
-                    success = True # Skip
+                    else:
+                        print(f"[{index+1}] Failed status {response.status_code}. Skipping thread.")
+                        success = True # Skip
 
-            except Exception as e:
-                print(f"Request error: {e}")
-                time.sleep(5)
-                success = True
+                except Exception as e:
+                    print(f"Request error: {e}")
+                    time.sleep(5)
+                    success = True
 
-        # Save Checkpoint every 20 threads
-        if (index + 1) % 20 == 0:
-            pd.DataFrame(final_dataset, columns=["text"]).drop_duplicates().to_csv(OUTPUT_FILE, index=False)
+        # Final Save
+        writer.compact()
+        writer.close()
+        if seen is not None:
+            seen.close()
+        print(f"\nSUCCESS! Total Unique Rows: {writer.count}")
 
-    # Final Save
-    df = pd.DataFrame(final_dataset, columns=["text"]).drop_duplicates()
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"\nSUCCESS! Total Unique Rows: {len(df)}")
+    except Exception as e:
+        print(f"System Error: {e}")
 
-except Exception as e:
-    print(f"System Error: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
-import pandas as pd
 import time
-import random
-import requests
 import json
 import os
+import sys
+import asyncio
 from datetime import datetime, timedelta
 
+# Shared helpers live in the repo-level `redditscrape` package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from redditscrape.writer import StreamingCSVWriter
+from redditscrape.ratelimit import AdaptiveRateLimiter
+from redditscrape.httpclient import AsyncClient, SyncClient, RetryPolicy
+from redditscrape.metrics import metrics, MetricsExporter
+
 TARGET_SUBS = [
     # Major Cities & Regions
     "pakistan", "karachi", "islamabad", "lahore", "peshawar", "quetta", "multan", "faisalabad", "rawalpindi", "kashmir", "gilgitbaltistan",
@@ -24,11 +30,35 @@ TARGET_SUBS = [
 ]
 
 SORT_ORDERS = ["controversial", "top", "new", "hot"]
-GOAL_LINKS = 50000 # Change to as many links you want
+GOAL_LINKS = 50000 # New links per collection pass (links stored by earlier passes don't count)
 OUTPUT_FILE = "links2.csv"
 PROGRESS_FILE = "link_scrape_progress.json"
+LINK_INDEX = "links2.idx"  # Hash index of stored links (dedup without loading the CSV)
+LISTING_BASE_URL = "https://old.reddit.com"    # Listings are read from here
+PERMALINK_BASE_URL = "https://www.reddit.com"  # Stored links point here
 MAX_PAGES_PER_SORT = 40  # 40 pages × 100 posts = 4000 posts max per sort
-REQUEST_DELAY = (2.0, 4.0)  # Random delay range in seconds (unauthenticated = 10 req/min)
+MAX_RETRIES = 5  # Attempts per page (timeouts, 5xx, 429s) before the sort is skipped
+
+# INCREMENTAL REFRESH
+# Per-(sub, sort) high-water marks survive between runs. `new` stops paging as
+# soon as it reaches a post at or below the newest post ID of the last
+# finished pass; the other sorts are only walked again once their interval
+# has passed since their last finished pass (0 = every run).
+HIGH_WATER_FILE = "link_high_water.json"
+REFRESH_EVERY = {"new": 0, "hot": 1 * 86400, "top": 7 * 86400, "controversial": 7 * 86400}
+
+# ASYNC COLLECTION MODE
+# "async" runs many (sub, sort) cursors at once under one shared rate budget,
+# "sync" walks them one at a time. Both pace requests with the same
+# adaptive rate limiter (GLOBAL_REQUESTS_PER_MINUTE until Reddit's headers say otherwise).
+COLLECTION_MODE = "async"
+GLOBAL_REQUESTS_PER_MINUTE = 10  # Shared budget across ALL cursors (until X-Ratelimit headers say otherwise)
+MAX_CONCURRENT_CURSORS = 16      # (sub, sort) listings paginated in parallel
+
+# METRICS (requests by status, limiter waits, listing latency, links added)
+METRICS_FILE = "link_metrics.prom"  # ".json" for JSON; None disables the file
+METRICS_FLUSH_SECONDS = 15
+METRICS_PORT = None  # e.g. 9109 -> http://127.0.0.1:9109/metrics
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) RedditLinkScraper/2.0 by ScrapeUmer'
@@ -36,15 +66,105 @@ headers = {
 
 
 # PROGRESS TRACKING (Resume Support)
-def save_progress(completed_subs, collected_links):
-    """Save current progress to resume after crash/interrupt."""
+# cursors: {"sub/sort": {"after": last token, "pages": pages done, "done": bool}}
+def save_progress(completed_subs, cursors, total_links):
+    """Save current progress to resume after crash/interrupt (atomic replace)."""
     data = {
         'completed_subs': completed_subs,
-        'total_links': len(collected_links),
+        'cursors': cursors,
+        'total_links': total_links,
+        'pass_start_links': pass_start_links,
         'timestamp': datetime.now().isoformat()
     }
-    with open(PROGRESS_FILE, 'w') as f:
+    tmp = PROGRESS_FILE + ".tmp"
+    with open(tmp, 'w') as f:
         json.dump(data, f)
+    os.replace(tmp, PROGRESS_FILE)
+
+def goal_met(link_store):
+    """True once this collection pass (resumes included) has added GOAL_LINKS links."""
+    return link_store.count - pass_start_links >= GOAL_LINKS
+
+def get_cursor(cursors, sub, sort):
+    """Checkpointed pagination state of one (sub, sort) listing."""
+    return cursors.setdefault(f"{sub}/{sort}", {'after': None, 'pages': 0, 'done': False})
+
+def finish_sub(sub, completed_subs, cursors, total_links):
+    """Mark a subreddit complete; its per-sort cursors are no longer needed."""
+    completed_subs.append(sub)
+    for sort in SORT_ORDERS:
+        cursors.pop(f"{sub}/{sort}", None)
+    save_progress(completed_subs, cursors, total_links)
+
+# HIGH-WATER MARKS (Incremental Refresh)
+# high_water: {"sub/sort": {"newest_id": base36 id, "newest_utc": created_utc, "finished": epoch}}
+high_water = {}
+# Links stored before this collection pass began; GOAL_LINKS counts from here
+pass_start_links = 0
+
+def load_high_water():
+    try:
+        with open(HIGH_WATER_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_high_water():
+    tmp = HIGH_WATER_FILE + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(high_water, f, indent=1)
+    os.replace(tmp, HIGH_WATER_FILE)
+
+def sort_due(sub, sort):
+    """False if this listing was finished less than REFRESH_EVERY[sort] seconds ago."""
+    mark = high_water.get(f"{sub}/{sort}")
+    if not mark:
+        return True
+    return time.time() - mark.get('finished', 0) >= REFRESH_EVERY.get(sort, 0)
+
+def read_page(children, sub, sort, cursor):
+    """
+    Permalinks of one listing page, plus whether `new` has reached the
+    previous run's newest post (known territory, stop paging). The newest
+    post seen is kept in the cursor and only becomes the high-water mark when
+    the pass finishes, so an interrupted pass never skips its unvisited gap.
+    """
+    mark = high_water.get(f"{sub}/{sort}", {})
+    known_id = int(mark['newest_id'], 36) if sort == "new" and mark.get('newest_id') else None
+    urls = []
+    for child in children:
+        post_data = child.get('data', {})
+        post_id = post_data.get('id', '')
+        if post_id:
+            if known_id is not None and int(post_id, 36) <= known_id:
+                return urls, True
+            newest = cursor.get('newest_id')
+            if not newest or int(post_id, 36) > int(newest, 36):
+                cursor.update(newest_id=post_id, newest_utc=post_data.get('created_utc'))
+        permalink = post_data.get('permalink', '')
+        if permalink:
+            urls.append(f"{PERMALINK_BASE_URL}{permalink}")
+    return urls, False
+
+def finish_sort(sub, sort, cursor):
+    """Close a finished (sub, sort) pass: advance its high-water mark."""
+    cursor['done'] = True
+    mark = high_water.setdefault(f"{sub}/{sort}", {})
+    if cursor.get('newest_id') and (not mark.get('newest_id')
+                                    or int(cursor['newest_id'], 36) > int(mark['newest_id'], 36)):
+        mark.update(newest_id=cursor['newest_id'], newest_utc=cursor.get('newest_utc'))
+    mark['finished'] = time.time()
+    save_high_water()
+
+def leave_sort(cursors, completed_subs, link_store, new_count):
+    """
+    Stop a (sub, sort) pass that failed part-way: its cursor stays open at
+    the last page that was read, and the high-water mark and `finished` stay
+    as the last complete pass left them, so the posts past the failure are
+    not treated as known. Returns new_count.
+    """
+    save_progress(completed_subs, cursors, link_store.count)
+    return new_count
 
 def load_progress():
     """Load progress from previous run."""
@@ -83,119 +203,245 @@ def estimate_eta(elapsed, done, total):
     return format_duration(remaining)
 
 # SCRAPING LOGIC (JSON API)
-def scrape_subreddit(sub, sort, collected_links):
+def scrape_subreddit(client, sub, sort, link_store, cursors, completed_subs):
     """
     Scrape links from a subreddit using old.reddit.com JSON API.
     Uses the `after` parameter for pagination instead of Selenium page clicking.
-    Returns number of new links found.
+    Each page's new links are appended to link_store and the cursor (last
+    `after` token) checkpointed, so a restart continues mid-sort. Pages are
+    paced by the client's rate limiter. Only the real end of the listing
+    closes the sort (finish_sort); a failed page leaves it open, without
+    moving its high-water mark. Returns number of new links found.
     """
-    base_url = f"https://old.reddit.com/r/{sub}/{sort}.json"
+    cursor = get_cursor(cursors, sub, sort)
+    if cursor['done']:
+        return 0
+    if not cursor['pages'] and not sort_due(sub, sort):
+        cursor['done'] = True  # Refreshed recently; the mark stays as it is
+        return 0
+    
+    base_url = f"{LISTING_BASE_URL}/r/{sub}/{sort}.json"
     params = {
         'limit': 100,
         't': 'all',  # Time range: all time
         'raw_json': 1
     }
+    if cursor['after']:
+        params['after'] = cursor['after']
     
     new_count = 0
-    page = 0
+    page = cursor['pages']
     
     while page < MAX_PAGES_PER_SORT:
         try:
-            response = requests.get(base_url, params=params, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                children = data.get('data', {}).get('children', [])
-                
-                if not children:
-                    break
-                
-                page_new = 0
-                for child in children:
-                    post_data = child.get('data', {})
-                    permalink = post_data.get('permalink', '')
-                    if permalink:
-                        full_url = f"https://www.reddit.com{permalink}"
-                        if full_url not in collected_links:
-                            collected_links.add(full_url)
-                            new_count += 1
-                            page_new += 1
-                
-                # Get the `after` token for next page
-                after = data.get('data', {}).get('after')
-                if not after or page_new == 0:
-                    break  # No more pages or no new links
-                
-                params['after'] = after
-                page += 1
-                
-                # Rate limiting delay
-                time.sleep(random.uniform(*REQUEST_DELAY))
-                
-            elif response.status_code == 429:
-                print(f"      ⚠️  Rate limited (429). Waiting 60s...")
-                time.sleep(60)
-                continue  # Retry same page
-                
-            elif response.status_code == 403:
-                # Subreddit might be private/banned
-                break
-                
-            elif response.status_code == 404:
-                break
-                
-            else:
-                print(f"      ⚠️  HTTP {response.status_code}. Retrying in 10s...")
-                time.sleep(10)
-                continue
-                
-        except requests.exceptions.Timeout:
-            print(f"      ⚠️  Timeout. Retrying in 5s...")
-            time.sleep(5)
-            continue
+            status, data, _ = client.get_json(base_url, params=params, endpoint='listing')
         except Exception as e:
-            print(f"      ⚠️  Error: {str(e)[:60]}. Skipping sort.")
+            print(f"      ⚠️  Error: {str(e)[:60]}. Skipping sort for now.")
+            return leave_sort(cursors, completed_subs, link_store, new_count)
+        
+        if status in (403, 404):
+            # Subreddit might be private/banned
             break
+        if status != 200:
+            print(f"      ⚠️  HTTP {status} after {MAX_RETRIES} attempts. Skipping sort for now.")
+            return leave_sort(cursors, completed_subs, link_store, new_count)
+        
+        children = data.get('data', {}).get('children', [])
+        if not children:
+            break
+        
+        page_urls, reached_known = read_page(children, sub, sort, cursor)
+        page_new = link_store.write_batch(page_urls)
+        new_count += page_new
+        metrics.inc('links_added', page_new, sort=sort)
+        metrics.set('links_total', link_store.count)
+        
+        # Get the `after` token for next page
+        after = data.get('data', {}).get('after')
+        if not after or page_new == 0 or reached_known:
+            break  # No more pages, no new links, or caught up with the last run
+        
+        params['after'] = after
+        page += 1
+        cursor.update(after=after, pages=page)
+        save_progress(completed_subs, cursors, link_store.count)
     
+    finish_sort(sub, sort, cursor)
+    save_progress(completed_subs, cursors, link_store.count)
     return new_count
 
+# ASYNC COLLECTION (many cursors, one global rate limit)
+async def scrape_subreddit_async(client, sub, sort, link_store, cursors, completed_subs, goal_reached):
+    """
+    Async twin of scrape_subreddit: same `after` pagination, cursor
+    checkpoints and stop rules, but pacing comes from the client's shared
+    rate limiter, shared by every cursor. Returns number of new links found.
+    """
+    cursor = get_cursor(cursors, sub, sort)
+    if cursor['done']:
+        return 0
+    if not cursor['pages'] and not sort_due(sub, sort):
+        cursor['done'] = True
+        return 0
+    
+    base_url = f"{LISTING_BASE_URL}/r/{sub}/{sort}.json"
+    params = {
+        'limit': 100,
+        't': 'all',
+        'raw_json': 1
+    }
+    if cursor['after']:
+        params['after'] = cursor['after']
+    
+    new_count = 0
+    page = cursor['pages']
+    
+    while page < MAX_PAGES_PER_SORT and not goal_reached.is_set():
+        try:
+            status, data, _ = await client.get_json(base_url, params=params, endpoint='listing')
+        except Exception as e:
+            print(f"      ⚠️  r/{sub}/{sort} error: {str(e)[:60]}. Skipping sort for now.")
+            return leave_sort(cursors, completed_subs, link_store, new_count)
+        
+        if status in (403, 404):
+            break
+        if status != 200:
+            print(f"      ⚠️  r/{sub}/{sort} HTTP {status} after {MAX_RETRIES} attempts. Skipping sort for now.")
+            return leave_sort(cursors, completed_subs, link_store, new_count)
+        
+        children = data.get('data', {}).get('children', [])
+        if not children:
+            break
+        
+        page_urls, reached_known = read_page(children, sub, sort, cursor)
+        page_new = link_store.write_batch(page_urls)
+        new_count += page_new
+        metrics.inc('links_added', page_new, sort=sort)
+        metrics.set('links_total', link_store.count)
+        
+        if goal_met(link_store):
+            goal_reached.set()
+        
+        after = data.get('data', {}).get('after')
+        if not after or page_new == 0 or reached_known:
+            break
+        
+        params['after'] = after
+        page += 1
+        cursor.update(after=after, pages=page)
+        save_progress(completed_subs, cursors, link_store.count)
+    else:
+        if goal_reached.is_set():
+            # Stopped early for the goal: keep the cursor open to continue later
+            return new_count
+    
+    finish_sort(sub, sort, cursor)
+    save_progress(completed_subs, cursors, link_store.count)
+    return new_count
+
+async def collect_links_async(remaining_subs, link_store, cursors, completed_subs):
+    """
+    Run every (sub, sort) cursor through a pool of MAX_CONCURRENT_CURSORS
+    workers sharing one AdaptiveRateLimiter. A subreddit is checkpointed (and
+    added to completed_subs) once all of its sort orders have finished, so
+    resume works exactly as in sync mode.
+    """
+    rate_limiter = AdaptiveRateLimiter(GLOBAL_REQUESTS_PER_MINUTE)
+    goal_reached = asyncio.Event()
+    if goal_met(link_store):
+        goal_reached.set()
+    
+    queue = asyncio.Queue()
+    for sub in remaining_subs:
+        for sort in SORT_ORDERS:
+            queue.put_nowait((sub, sort))
+    
+    sorts_left = {sub: len(SORT_ORDERS) for sub in remaining_subs}
+    sub_new = {sub: 0 for sub in remaining_subs}
+    sub_start = {}
+    global_start = time.time()
+    
+    async def worker():
+        while not goal_reached.is_set():
+            try:
+                sub, sort = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            sub_start.setdefault(sub, time.time())
+            sort_new = await scrape_subreddit_async(
+                client, sub, sort, link_store, cursors, completed_subs, goal_reached
+            )
+            sub_new[sub] += sort_new
+            if sort_new > 0:
+                print(f" r/{sub}/{sort}: +{sort_new} links")
+            
+            sorts_left[sub] -= 1
+            if sorts_left[sub] == 0 and all(get_cursor(cursors, sub, s)['done'] for s in SORT_ORDERS):
+                finish_sub(sub, completed_subs, cursors, link_store.count)
+                elapsed_total = time.time() - global_start
+                done = len(remaining_subs) - sum(1 for left in sorts_left.values() if left > 0)
+                eta = estimate_eta(elapsed_total, done, len(remaining_subs))
+                print(f" r/{sub} done: +{sub_new[sub]} new | {format_duration(time.time() - sub_start[sub])} "
+                      f"| Total: {link_store.count:,} | Subs: {len(completed_subs)}/{len(TARGET_SUBS)} | ETA: {eta}\n")
+    
+    client = AsyncClient(headers, rate_limiter, connections=MAX_CONCURRENT_CURSORS, retry=RetryPolicy(MAX_RETRIES))
+    async with client:
+        await asyncio.gather(*(worker() for _ in range(MAX_CONCURRENT_CURSORS)))
+    
+    if goal_reached.is_set():
+        print(f"\n Goal of {GOAL_LINKS:,} links reached!")
+
 # MAIN
 def main():
+    global high_water, pass_start_links
+    high_water = load_high_water()
     print(f"\n{'='*70}")
     print(f"🚀 REDDIT LINK SCRAPER v2.0 (JSON API)")
     print(f"{'='*70}")
     print(f"  Method:     JSON API (no browser needed)")
+    print(f"  Mode:       {COLLECTION_MODE}" + (f" ({MAX_CONCURRENT_CURSORS} cursors, {GLOBAL_REQUESTS_PER_MINUTE} req/min shared)" if COLLECTION_MODE == "async" else f" ({GLOBAL_REQUESTS_PER_MINUTE} req/min)"))
     print(f"  Subreddits: {len(TARGET_SUBS)}")
     print(f"  Sort orders: {', '.join(SORT_ORDERS)}")
-    print(f"  Goal:       {GOAL_LINKS:,} links")
+    print(f"  Goal:       {GOAL_LINKS:,} new links")
+    print(f"  Refresh:    {len(high_water)} listings with high-water marks in {HIGH_WATER_FILE}")
     print(f"  Started:    {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*70}\n")
     
-    collected_links = set()
+    # Links are appended page by page; LINK_INDEX dedups without loading the CSV
+    link_store = StreamingCSVWriter(OUTPUT_FILE, LINK_INDEX, column="url")
+    exporter = MetricsExporter(metrics, path=METRICS_FILE, interval=METRICS_FLUSH_SECONDS, port=METRICS_PORT)
     completed_subs = []
+    cursors = {}
     
     # Resume from previous run if available
     progress = load_progress()
+    pass_start_links = link_store.count
     if progress:
         completed_subs = progress.get('completed_subs', [])
-        # Reload existing links from CSV
-        try:
-            existing_df = pd.read_csv(OUTPUT_FILE)
-            collected_links = set(existing_df['url'].tolist())
-            print(f"🔄 RESUMING: {len(collected_links)} links from previous run")
-            print(f"   Skipping {len(completed_subs)} already-completed subreddits\n")
-        except:
-            completed_subs = []
+        cursors = progress.get('cursors', {})
+        pass_start_links = progress.get('pass_start_links', pass_start_links)
+        open_cursors = sum(1 for c in cursors.values() if not c['done'])
+        print(f"🔄 RESUMING: {link_store.count} links from previous run")
+        print(f"   Skipping {len(completed_subs)} already-completed subreddits, continuing {open_cursors} unfinished sorts\n")
     
     # Filter out already-completed subs
     remaining_subs = [s for s in TARGET_SUBS if s not in completed_subs]
     total_subs = len(remaining_subs)
     
     global_start = time.time()
+    client = None
     
     try:
+        if COLLECTION_MODE == "async":
+            asyncio.run(collect_links_async(remaining_subs, link_store, cursors, completed_subs))
+            remaining_subs = []
+        else:
+            # One keep-alive session for every page of every listing, paced like async mode
+            client = SyncClient(headers, AdaptiveRateLimiter(GLOBAL_REQUESTS_PER_MINUTE), connections=1,
+                                retry=RetryPolicy(MAX_RETRIES))
+        
         for idx, sub in enumerate(remaining_subs):
-            if len(collected_links) >= GOAL_LINKS:
+            if goal_met(link_store):
                 print(f"\n Goal of {GOAL_LINKS:,} links reached!")
                 break
             
@@ -204,26 +450,24 @@ def main():
             eta = estimate_eta(elapsed_total, idx, total_subs) if idx > 0 else "calculating..."
             
             print(f"[{idx+1}/{total_subs}] r/{sub}")
-            print(f"  ⏱ Elapsed: {format_duration(elapsed_total)} | ETA: {eta} | Links: {len(collected_links):,}")
+            print(f"  ⏱ Elapsed: {format_duration(elapsed_total)} | ETA: {eta} | Links: {link_store.count:,}")
             
             sub_new = 0
             for sort in SORT_ORDERS:
-                sort_new = scrape_subreddit(sub, sort, collected_links)
+                sort_new = scrape_subreddit(client, sub, sort, link_store, cursors, completed_subs)
                 sub_new += sort_new
                 if sort_new > 0:
                     print(f" /{sort}: +{sort_new} links")
                 
-                if len(collected_links) >= GOAL_LINKS:
+                if goal_met(link_store):
                     break
             
             sub_time = time.time() - sub_start
-            print(f" r/{sub} done: +{sub_new} new | {format_duration(sub_time)} | Total: {len(collected_links):,}\n")
+            print(f" r/{sub} done: +{sub_new} new | {format_duration(sub_time)} | Total: {link_store.count:,}\n")
             
-            # Save checkpoint after each subreddit
-            completed_subs.append(sub)
-            if collected_links:
-                pd.DataFrame(list(collected_links), columns=["url"]).to_csv(OUTPUT_FILE, index=False)
-                save_progress(completed_subs, collected_links)
+            # Links and cursors are checkpointed per page; close out the subreddit
+            if all(get_cursor(cursors, sub, s)['done'] for s in SORT_ORDERS):
+                finish_sub(sub, completed_subs, cursors, link_store.count)
     
     except KeyboardInterrupt:
         print(f"\n Interrupted! Progress saved. Run again to resume.")
@@ -231,15 +475,19 @@ def main():
     finally:
         # Final save
         total_time = time.time() - global_start
-        if collected_links:
-            df = pd.DataFrame(list(collected_links), columns=["url"])
-            df.to_csv(OUTPUT_FILE, index=False)
-            save_progress(completed_subs, collected_links)
+        save_progress(completed_subs, cursors, link_store.count)
+        if client is not None:
+            client.close()
+        link_store.compact()
+        link_store.close()
+        metrics.set('links_total', link_store.count)
+        metrics.set('subs_completed', len(completed_subs))
+        exporter.close()
         
         print(f"\n{'='*70}")
         print(f"FINAL RESULTS")
         print(f"{'='*70}")
-        print(f"  Total links:  {len(collected_links):,}")
+        print(f"  Total links:  {link_store.count:,}")
         print(f"  Total time:   {format_duration(total_time)}")
         print(f"  Subs scraped: {len(completed_subs)}/{len(TARGET_SUBS)}")
         if len(completed_subs) > 0:
@@ -249,9 +497,13 @@ def main():
         print(f"{'='*70}\n")
         
         # Clean up progress file only if fully complete
-        if len(completed_subs) >= len(TARGET_SUBS) or len(collected_links) >= GOAL_LINKS:
+        if len(completed_subs) >= len(TARGET_SUBS) or goal_met(link_store):
             cleanup_progress()
             print(" Scrape complete! Progress file cleaned up.")
+        else:
+            stopped = sum(1 for c in cursors.values() if not c['done'])
+            if stopped:
+                print(f" {stopped} sorts still open (errors or interrupt): run again to continue them from their saved page.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
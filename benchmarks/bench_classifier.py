@@ -0,0 +1,177 @@
+"""
+Classifier benchmark: the original fastText-first classify_comment vs the
+tiered cascade in classify_bodies, on one core. Both predict one text per
+fastText call; the cascade makes fewer of them, and its verdict cache
+answers repeated texts (--no-cache shows the cascade alone).
+
+The committed corpora are comments that were already kept, so on their own
+they say little about a crawl, where most comments are English. The input
+mixes them with the post titles of ScrapeLinks/links1.csv (read from the URL
+slugs), the fixture filler lines, and a few Nastaliq and European-language
+comments. Bodies go through in CLASSIFY_CHUNK_SIZE jobs, like the worker
+pool sends them, and the fastText cache is emptied before every repeat.
+
+Reports comments/s, fastText predictions (one per text sent to the
+model) and rejections per tier. Exits 1 if the kept texts differ in any way.
+
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --urdu-share 0.1  # mostly English, like a crawl
+    python benchmarks/bench_classifier.py --no-fasttext     # keyword tiers only
+    python benchmarks/bench_classifier.py --no-cache        # no fastText verdict cache
+
+Needs fast-langdetect for the fastText tier.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_end_to_end import load_script
+from fixtures import FILLER, ROOT, load_corpus
+
+LINKS = os.path.join(ROOT, "ScrapeLinks", "links1.csv")
+OTHER = [
+    "یار یہ تو بہت اچھی بات ہے، شکریہ",
+    "Je ne suis pas d'accord avec toi sur ce point, franchement.",
+    "No estoy seguro de que eso sea verdad, pero gracias por compartir.",
+    "Das ist wirklich eine gute Idee, ich werde es morgen versuchen.",
+    "Saya tidak tahu apa yang terjadi di sana kemarin malam.",
+]
+
+
+def load_bodies(urdu_share=None):
+    """
+    The mixed input. With `urdu_share`, only as many corpus comments are
+    used (spread evenly) as make up that share of it.
+    """
+    bodies = []
+    with open(LINKS, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            slug = row['url'].rstrip('/').rsplit('/', 1)[-1]
+            bodies.append(slug.replace('_', ' '))
+    bodies.extend(FILLER * 200)
+    bodies.extend(OTHER * 200)
+    corpus = load_corpus()
+    if urdu_share is not None:
+        n = min(len(corpus), int(len(bodies) * urdu_share / (1 - urdu_share)))
+        corpus = [corpus[i * len(corpus) // n] for i in range(n)] if n else []
+    # Interleave, so every job gets its share of each kind
+    step = len(bodies) / max(1, len(corpus))
+    mixed = []
+    for i, text in enumerate(corpus):
+        mixed.append(text)
+        mixed.extend(bodies[int(i * step):int((i + 1) * step)])
+    return mixed + bodies[int(len(corpus) * step):] if corpus else bodies
+
+
+def make_legacy(scraper):
+    """classify_comment as it was: fastText on every comment of 3+ words, one call each."""
+    def legacy_reject_reason(text):
+        text_lower = text.lower()
+        words = text_lower.split()
+        if len(words) < 3:
+            return 'too_short'
+        if scraper.FASTTEXT_AVAILABLE:
+            try:
+                results = scraper.ft_detect(text, model='lite')
+                if results and results[0].get('lang', '') in scraper.NON_URDU_LANGS \
+                        and results[0].get('score', 0) > 0.5:
+                    return 'fasttext'
+            except Exception:
+                pass
+        if not scraper.ROMAN_URDU_SCORER.matches_tokens(text_lower, words):
+            return 'low_ratio'
+        return None
+
+    def legacy(bodies):
+        kept, rejected = [], {}
+        for body in bodies:
+            if not body:
+                reason = 'empty'
+            elif scraper.contains_urdu_script(body):
+                reason = 'nastaliq'
+            else:
+                reason = legacy_reject_reason(body)
+                if reason is None:
+                    clean_text = body.replace("\n", " ").replace("\r", " ").strip()
+                    if len(clean_text) > 10:
+                        kept.append(clean_text)
+                        continue
+                    reason = 'too_short'
+            rejected[reason] = rejected.get(reason, 0) + 1
+        return kept, rejected, {'fasttext_model': sum(1 for b in bodies if len(b.split()) >= 3
+                                                      and not scraper.contains_urdu_script(b))
+                                if scraper.FASTTEXT_AVAILABLE else 0}
+    return legacy
+
+
+def make_cascade(scraper):
+    def cascade(bodies):
+        scraper._ft_verdicts.clear()
+        kept, rejected, fasttext = [], {}, {}
+        for n in range(0, len(bodies), scraper.CLASSIFY_CHUNK_SIZE):
+            chunk_kept, chunk_rejected, _, chunk_fasttext = scraper.classify_bodies(
+                bodies[n:n + scraper.CLASSIFY_CHUNK_SIZE])
+            kept.extend(chunk_kept)
+            for counts, add in ((rejected, chunk_rejected), (fasttext, chunk_fasttext)):
+                for key, count in add.items():
+                    counts[key] = counts.get(key, 0) + count
+        return kept, rejected, fasttext
+    return cascade
+
+
+def best_of(fn, bodies, repeats):
+    best, out = None, None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn(bodies)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fastText-first vs cascade comment classification")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--no-fasttext', action='store_true', help="keyword tiers only")
+    parser.add_argument('--no-cache', action='store_true', help="cascade without the fastText verdict cache")
+    parser.add_argument('--urdu-share', type=float,
+                        help="share of Roman Urdu corpus comments in the input (default: all of them, ~60%%)")
+    args = parser.parse_args()
+
+    scraper = load_script('comments')
+    if args.no_fasttext:
+        scraper.FASTTEXT_AVAILABLE = False
+    if args.no_cache:
+        scraper.FASTTEXT_CACHE_SIZE = 0
+    bodies = load_bodies(args.urdu_share)
+    # Load the model outside the timings
+    scraper.classify_bodies(bodies[:10])
+
+    results = []
+    for name, fn in (("fastText first", make_legacy(scraper)), ("cascade", make_cascade(scraper))):
+        seconds, (kept, rejected, fasttext) = best_of(fn, bodies, args.repeats)
+        results.append((name, seconds, kept, rejected, fasttext))
+
+    print(f"\n{len(bodies):,} comments, fastText {'on' if scraper.FASTTEXT_AVAILABLE else 'off'}, "
+          f"{'no verdict cache, ' if args.no_cache else ''}best of {args.repeats}, one core")
+    tiers = scraper.CLASSIFY_TIERS
+    print(f"{'Classifier':<16}{'Comments/s':>12}{'Speedup':>9}{'fastText predictions':>22}{'Kept':>8}"
+          + ''.join(f"{t:>11}" for t in tiers))
+    base = results[0][1]
+    for name, seconds, kept, rejected, fasttext in results:
+        print(f"{name:<16}{len(bodies) / seconds:>12,.0f}{base / seconds:>8.1f}x"
+              f"{fasttext.get('fasttext_model', 0):>22,}{len(kept):>8,}"
+              + ''.join(f"{rejected.get(t, 0):>11,}" for t in tiers))
+
+    if results[0][2] != results[1][2]:
+        print("\n❌ Kept texts differ")
+        return 1
+    print("\n✅ Same kept texts, in the same order")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
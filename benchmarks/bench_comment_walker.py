@@ -0,0 +1,89 @@
+"""
+Benchmark: recursive get_comments_from_json walk vs iter_comment_tree.
+
+Walks every thread fixture (benchmarks/fixtures/*.json[.gz]) with the
+original recursive extractor and with the structure-aware iterative walker,
+checks both return the same bodies and `more` IDs, and reports nodes visited
+and time per walk. Classification is left out so only traversal is measured.
+
+    python benchmarks/bench_comment_walker.py
+"""
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fixtures import ROOT, load_fixtures
+
+REPEATS = 20
+
+
+def load_scraper():
+    path = os.path.join(ROOT, "CommentScraping(Fast)", "CommentScraper.py")
+    spec = importlib.util.spec_from_file_location("fast_comment_scraper", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_walk(data, bodies, more_ids, stats):
+    """The original recursive traversal (minus classification), counting nodes."""
+    stats['nodes'] += 1
+    if isinstance(data, dict):
+        if data.get('kind') == 't1':
+            body = data.get('data', {}).get('body', '')
+            if body:
+                bodies.append(body)
+        elif data.get('kind') == 'more':
+            children = data.get('data', {}).get('children', [])
+            if children:
+                more_ids.extend(children)
+        for key, value in data.items():
+            legacy_walk(value, bodies, more_ids, stats)
+    elif isinstance(data, list):
+        for item in data:
+            legacy_walk(item, bodies, more_ids, stats)
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    scraper = load_scraper()
+    failures = 0
+    for name, thread in load_fixtures().items():
+        legacy_stats = {'nodes': 0}
+        legacy_bodies, legacy_more = [], []
+        legacy_walk(thread, legacy_bodies, legacy_more, legacy_stats)
+
+        new_stats = {'nodes': 0}
+        new_bodies, new_more = [], []
+        for kind, payload in scraper.iter_comment_tree(thread, new_stats):
+            if kind == 't1':
+                if payload.get('body'):
+                    new_bodies.append(payload['body'])
+            else:
+                new_more.extend(payload)
+
+        same = legacy_bodies == new_bodies and legacy_more == new_more
+        failures += not same
+
+        legacy_time = best_of(lambda: legacy_walk(thread, [], [], {'nodes': 0}))
+        new_time = best_of(lambda: scraper.extract_comment_bodies(thread, []))
+
+        print(f"{name}: {len(new_bodies):,} comments, {len(new_more):,} more IDs, identical output: {same}")
+        print(f"  Recursive: {legacy_stats['nodes']:>9,} nodes  {legacy_time * 1e3:8.2f} ms")
+        print(f"  Iterative: {new_stats['nodes']:>9,} nodes  {new_time * 1e3:8.2f} ms"
+              f"  ({legacy_stats['nodes'] / new_stats['nodes']:.1f}x fewer nodes, {legacy_time / new_time:.1f}x faster)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+End-to-end throughput benchmark against the local mock Reddit server.
+
+Starts benchmarks/mock_reddit.py, then runs the real link collector
+(ScrapeLinks/getLinks.py, async mode) and the Fast comment scraper on top of
+its output, each in its own process and in a scratch directory, with only
+the URLs and file names pointed at the mock. Reports per stage:
+
+    wall time, requests/s, comments/s (comments served by the mock),
+    CPU time (user + sys, including worker processes) and peak RSS
+
+    python benchmarks/bench_end_to_end.py
+    python benchmarks/bench_end_to_end.py --subs 8 --posts 500 --latency 0.05 --error-rate 0.02
+
+Needs aiohttp and a POSIX system (CPU/RSS come from os.wait4).
+"""
+import argparse
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fixtures import ROOT
+
+MOCK_SERVER = os.path.join(ROOT, "benchmarks", "mock_reddit.py")
+SCRIPTS = {
+    'links': os.path.join(ROOT, "ScrapeLinks", "getLinks.py"),
+    'comments': os.path.join(ROOT, "CommentScraping(Fast)", "CommentScraper.py"),
+}
+SUB_NAMES = ["karachi", "lahore", "islamabad", "pakistan", "peshawar", "quetta",
+             "multan", "faisalabad", "rawalpindi", "sialkot", "hyderabad", "gujranwala"]
+
+
+def load_script(name):
+    # Imported under its real module name so worker processes can unpickle
+    # the classifier functions it hands to its process pool
+    path = SCRIPTS[name]
+    sys.path.insert(0, os.path.dirname(path))
+    return importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+
+
+def run_stage(stage, base_url, args):
+    """Child-process entry point: configure one script for the mock and run it."""
+    if stage == 'links':
+        links = load_script('links')
+        links.TARGET_SUBS = SUB_NAMES[:args.subs]
+        links.GOAL_LINKS = 10 ** 9
+        links.MAX_PAGES_PER_SORT = 10 ** 6
+        links.LISTING_BASE_URL = links.PERMALINK_BASE_URL = base_url
+        links.GLOBAL_REQUESTS_PER_MINUTE = args.budget
+        links.OUTPUT_FILE, links.LINK_INDEX = "links.csv", "links.idx"
+        links.main()
+    else:
+        scraper = load_script('comments')
+        scraper.API_BASE_URL = base_url
+        scraper.INPUT_FILE = "links.csv"
+        scraper.OUTPUT_FILE, scraper.DEDUP_INDEX = "comments.csv", "comments.idx"
+        scraper.STATE_DB = "crawl_state.sqlite"
+        scraper.REQUESTS_PER_MINUTE = args.budget
+        scraper.CONCURRENT_REQUESTS = args.workers
+        if args.no_fasttext:
+            scraper.FASTTEXT_AVAILABLE = False
+        scraper.main()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def mock_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/__stats", timeout=5) as resp:
+        return json.load(resp)
+
+
+def wait_for_server(base_url, proc, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("mock server exited during startup")
+        try:
+            return mock_stats(base_url)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("mock server did not start")
+
+
+def measure(stage, base_url, workdir, argv):
+    """Run one stage in a child process; returns its metrics."""
+    before = mock_stats(base_url)
+    start = time.perf_counter()
+    with open(os.path.join(workdir, f"{stage}.log"), 'w') as log:
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--stage', stage,
+                                 '--base-url', base_url] + argv,
+                                cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    after = mock_stats(base_url)
+    if status != 0:
+        raise RuntimeError(f"{stage} stage failed, see {workdir}/{stage}.log")
+
+    requests = after['requests'] - before['requests'] - 1   # minus the /__stats call
+    comments = after['comments_served'] - before['comments_served']
+    return {
+        'stage': stage,
+        'wall': wall,
+        'requests': requests,
+        'rate_limited': after['rate_limited'] - before['rate_limited'],
+        'comments': comments,
+        'cpu': usage.ru_utime + usage.ru_stime,
+        # ru_maxrss is KB on Linux, bytes on macOS
+        'rss_mb': usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="End-to-end scraper benchmark against a mock Reddit")
+    parser.add_argument('--subs', type=int, default=4, help=f"subreddits to collect (max {len(SUB_NAMES)})")
+    parser.add_argument('--posts', type=int, default=200, help="posts per (sub, sort) listing")
+    parser.add_argument('--min-comments', type=int, default=20)
+    parser.add_argument('--max-comments', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.02, help="mock response latency, seconds")
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="injected 429 probability")
+    parser.add_argument('--budget', type=int, default=60000, help="mock requests per 60 s window")
+    parser.add_argument('--workers', type=int, default=8, help="comment fetch workers")
+    parser.add_argument('--no-fasttext', action='store_true', help="keyword-only classification")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch directory")
+    parser.add_argument('--stage', choices=sorted(SCRIPTS), help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.stage:
+        run_stage(args.stage, args.base_url, args)
+        return 0
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, MOCK_SERVER, '--port', str(port), '--posts', str(args.posts),
+        '--min-comments', str(args.min_comments), '--max-comments', str(args.max_comments),
+        '--latency', str(args.latency), '--jitter', str(args.jitter),
+        '--error-rate', str(args.error_rate), '--budget', str(args.budget),
+    ])
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    stage_argv = ['--subs', str(args.subs), '--budget', str(args.budget), '--workers', str(args.workers)]
+    if args.no_fasttext:
+        stage_argv.append('--no-fasttext')
+
+    try:
+        wait_for_server(base_url, server)
+        results = [measure(stage, base_url, workdir, stage_argv) for stage in ('links', 'comments')]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nMock: {args.subs} subs x 4 sorts x {args.posts} posts, {args.min_comments}-{args.max_comments} "
+          f"comments/thread, latency {args.latency}+{args.jitter}s, 429 rate {args.error_rate}, "
+          f"budget {args.budget}/min")
+    print(f"{'Stage':<10}{'Wall s':>9}{'Requests':>10}{'429s':>7}{'Req/s':>9}"
+          f"{'Comments':>10}{'Comm/s':>10}{'CPU s':>8}{'Peak RSS MB':>13}")
+    for r in results:
+        print(f"{r['stage']:<10}{r['wall']:>9.2f}{r['requests']:>10,}{r['rate_limited']:>7,}"
+              f"{r['requests'] / r['wall']:>9.1f}{r['comments']:>10,}{r['comments'] / r['wall']:>10.0f}"
+              f"{r['cpu']:>8.2f}{r['rss_mb']:>13.1f}")
+
+    if args.keep:
+        print(f"\nScratch directory: {workdir}")
+    else:
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Microbenchmarks for the filtering and parsing hot paths of both comment scrapers.
+
+Covers is_roman_urdu, contains_urdu_script, get_comments_from_json and
+extract_post_id in CommentScraping(Fast) and CommentScraping(Slow) (the Slow
+scraper has no extract_post_id). Inputs are the committed commentsScrape.csv
+corpora plus every comment body of the thread fixtures (which mixes in
+English filler, so both accept and reject paths run), the thread fixtures
+themselves, and the URLs in ScrapeLinks/links1.csv.
+
+For every function it reports:
+    per-call latency p50 / p90 / p99 / max   (one perf_counter_ns pair per call,
+                                             over --repeats passes after a warm-up)
+    items/s                                 (best of --repeats untimed passes)
+    peak / retained KB                      (tracemalloc over one pass)
+
+Results can be saved as a baseline and later runs compared against it, so a
+change to the marker sets or the walker comes with numbers:
+
+    python benchmarks/bench_hot_paths.py --save          # write benchmarks/baselines/hot_paths.json
+    python benchmarks/bench_hot_paths.py --compare       # exit 1 on a regression over --threshold
+
+Baselines are machine-specific, so save one on the machine you compare on
+(before making the change). fastText is disabled unless --fasttext is given,
+so the numbers only depend on this repo's code.
+"""
+import argparse
+import csv
+import gc
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fixtures import ROOT, load_corpus, load_fixtures
+
+SCRAPERS = {
+    'fast': os.path.join(ROOT, "CommentScraping(Fast)", "CommentScraper.py"),
+    'slow': os.path.join(ROOT, "CommentScraping(Slow)", "CommentScraper.py"),
+}
+LINKS_FILE = os.path.join(ROOT, "ScrapeLinks", "links1.csv")
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "hot_paths.json")
+# (function, input set, what one call processes)
+CASES = [
+    ('is_roman_urdu', 'texts', 'comments'),
+    ('contains_urdu_script', 'texts', 'comments'),
+    ('get_comments_from_json', 'threads', 'threads'),
+    ('extract_post_id', 'urls', 'urls'),
+]
+
+
+def load_scraper(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_comment_scraper", SCRAPERS[name])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_inputs():
+    threads = list(load_fixtures().values())
+    texts = load_corpus()
+    fast = load_scraper('fast')
+    for thread in threads:
+        fast.extract_comment_bodies(thread, texts)
+    with open(LINKS_FILE, newline='', encoding='utf-8') as f:
+        urls = [row['url'] for row in csv.DictReader(f) if row.get('url')]
+    return {'texts': texts, 'threads': threads, 'urls': urls}
+
+
+def call_for(module, func_name):
+    """A one-argument callable for the function under test, or None if the module lacks it."""
+    func = getattr(module, func_name, None)
+    if func is None:
+        return None
+    if func_name == 'get_comments_from_json':
+        return lambda thread: func(thread, [])
+    return func
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def measure(call, items, repeats):
+    for item in items:  # warm-up
+        call(item)
+
+    # Per-call latency distribution over all passes
+    perf_ns = time.perf_counter_ns
+    timings = []
+    for _ in range(repeats):
+        for item in items:
+            start = perf_ns()
+            call(item)
+            timings.append(perf_ns() - start)
+    timings.sort()
+
+    # Throughput: untimed passes, best of N
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for item in items:
+            call(item)
+        best = min(best, time.perf_counter() - start)
+
+    # Allocations over one pass
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for item in items:
+        call(item)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'calls': len(items),
+        'p50_us': percentile(timings, 0.50) / 1e3,
+        'p90_us': percentile(timings, 0.90) / 1e3,
+        'p99_us': percentile(timings, 0.99) / 1e3,
+        'max_us': timings[-1] / 1e3,
+        'items_per_sec': len(items) / best,
+        'peak_kb': (peak - base) / 1024,
+        'retained_kb': (current - base) / 1024,
+    }
+
+
+def run(repeats, use_fasttext):
+    inputs = load_inputs()
+    results = {}
+    for scraper in SCRAPERS:
+        module = load_scraper(scraper)
+        if not use_fasttext and hasattr(module, 'FASTTEXT_AVAILABLE'):
+            module.FASTTEXT_AVAILABLE = False
+        for func_name, input_name, unit in CASES:
+            call = call_for(module, func_name)
+            if call is None:
+                continue
+            result = measure(call, inputs[input_name], repeats)
+            result['unit'] = unit
+            results[f"{scraper}.{func_name}"] = result
+    return results
+
+
+def print_results(results):
+    print(f"{'Function':<30}{'Calls':>8}{'p50 µs':>9}{'p90 µs':>9}{'p99 µs':>9}{'max µs':>10}"
+          f"{'Items/s':>12}{'Peak KB':>10}{'Kept KB':>9}")
+    for name, r in results.items():
+        print(f"{name:<30}{r['calls']:>8,}{r['p50_us']:>9.2f}{r['p90_us']:>9.2f}{r['p99_us']:>9.2f}"
+              f"{r['max_us']:>10.1f}{r['items_per_sec']:>12,.0f}{r['peak_kb']:>10.1f}{r['retained_kb']:>9.1f}")
+
+
+def compare(results, baseline, threshold):
+    """Print changes against a saved baseline; returns the number of regressions."""
+    regressions = 0
+    print(f"\nAgainst baseline from {baseline['meta']['date']} ({baseline['meta']['python']}, "
+          f"{baseline['meta']['machine']}), threshold {threshold:.0%}:")
+    print(f"{'Function':<30}{'p50':>10}{'p99':>10}{'Items/s':>10}{'Peak KB':>10}")
+    for name, r in results.items():
+        old = baseline['results'].get(name)
+        if old is None:
+            print(f"{name:<30}  (not in baseline)")
+            continue
+        # Positive = worse for every column
+        changes = [
+            r['p50_us'] / old['p50_us'] - 1,
+            r['p99_us'] / old['p99_us'] - 1,
+            old['items_per_sec'] / r['items_per_sec'] - 1,
+            (r['peak_kb'] - old['peak_kb']) / max(old['peak_kb'], 1.0),
+        ]
+        worse = changes[0] > threshold or changes[2] > threshold
+        regressions += worse
+        print(f"{name:<30}" + "".join(f"{c:>+10.1%}" for c in changes) + ("   REGRESSION" if worse else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks for both comment scrapers")
+    parser.add_argument('--repeats', type=int, default=5, help="timed passes per function")
+    parser.add_argument('--fasttext', action='store_true', help="leave fastText enabled in is_roman_urdu")
+    parser.add_argument('--save', nargs='?', const=BASELINE, metavar='PATH', help="write results as a baseline")
+    parser.add_argument('--compare', nargs='?', const=BASELINE, metavar='PATH', help="compare with a baseline")
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help="relative slowdown of p50 or items/s counted as a regression")
+    args = parser.parse_args()
+
+    results = run(args.repeats, args.fasttext)
+    print_results(results)
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        status = 1 if compare(results, baseline, args.threshold) else 0
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'python': platform.python_version(),
+                    'machine': f"{platform.system()} {platform.machine()}",
+                    'fasttext': args.fasttext,
+                    'repeats': args.repeats,
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
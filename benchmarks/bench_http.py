@@ -0,0 +1,185 @@
+"""
+HTTP client benchmark: the old per-stage request code vs the shared pooled
+clients in redditscrape/httpclient.py, against the local mock Reddit.
+
+    sync listing pages    requests.get per page (old getLinks sync mode)
+                          vs SyncClient (one keep-alive session)
+    async thread fetches  aiohttp session as the Fast scraper built it
+                          vs AsyncClient, with --workers fetching at once
+
+Reports per client: requests, mean / p50 / p90 latency per request, TCP
+connections the mock accepted, and the Content-Encoding it answered with
+(the mock runs with --compress, so it honours Accept-Encoding like Reddit).
+The mock is plain HTTP on localhost, where a new connection costs almost
+nothing, so it adds --handshake seconds to each new connection's first
+response to stand in for TCP + TLS setup to Reddit (0 to measure without).
+
+    python benchmarks/bench_http.py
+    python benchmarks/bench_http.py --requests 500 --workers 8 --latency 0.02 --handshake 0.1
+    python benchmarks/bench_http.py --requests 12 --workers 2 --gap 20   # paced like the real budget
+
+Needs aiohttp and requests.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_end_to_end import free_port, mock_stats, wait_for_server
+from fixtures import ROOT, to_base36
+from mock_reddit import ID_BASE
+
+sys.path.insert(0, ROOT)
+from redditscrape.httpclient import AsyncClient, SyncClient
+
+MOCK_SERVER = os.path.join(ROOT, "benchmarks", "mock_reddit.py")
+HEADERS = {'User-Agent': 'bench_http/1.0'}
+
+
+def listing_request(base_url):
+    return f"{base_url}/r/karachi/new.json", {'limit': 100, 't': 'all', 'raw_json': 1}
+
+
+def thread_urls(base_url, n):
+    return [f"{base_url}/r/karachi/comments/{to_base36(ID_BASE + i)}/post.json?sort=controversial&limit=500"
+            for i in range(1, n + 1)]
+
+
+def summarize(name, latencies, connections, encoding):
+    latencies = sorted(latencies)
+    return {
+        'client': name,
+        'requests': len(latencies),
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p90_ms': latencies[int(len(latencies) * 0.9)] * 1000,
+        'connections': connections,
+        'encoding': encoding or 'identity',
+    }
+
+
+def measure(name, base_url, run):
+    """run() -> (latencies, Content-Encoding of the last response); counts the mock's new connections."""
+    before = mock_stats(base_url)['connections']
+    latencies, encoding = run()
+    connections = mock_stats(base_url)['connections'] - before
+    return summarize(name, latencies, connections, encoding)
+
+
+def sync_old(base_url, n):
+    import requests
+    url, params = listing_request(base_url)
+    latencies, encoding = [], None
+    for _ in range(n):
+        start = time.perf_counter()
+        response = requests.get(url, params=params, headers=HEADERS, timeout=30)
+        response.json()
+        latencies.append(time.perf_counter() - start)
+        encoding = response.headers.get('Content-Encoding')
+    return latencies, encoding
+
+
+def sync_new(base_url, n):
+    url, params = listing_request(base_url)
+    client = SyncClient(HEADERS)
+    latencies, encoding = [], None
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            _, _, headers = client.get_json(url, params, endpoint='listing')
+            latencies.append(time.perf_counter() - start)
+            encoding = headers.get('Content-Encoding')
+    finally:
+        client.close()
+    return latencies, encoding
+
+
+async def _fetch_all(urls, workers, get, gap=0.0):
+    latencies, encodings = [], []
+    queue = list(reversed(urls))
+
+    async def worker():
+        while queue:
+            url = queue.pop()
+            start = time.perf_counter()
+            encodings.append(await get(url))
+            latencies.append(time.perf_counter() - start)
+            if gap and queue:
+                await asyncio.sleep(gap)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return latencies, next((e for e in encodings if e), None)
+
+
+def async_old(base_url, n, workers, gap=0.0):
+    import aiohttp
+
+    async def run():
+        connector = aiohttp.TCPConnector(limit=10)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+            async def get(url):
+                async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    json.loads(await response.read())
+                    return response.headers.get('Content-Encoding')
+            return await _fetch_all(thread_urls(base_url, n), workers, get, gap)
+    return asyncio.run(run())
+
+
+def async_new(base_url, n, workers, gap=0.0):
+    async def run():
+        async with AsyncClient(HEADERS, connections=workers) as client:
+            async def get(url):
+                _, _, headers = await client.get_json(url, endpoint='thread')
+                return headers.get('Content-Encoding')
+            return await _fetch_all(thread_urls(base_url, n), workers, get, gap)
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Old vs pooled HTTP clients against a mock Reddit")
+    parser.add_argument('--requests', type=int, default=300, help="requests per client")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent async fetchers")
+    parser.add_argument('--latency', type=float, default=0.005, help="mock response latency, seconds")
+    parser.add_argument('--handshake', type=float, default=0.05, help="mock cost of a new connection, seconds")
+    parser.add_argument('--gap', type=float, default=0.0,
+                        help="seconds each async worker idles between requests (rate-limit pacing)")
+    parser.add_argument('--max-comments', type=int, default=200)
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, MOCK_SERVER, '--port', str(port), '--latency', str(args.latency),
+        '--max-comments', str(args.max_comments), '--missing-every', '0',
+        '--budget', str(10 ** 7), '--compress', '--handshake', str(args.handshake),
+    ], stdout=subprocess.DEVNULL)
+    try:
+        wait_for_server(base_url, server)
+        # The mock builds each thread on first request; build them all before timing anything
+        async_new(base_url, args.requests, args.workers)
+        results = [
+            measure("sync: requests.get", base_url, lambda: sync_old(base_url, args.requests)),
+            measure("sync: SyncClient", base_url, lambda: sync_new(base_url, args.requests)),
+            measure("async: old session", base_url, lambda: async_old(base_url, args.requests, args.workers, args.gap)),
+            measure("async: AsyncClient", base_url, lambda: async_new(base_url, args.requests, args.workers, args.gap)),
+        ]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nMock: latency {args.latency}s, {args.handshake}s per new connection, {args.workers} async workers "
+          f"({args.gap}s apart), compression on")
+    print(f"{'Client':<22}{'Requests':>9}{'Mean ms':>9}{'p50 ms':>8}{'p90 ms':>8}{'Connections':>13}  Encoding")
+    for r in results:
+        print(f"{r['client']:<22}{r['requests']:>9,}{r['mean_ms']:>9.1f}{r['p50_ms']:>8.1f}{r['p90_ms']:>8.1f}"
+              f"{r['connections']:>13,}  {r['encoding']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
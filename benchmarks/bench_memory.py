@@ -0,0 +1,173 @@
+"""
+Memory benchmark: does the Fast comment scraper's peak memory stay flat as
+the crawl grows?
+
+Starts benchmarks/mock_reddit.py, writes a links file of N synthetic posts
+and runs the real CommentScraper.py on it in a child process under
+tracemalloc, once per N. pandas and aiohttp are loaded before tracing
+starts, and classification runs on a thread pool so its allocations are
+traced too. Reports per size:
+
+    traced peak (tracemalloc), traced at exit, peak RSS, comments kept
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sizes 1000,4000,16000 --max-growth 1.3
+
+The dedup and comment-ID indexes keep up to INDEX_MEMORY_ENTRIES new
+entries in RAM before merging them to disk; --index-entries lowers that
+bound so the steady state is reached at benchmark sizes. Below it the peak
+does grow with the crawl, while the index buffers fill up to their bound
+and the responses in flight reach their worst case. So the smallest run is
+a warm-up, and the check is on the last two: exits 1 if the largest run's
+traced peak is more than --max-growth times the one before it. Memory is
+only claimed flat from --index-entries / 10 links on (a mock link brings
+about 38 comment IDs), so the run before the largest must be at least that
+big: 2,000 links with the default 20,000, 200 with --index-entries 2000.
+
+Needs aiohttp and a POSIX system (peak RSS comes from os.wait4).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_end_to_end import SUB_NAMES, free_port, load_script, wait_for_server
+from mock_reddit import ID_BASE, SUB_STRIDE
+from fixtures import ROOT, to_base36
+
+MOCK_SERVER = os.path.join(ROOT, "benchmarks", "mock_reddit.py")
+
+
+def write_links(path, base_url, n, subs):
+    """n post links spread round-robin over `subs` (every 10th is deleted on the mock)."""
+    with open(path, 'w') as f:
+        f.write("url\n")
+        for i in range(n):
+            sub = subs[i % len(subs)]
+            pid = to_base36(ID_BASE + (i % len(subs)) * SUB_STRIDE + i // len(subs))
+            f.write(f"{base_url}/r/{sub}/comments/{pid}/post_{pid}/\n")
+
+
+def run_child(base_url, args):
+    """Child-process entry point: run the scraper under tracemalloc, write memory.json."""
+    import tracemalloc
+
+    scraper = load_script('comments')   # puts the repository root on sys.path
+    from redditscrape import httpclient
+    scraper.API_BASE_URL = base_url
+    scraper.INPUT_FILE = "links.csv"
+    scraper.OUTPUT_FILE, scraper.DEDUP_INDEX = "comments.csv", "comments.idx"
+    scraper.SEEN_IDS_INDEX = "comment_ids.idx"
+    scraper.STATE_DB = "crawl_state.sqlite"
+    scraper.REQUESTS_PER_MINUTE = 10 ** 6
+    scraper.CONCURRENT_REQUESTS = args.workers
+    scraper.CLASSIFY_EXECUTOR = "thread"
+    scraper.INDEX_MEMORY_ENTRIES = args.index_entries
+    scraper.METRICS_FILE = None
+    scraper.FASTTEXT_AVAILABLE = False
+
+    # Import cost is the same for every size; keep it out of the numbers
+    scraper.pd.read_csv, httpclient.aiohttp.ClientSession
+    tracemalloc.start()
+    scraper.main()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with open("memory.json", 'w') as f:
+        json.dump({'current': current, 'peak': peak}, f)
+
+
+def measure(n, base_url, args):
+    workdir = tempfile.mkdtemp(prefix="bench_memory_")
+    try:
+        write_links(os.path.join(workdir, "links.csv"), base_url, n, SUB_NAMES[:args.subs])
+        start = time.perf_counter()
+        with open(os.path.join(workdir, "scrape.log"), 'w') as log:
+            proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', '--base-url', base_url,
+                                     '--workers', str(args.workers), '--index-entries', str(args.index_entries)],
+                                    cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+            _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        if status != 0:
+            raise RuntimeError(f"scrape of {n} links failed, see {workdir}/scrape.log")
+        with open(os.path.join(workdir, "memory.json")) as f:
+            traced = json.load(f)
+        with open(os.path.join(workdir, "comments.csv"), encoding='utf-8') as f:
+            kept = sum(1 for _ in f) - 1
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'links': n,
+        'wall': wall,
+        'kept': kept,
+        'peak_mb': traced['peak'] / 1024 ** 2,
+        'current_mb': traced['current'] / 1024 ** 2,
+        # ru_maxrss is KB on Linux, bytes on macOS
+        'rss_mb': usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Peak memory of the comment scraper vs crawl size")
+    parser.add_argument('--sizes', default="500,2000,8000", help="comma-separated numbers of links")
+    parser.add_argument('--subs', type=int, default=4, help=f"subreddits the links are spread over (max {len(SUB_NAMES)})")
+    parser.add_argument('--min-comments', type=int, default=5)
+    parser.add_argument('--max-comments', type=int, default=80)
+    parser.add_argument('--workers', type=int, default=8, help="comment fetch workers")
+    parser.add_argument('--index-entries', type=int, default=20_000, help="INDEX_MEMORY_ENTRIES for the run")
+    parser.add_argument('--max-growth', type=float, default=1.5,
+                        help="fail if peak(largest) / peak(second largest) is above")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch directories")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if not args.child:
+        sizes = [int(s) for s in args.sizes.split(',')]
+        floor = args.index_entries // 10
+        if len(sizes) > 1 and sizes[-2] < floor:
+            parser.error(f"--sizes: {sizes[-2]:,} links still fill the indexes, so the comparison needs at least "
+                         f"{floor:,} links before the largest size (or a lower --index-entries)")
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        run_child(args.base_url, args)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, MOCK_SERVER, '--port', str(port),
+        '--min-comments', str(args.min_comments), '--max-comments', str(args.max_comments),
+        '--budget', str(10 ** 6),
+    ], stdout=subprocess.DEVNULL)
+    try:
+        wait_for_server(base_url, server)
+        results = [measure(n, base_url, args) for n in sizes]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nMock: {args.subs} subs, {args.min_comments}-{args.max_comments} comments/thread, "
+          f"{args.workers} fetch workers, INDEX_MEMORY_ENTRIES={args.index_entries:,}")
+    print(f"{'Links':>8}{'Kept':>10}{'Wall s':>9}{'Traced peak MB':>16}{'At exit MB':>12}{'Peak RSS MB':>13}")
+    for r in results:
+        print(f"{r['links']:>8,}{r['kept']:>10,}{r['wall']:>9.1f}{r['peak_mb']:>16.1f}"
+              f"{r['current_mb']:>12.1f}{r['rss_mb']:>13.1f}")
+
+    before = results[-2] if len(results) > 1 else results[0]
+    growth = results[-1]['peak_mb'] / before['peak_mb']
+    print(f"\nTraced peak, {sizes[-1]:,} vs {before['links']:,} links: x{growth:.2f} (limit x{args.max_growth})")
+    return 1 if growth > args.max_growth else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
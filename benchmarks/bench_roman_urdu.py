@@ -0,0 +1,98 @@
+"""
+Benchmark: original is_roman_urdu keyword scoring vs the compiled RomanUrduScorer.
+
+Runs both over the committed commentsScrape.csv corpora, checks that every
+decision matches, and prints per-comment cost and speedup. fastText is left
+out on both sides so only the keyword/bigram stage is measured.
+
+    python benchmarks/bench_roman_urdu.py
+"""
+import csv
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPORA = [
+    os.path.join(ROOT, "CommentScraping(Fast)", "commentsScrape.csv"),
+    os.path.join(ROOT, "CommentScraping(Slow)", "commentsScrape.csv"),
+    os.path.join(ROOT, "CommentScraping(Slow)", "commentsScrape1.csv"),
+]
+REPEATS = 5
+
+
+def load_scraper():
+    path = os.path.join(ROOT, "CommentScraping(Fast)", "CommentScraper.py")
+    spec = importlib.util.spec_from_file_location("fast_comment_scraper", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_texts():
+    texts = []
+    for path in CORPORA:
+        with open(path, newline='', encoding='utf-8') as f:
+            texts.extend(row['text'] for row in csv.DictReader(f) if row.get('text'))
+    return texts
+
+
+def make_legacy(scraper):
+    """The pre-scorer keyword path of is_roman_urdu, verbatim."""
+    urdu_markers = scraper.urdu_markers
+    english_stops = scraper.english_stops
+    bigrams = scraper.URDU_BIGRAMS
+
+    def legacy(text):
+        words = text.lower().split()
+        if len(words) < 3:
+            return False
+        text_lower = text.lower()
+        bigram_hits = sum(1 for bg in bigrams if bg in text_lower)
+        urdu_score = sum(1 for w in words if w in urdu_markers)
+        eng_score = sum(1 for w in words if w in english_stops)
+        urdu_score += bigram_hits * 2
+        total_meaningful = urdu_score + eng_score
+        if total_meaningful == 0:
+            return False
+        urdu_ratio = urdu_score / total_meaningful
+        return urdu_ratio >= 0.4 and urdu_score >= 2
+
+    return legacy
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    scraper = load_scraper()
+    scraper.FASTTEXT_AVAILABLE = False
+    texts = load_texts()
+    legacy = make_legacy(scraper)
+
+    legacy_time, legacy_out = best_of(lambda: [legacy(t) for t in texts])
+    single_time, single_out = best_of(lambda: [scraper.is_roman_urdu(t) for t in texts])
+    batch_time, batch_out = best_of(lambda: scraper.is_roman_urdu_batch(texts))
+
+    mismatches = sum(1 for a, b in zip(legacy_out, single_out) if a != b)
+    mismatches += sum(1 for a, b in zip(legacy_out, batch_out) if a != b)
+
+    n = len(texts)
+    print(f"Corpus:      {n:,} comments ({sum(legacy_out):,} accepted)")
+    print(f"Legacy:      {legacy_time * 1e6 / n:6.2f} us/comment  ({n / legacy_time:,.0f}/s)")
+    print(f"Scorer:      {single_time * 1e6 / n:6.2f} us/comment  ({n / single_time:,.0f}/s)  x{legacy_time / single_time:.1f}")
+    print(f"Scorer batch:{batch_time * 1e6 / n:6.2f} us/comment  ({n / batch_time:,.0f}/s)  x{legacy_time / batch_time:.1f}")
+    print(f"Mismatches:  {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Cold-start benchmark for the scraper entry points.
+
+Every measurement is a fresh interpreter, so it includes Python's own
+startup plus every module the entry point imports before doing any work:
+
+    import CommentScraper      (Fast scraper, as the CLI, pool workers and tools import it)
+    import getLinks
+    import RefilterArchive
+    python -m redditscrape --help
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --target-ms 250 --top 8
+
+Reports min / median wall time per entry point, and the slowest imports
+(cumulative, from `python -X importtime`). Exits 1 if any median is over
+--target-ms, so a new eager import of pandas, aiohttp or a model shows up.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fixtures import ROOT
+
+FAST_DIR = os.path.join(ROOT, "CommentScraping(Fast)")
+LINKS_DIR = os.path.join(ROOT, "ScrapeLinks")
+# (name, argv after the interpreter, working directory)
+ENTRY_POINTS = [
+    ('import CommentScraper', ['-c', 'import CommentScraper'], FAST_DIR),
+    ('import getLinks', ['-c', 'import getLinks'], LINKS_DIR),
+    ('import RefilterArchive', ['-c', 'import RefilterArchive'], FAST_DIR),
+    ('python -m redditscrape --help', ['-m', 'redditscrape', '--help'], ROOT),
+    ('python (empty)', ['-c', 'pass'], ROOT),
+]
+
+
+def run_once(argv, cwd, extra=()):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *extra, *argv], cwd=cwd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def slowest_imports(argv, cwd, top):
+    """[(cumulative ms, module)] of the entry point's direct imports, slowest first."""
+    _, stderr = run_once(argv, cwd, extra=('-X', 'importtime'))
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nesting shows as two more spaces of indentation per level; keep level 1
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 1:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start times of the scraper entry points")
+    parser.add_argument('--runs', type=int, default=10, help="fresh interpreters per entry point")
+    parser.add_argument('--target-ms', type=float, default=250.0, help="fail if a median is above this")
+    parser.add_argument('--top', type=int, default=5, help="slowest imports listed per entry point")
+    args = parser.parse_args()
+
+    env_path = os.environ.get('PYTHONPATH')
+    os.environ['PYTHONPATH'] = ROOT + (os.pathsep + env_path if env_path else "")
+
+    results = []
+    for name, argv, cwd in ENTRY_POINTS:
+        run_once(argv, cwd)   # warm the OS file cache and __pycache__
+        times = [run_once(argv, cwd)[0] * 1000 for _ in range(args.runs)]
+        results.append((name, min(times), statistics.median(times), slowest_imports(argv, cwd, args.top)))
+
+    print(f"{'Entry point':<34}{'min ms':>9}{'median ms':>11}")
+    for name, best, median, _ in results:
+        flag = "   OVER TARGET" if median > args.target_ms and name != 'python (empty)' else ""
+        print(f"{name:<34}{best:>9.1f}{median:>11.1f}{flag}")
+
+    for name, _, _, imports in results[:-1]:
+        print(f"\nSlowest imports, {name}:")
+        for ms, module in imports:
+            print(f"   {ms:8.1f} ms  {module}")
+
+    over = [name for name, _, median, _ in results[:-1] if median > args.target_ms]
+    if over:
+        print(f"\n{len(over)} entry point(s) over the {args.target_ms:.0f} ms target")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
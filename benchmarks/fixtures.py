@@ -0,0 +1,173 @@
+"""
+Thread JSON fixtures for the benchmarks.
+
+A real thread response carries a lot of payload the scraper never needs
+(awards, flair, gildings, media metadata ...). `make_thread` builds a
+response with the same shape and the same kind of payload bulk, filled
+with comment bodies from the committed corpora, so parsing benchmarks
+see realistic work without needing network access. It is deterministic
+for a given seed.
+
+    python benchmarks/fixtures.py   # (re)writes fixtures/large_thread.json.gz
+
+Real recorded responses (`<permalink>.json?limit=500` saved to a file) can be
+dropped into fixtures/ as *.json or *.json.gz and are picked up the same way.
+"""
+import csv
+import glob
+import gzip
+import json
+import os
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+CORPORA = [
+    os.path.join(ROOT, "CommentScraping(Fast)", "commentsScrape.csv"),
+    os.path.join(ROOT, "CommentScraping(Slow)", "commentsScrape.csv"),
+]
+FILLER = [
+    "Great point, totally agree with this.",
+    "Source? I have never heard of that.",
+    "This is the way.",
+    "Can someone explain what happened here?",
+    "[deleted]",
+]
+
+
+def load_corpus():
+    texts = []
+    for path in CORPORA:
+        with open(path, newline='', encoding='utf-8') as f:
+            texts.extend(row['text'] for row in csv.DictReader(f) if row.get('text'))
+    return texts
+
+
+def to_base36(n):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if n == 0:
+            return out
+
+
+def _awardings(rng):
+    return [{
+        'id': f"award_{rng.getrandbits(32):08x}",
+        'name': rng.choice(["Helpful", "Wholesome", "Silver", "Gold"]),
+        'count': rng.randint(1, 3),
+        'coin_price': rng.choice([100, 150, 500]),
+        'resized_icons': [{'url': f"https://i.redd.it/award_{i}.png", 'width': 16 * i, 'height': 16 * i}
+                          for i in range(1, 6)],
+        'description': "Thank you stranger. Shows the award.",
+    } for _ in range(rng.randint(0, 3))]
+
+
+def _comment(rng, cid, parent, link_id, body, sub, created):
+    return {
+        'kind': 't1',
+        'data': {
+            'id': cid,
+            'name': f"t1_{cid}",
+            'parent_id': parent,
+            'link_id': link_id,
+            'subreddit': sub,
+            'author': f"user_{rng.getrandbits(24):06x}",
+            'body': body,
+            'body_html': "&lt;div class=\"md\"&gt;&lt;p&gt;" + body + "&lt;/p&gt;&lt;/div&gt;",
+            'score': rng.randint(-20, 400),
+            'ups': rng.randint(0, 400),
+            'created_utc': created,
+            'edited': False,
+            'all_awardings': _awardings(rng),
+            'gildings': {'gid_1': rng.randint(0, 2), 'gid_2': 0},
+            'author_flair_richtext': [{'e': 'text', 't': "Karachi"}] if rng.random() < 0.3 else [],
+            'media_metadata': ({f"img{i}": {'status': 'valid', 's': {'u': f"https://i.redd.it/{i}.jpg",
+                                                                    'x': 640, 'y': 480}}
+                                for i in range(2)} if rng.random() < 0.05 else None),
+            'replies': "",
+        },
+    }
+
+
+def make_thread(post_id="abc123", n_comments=2000, seed=7, subreddit="pakistan",
+                max_depth=10, more_fraction=0.15, texts=None):
+    """
+    Build a thread response: [post listing, comment listing]. Roughly
+    `more_fraction` of the comments are left out as `more` stubs, the way
+    Reddit truncates large threads.
+    """
+    rng = random.Random(seed)
+    texts = texts or load_corpus()
+    link_id = f"t3_{post_id}"
+    created = 1_700_000_000
+    # Comment IDs are unique across posts, as on Reddit (CommentIdIndex relies on it)
+    next_id = [int(post_id, 36) * 10**8 + rng.randint(10**8, 10**9) % 10**7]
+
+    def new_id():
+        next_id[0] += rng.randint(1, 50)
+        return to_base36(next_id[0])
+
+    top_level = []
+    nodes = []          # (depth, comment dict) candidates for replies
+    hidden = []
+    for _ in range(n_comments):
+        cid = new_id()
+        if rng.random() < more_fraction:
+            hidden.append(cid)
+            continue
+        body = rng.choice(texts) if rng.random() < 0.7 else rng.choice(FILLER)
+        created += rng.randint(1, 600)
+        if nodes and rng.random() < 0.65:
+            depth, parent = rng.choice(nodes)
+            if depth >= max_depth:
+                depth, parent = 0, None
+        else:
+            depth, parent = 0, None
+        if parent is None:
+            c = _comment(rng, cid, link_id, link_id, body, subreddit, created)
+            top_level.append(c)
+        else:
+            c = _comment(rng, cid, parent['data']['name'], link_id, body, subreddit, created)
+            replies = parent['data']['replies']
+            if not replies:
+                replies = parent['data']['replies'] = {'kind': 'Listing', 'data': {'children': [], 'after': None}}
+            replies['data']['children'].append(c)
+        nodes.append((depth + 1, c))
+
+    if hidden:
+        top_level.append({'kind': 'more', 'data': {
+            'count': len(hidden), 'name': f"t1_{hidden[0]}", 'id': hidden[0],
+            'parent_id': link_id, 'depth': 0, 'children': hidden,
+        }})
+
+    post = {'kind': 't3', 'data': {
+        'id': post_id, 'name': link_id, 'subreddit': subreddit, 'title': "Fixture thread",
+        'selftext': rng.choice(texts), 'num_comments': n_comments, 'created_utc': 1_700_000_000,
+        'permalink': f"/r/{subreddit}/comments/{post_id}/fixture_thread/",
+        'all_awardings': _awardings(rng), 'preview': {'images': [{'source': {'url': "x", 'width': 1, 'height': 1}}]},
+    }}
+    return [
+        {'kind': 'Listing', 'data': {'children': [post], 'after': None}},
+        {'kind': 'Listing', 'data': {'children': top_level, 'after': None}},
+    ]
+
+
+def load_fixtures():
+    """{name: parsed JSON} for every *.json / *.json.gz in fixtures/."""
+    out = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.json*"))):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            out[os.path.basename(path).split('.')[0]] = json.load(f)
+    return out
+
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, "large_thread.json.gz")
+    with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz:
+        gz.write(json.dumps(make_thread()).encode('utf-8'))
+    print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
@@ -0,0 +1,266 @@
+"""
+Local stand-in for the parts of Reddit the scrapers talk to.
+
+    python benchmarks/mock_reddit.py --port 8765 --latency 0.05 --budget 6000
+
+Endpoints (same response shapes as Reddit):
+    GET /r/{sub}/{sort}.json                    listing, `limit` + `after` pagination
+    GET /r/{sub}/comments/{id}/{slug}.json      thread: [post listing, comment listing]
+    GET /api/info.json?id=t3_a,t3_b             which posts still exist
+    GET /api/morechildren.json?link_id=&children=   hidden comments of a thread
+    GET /__stats                                request/comment/connection counters (not Reddit)
+
+Everything is derived from the post ID and --seed, so the same run always
+sees the same posts and comment trees: every sort of every subreddit lists
+--posts distinct posts, every --missing-every'th post ID is "deleted" (absent
+from /api/info, 404 as a thread), and threads are built with
+fixtures.make_thread from the committed corpora, with their `more` stubs
+answerable through /api/morechildren.
+
+Every response carries X-Ratelimit-Used/Remaining/Reset for a --budget
+requests per --window seconds window; requests over budget get a 429, and
+--error-rate injects extra 429s at random. --latency (+ up to --jitter)
+seconds are added to every response. With --compress responses are gzip/br
+encoded per the request's Accept-Encoding, like Reddit's. /__stats counts
+the TCP connections clients opened, to see whether they keep them alive,
+and --handshake adds that many seconds to the first response on each new
+connection (the TCP + TLS setup a real HTTPS connection costs).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fixtures import load_corpus, make_thread, to_base36
+
+ID_BASE = 36 ** 6   # post IDs are 7 base36 chars, like real ones
+SUB_STRIDE = 10 ** 5
+THREAD_CACHE = 512  # built threads kept for /api/morechildren follow-ups
+
+
+class MockReddit:
+    def __init__(self, posts=300, comments=(20, 400), missing_every=10, more_fraction=0.15,
+                 latency=0.0, jitter=0.0, budget=6000, window=60.0, error_rate=0.0, seed=1, compress=False,
+                 handshake=0.0):
+        self.posts = posts
+        self.comments = comments
+        self.missing_every = missing_every
+        self.more_fraction = more_fraction
+        self.latency = latency
+        self.jitter = jitter
+        self.budget = budget
+        self.window = window
+        self.error_rate = error_rate
+        self.seed = seed
+        self.compress = compress
+        self.handshake = handshake
+        self.rng = random.Random(seed)
+        self.texts = load_corpus()
+        self.window_end = time.monotonic() + window
+        self.window_used = 0
+        self.stats = {'requests': 0, 'rate_limited': 0, 'not_found': 0,
+                      'comments_served': 0, 'connections': 0, 'endpoints': {}}
+        self.transports = weakref.WeakSet()
+        self.threads = OrderedDict()
+
+    # -- synthetic data --------------------------------------------------
+    def post_number(self, sub, sort, i):
+        listing = zlib.crc32(f"{self.seed}/{sub}/{sort}".encode()) % 10 ** 4
+        return ID_BASE + listing * SUB_STRIDE + i
+
+    def exists(self, number):
+        return not self.missing_every or number % self.missing_every != 0
+
+    def post_thing(self, sub, number):
+        pid = to_base36(number)
+        return {'kind': 't3', 'data': {
+            'id': pid, 'name': f"t3_{pid}", 'subreddit': sub, 'title': f"Post {pid}",
+            'num_comments': self.comment_count(number), 'created_utc': 1_700_000_000 + number % 10 ** 6,
+            'permalink': f"/r/{sub}/comments/{pid}/post_{pid}/",
+        }}
+
+    def comment_count(self, number):
+        return random.Random(number ^ self.seed).randint(*self.comments)
+
+    def thread_data(self, pid, sub="mock"):
+        """(thread JSON bytes, {hidden comment id: t1 thing}, visible comments), cached by post ID."""
+        cached = self.threads.get(pid)
+        if cached is not None:
+            self.threads.move_to_end(pid)
+            return cached
+        cached = self.threads[pid] = self._build_thread(sub, pid)
+        if len(self.threads) > THREAD_CACHE:
+            self.threads.popitem(last=False)
+        return cached
+
+    def _build_thread(self, sub, pid):
+        number = int(pid, 36)
+        thread = make_thread(post_id=pid, n_comments=self.comment_count(number), seed=number ^ self.seed,
+                             subreddit=sub, more_fraction=self.more_fraction, texts=self.texts)
+        hidden = {}
+        comments = thread[1]['data']['children']
+        if comments and comments[-1]['kind'] == 'more':
+            ids = comments[-1]['data']['children']
+            rng = random.Random(number)
+            for cid in ids:
+                body = rng.choice(self.texts)
+                hidden[cid] = {'kind': 't1', 'data': {
+                    'id': cid, 'name': f"t1_{cid}", 'parent_id': f"t3_{pid}", 'link_id': f"t3_{pid}",
+                    'subreddit': sub, 'body': body, 'score': rng.randint(-5, 100),
+                    'created_utc': 1_700_000_000 + rng.randint(0, 10 ** 6), 'replies': "",
+                }}
+        visible = sum(1 for _ in _iter_t1(thread[1]))
+        return json.dumps(thread).encode(), hidden, visible
+
+    # -- rate limiting ---------------------------------------------------
+    def _rate_headers(self):
+        now = time.monotonic()
+        if now >= self.window_end:
+            self.window_end = now + self.window
+            self.window_used = 0
+        self.window_used += 1
+        return {
+            'X-Ratelimit-Used': str(self.window_used),
+            'X-Ratelimit-Remaining': str(max(self.budget - self.window_used, 0)),
+            'X-Ratelimit-Reset': str(max(int(self.window_end - now), 0)),
+        }
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        self.stats['requests'] += 1
+        endpoint = request.match_info.route.name or 'other'
+        self.stats['endpoints'][endpoint] = self.stats['endpoints'].get(endpoint, 0) + 1
+        if endpoint == 'stats':
+            return await handler(request)
+        if request.transport is not None and request.transport not in self.transports:
+            self.transports.add(request.transport)
+            self.stats['connections'] += 1
+            if self.handshake:
+                await asyncio.sleep(self.handshake)
+
+        headers = self._rate_headers()
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.window_used > self.budget or self.rng.random() < self.error_rate:
+            self.stats['rate_limited'] += 1
+            return web.json_response({'message': 'Too Many Requests', 'error': 429},
+                                     status=429, headers=headers)
+        response = await handler(request)
+        if response.status == 404:
+            self.stats['not_found'] += 1
+        response.headers.update(headers)
+        if self.compress:
+            response.enable_compression()
+        return response
+
+    # -- handlers --------------------------------------------------------
+    async def listing(self, request):
+        sub, sort = request.match_info['sub'], request.match_info['sort']
+        limit = min(int(request.query.get('limit', 25)), 100)
+        start = 0
+        after = request.query.get('after')
+        if after:
+            start = max(int(after.split('_', 1)[-1], 36) - self.post_number(sub, sort, 0) + 1, 0)
+        end = min(start + limit, self.posts)
+        children = [self.post_thing(sub, self.post_number(sub, sort, i)) for i in range(start, end)]
+        next_after = children[-1]['data']['name'] if children and end < self.posts else None
+        return web.json_response({'kind': 'Listing', 'data': {
+            'children': children, 'after': next_after, 'before': None, 'dist': len(children),
+        }})
+
+    async def thread(self, request):
+        pid = request.match_info['id']
+        if not self.exists(int(pid, 36)):
+            return web.json_response({'message': 'Not Found', 'error': 404}, status=404)
+        body, _, visible = self.thread_data(pid, request.match_info['sub'])
+        self.stats['comments_served'] += visible
+        return web.Response(body=body, content_type='application/json')
+
+    async def info(self, request):
+        children = []
+        for name in request.query.get('id', '').split(','):
+            if not name.startswith('t3_'):
+                continue
+            number = int(name[3:], 36)
+            if self.exists(number):
+                children.append(self.post_thing("mock", number))
+        return web.json_response({'kind': 'Listing', 'data': {'children': children, 'after': None}})
+
+    async def morechildren(self, request):
+        pid = request.query.get('link_id', '').split('_', 1)[-1]
+        wanted = [c for c in request.query.get('children', '').split(',') if c]
+        things = []
+        if pid and self.exists(int(pid, 36)):
+            _, hidden, _ = self.thread_data(pid)
+            things = [hidden[c] for c in wanted[:100] if c in hidden]
+        self.stats['comments_served'] += len(things)
+        return web.json_response({'json': {'errors': [], 'data': {'things': things}}})
+
+    async def stats_handler(self, request):
+        return web.json_response(self.stats)
+
+    def make_app(self):
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get('/__stats', self.stats_handler, name='stats')
+        app.router.add_get('/api/info.json', self.info, name='info')
+        app.router.add_get('/api/morechildren.json', self.morechildren, name='morechildren')
+        app.router.add_get('/r/{sub}/comments/{id}/{slug}.json', self.thread, name='thread')
+        app.router.add_get('/r/{sub}/{sort}.json', self.listing, name='listing')
+        return app
+
+
+def _iter_t1(listing):
+    stack = [listing]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get('kind') == 't1':
+                yield node
+                replies = node['data'].get('replies')
+                if replies:
+                    stack.append(replies)
+            elif node.get('kind') == 'Listing':
+                stack.extend(node['data']['children'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--posts', type=int, default=300, help="posts per (sub, sort) listing")
+    parser.add_argument('--min-comments', type=int, default=20)
+    parser.add_argument('--max-comments', type=int, default=400)
+    parser.add_argument('--missing-every', type=int, default=10, help="every Nth post ID is deleted (0 = none)")
+    parser.add_argument('--more-fraction', type=float, default=0.15, help="share of comments behind `more` stubs")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument('--budget', type=int, default=6000, help="requests allowed per rate-limit window")
+    parser.add_argument('--window', type=float, default=60.0, help="rate-limit window, seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="probability of an injected 429")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--compress', action='store_true', help="gzip/br responses per Accept-Encoding")
+    parser.add_argument('--handshake', type=float, default=0.0, help="extra seconds on a connection's first response")
+    return parser.parse_args(argv)
+
+
+def build(args):
+    return MockReddit(posts=args.posts, comments=(args.min_comments, args.max_comments),
+                      missing_every=args.missing_every, more_fraction=args.more_fraction,
+                      latency=args.latency, jitter=args.jitter, budget=args.budget,
+                      window=args.window, error_rate=args.error_rate, seed=args.seed, compress=args.compress,
+                      handshake=args.handshake)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    web.run_app(build(args).make_app(), host=args.host, port=args.port, print=None)
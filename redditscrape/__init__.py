@@ -0,0 +1,7 @@
+"""
+Shared building blocks for the link collector and the comment scrapers.
+
+The scripts in ScrapeLinks/ and CommentScraping(*)/ put the repository root on
+sys.path and import from here, so every stage uses the same implementation.
+`python -m redditscrape links|comments|refilter` runs them (see cli.py).
+"""
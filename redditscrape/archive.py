@@ -0,0 +1,123 @@
+"""
+Append-only archive of every fetched comment, before any filtering.
+
+The scraper normally keeps only the texts that pass the Roman Urdu filter,
+so improving detection used to mean scraping again. With an archive, each
+fetched thread's raw comments (id, parent, body, score, created_utc,
+subreddit) are stored once and can be re-filtered offline.
+
+Layout: a directory of numbered chunk files (`chunk-000001.jsonl.gz`, ...),
+one JSON record per line. Every thread is written as its own gzip member
+appended to the current chunk; a chunk is closed once it passes
+`chunk_bytes`, and each run starts a fresh one. Readers only yield members
+that decompress completely, so a member cut short by a crash is dropped as
+a whole instead of leaving half a thread behind; the crawl state never marked that post done, so it is simply
+fetched (and archived) again.
+"""
+import glob
+import json
+import os
+import zlib
+
+ARCHIVE_FIELDS = ('id', 'parent_id', 'link_id', 'body', 'score', 'created_utc', 'subreddit')
+CHUNK_PATTERN = "chunk-*.jsonl.gz"
+READ_BLOCK = 1 << 20
+
+
+def comment_record(payload):
+    """Reduce a t1 comment payload to the archived fields."""
+    return {field: payload.get(field) for field in ARCHIVE_FIELDS}
+
+
+def chunk_paths(directory):
+    """Chunk files of an archive, oldest first (sharded runs write one subdirectory per shard and lease)."""
+    return sorted(glob.glob(os.path.join(directory, "**", CHUNK_PATTERN), recursive=True))
+
+
+def read_chunk(path):
+    """
+    Yield the records of one chunk file, member by member. A truncated or
+    corrupt trailing member (crash mid-write) is skipped.
+    """
+    with open(path, 'rb') as f:
+        decoder = zlib.decompressobj(wbits=31)
+        parts = []
+        pending = b''
+        while True:
+            data = pending or f.read(READ_BLOCK)
+            pending = b''
+            if not data:
+                return
+            try:
+                parts.append(decoder.decompress(data))
+            except zlib.error:
+                return
+            if decoder.eof:
+                for line in b''.join(parts).splitlines():
+                    if line:
+                        yield json.loads(line)
+                parts = []
+                pending = decoder.unused_data
+                decoder = zlib.decompressobj(wbits=31)
+
+
+def iter_archive(directory):
+    """Yield every archived record, in write order."""
+    for path in chunk_paths(directory):
+        yield from read_chunk(path)
+
+
+class ThreadArchive:
+    """
+    Writer side of the archive.
+
+        archive = ThreadArchive("raw_archive")
+        archive.write_thread(records)   # one gzip member per thread
+        archive.flush()                 # fsync, before marking posts done
+        archive.close()
+    """
+
+    def __init__(self, directory, chunk_bytes=64 * 1024 ** 2, level=6):
+        self.directory = directory
+        self.chunk_bytes = chunk_bytes
+        self.level = level
+        self.threads = 0
+        self.records = 0
+        os.makedirs(directory, exist_ok=True)
+        # Every run starts a new chunk, so nothing is ever appended after a
+        # member a previous run left truncated
+        self.chunk_no = len(glob.glob(os.path.join(directory, CHUNK_PATTERN)))
+        self._file = None
+
+    def _open_chunk(self):
+        self.chunk_no += 1
+        path = os.path.join(self.directory, f"chunk-{self.chunk_no:06d}.jsonl.gz")
+        self._file = open(path, 'ab')
+
+    def _close_chunk(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def write_thread(self, records):
+        """Append one thread's records as a single gzip member."""
+        if not records:
+            return
+        if self._file is None:
+            self._open_chunk()
+        payload = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
+        encoder = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        self._file.write(encoder.compress(payload.encode('utf-8')) + encoder.flush())
+        self.threads += 1
+        self.records += len(records)
+        if self._file.tell() >= self.chunk_bytes:
+            self._close_chunk()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._close_chunk()
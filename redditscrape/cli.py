@@ -0,0 +1,122 @@
+"""
+Command-line entry point for the three stages:
+
+    python -m redditscrape links    [--output links1.csv] [--goal 50000] [--mode async|sync]
+    python -m redditscrape comments [--input links1.csv] [--output comments.csv] [--crawl-mode sharded]
+                                    [--format parquet --parquet-dir comments_parquet]
+    python -m redditscrape refilter [--archive raw_archive] [--output comments.csv] [--format parquet] [--overwrite]
+
+Each subcommand imports its script (ScrapeLinks/getLinks.py,
+CommentScraping(Fast)/CommentScraper.py or RefilterArchive.py) under its own
+module name, applies the options to the script's configuration constants and
+runs its main(). Any other constant can be set with --set NAME=VALUE
+(Python literals, anything else is taken as a string):
+
+    python -m redditscrape comments --set REVISIT_AFTER=604800 --set SCHEDULE=file
+
+Nothing heavy is imported before a subcommand actually runs, so --help and
+argument errors return immediately. After `pip install -e .` the same
+commands are available as `redditscrape links|comments|refilter`; the
+scripts stay in the checkout, so install it editable.
+"""
+import argparse
+import ast
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {
+    'links': os.path.join(ROOT, "ScrapeLinks", "getLinks.py"),
+    'comments': os.path.join(ROOT, "CommentScraping(Fast)", "CommentScraper.py"),
+    'refilter': os.path.join(ROOT, "CommentScraping(Fast)", "RefilterArchive.py"),
+}
+
+
+def load_script(command):
+    # Imported under its real module name so process pools can unpickle its functions
+    path = SCRIPTS[command]
+    if not os.path.exists(path):
+        raise SystemExit(f"❌ {path} not found: run from a checkout of the repository (pip install -e .)")
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+
+
+def parse_assignment(text):
+    name, sep, value = text.partition('=')
+    if not sep or not name.isidentifier():
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return name, value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m redditscrape",
+                                     description="Roman Urdu Reddit scraper: collect links, scrape comments, re-filter.")
+    sub = parser.add_subparsers(dest='command', required=True, metavar='{links,comments,refilter}')
+
+    links = sub.add_parser('links', help="collect post links from the target subreddits")
+    links.add_argument('--output', dest='OUTPUT_FILE', help="links CSV")
+    links.add_argument('--index', dest='LINK_INDEX', help="link hash index")
+    links.add_argument('--goal', dest='GOAL_LINKS', type=int, help="stop after this many new links per pass")
+    links.add_argument('--mode', dest='COLLECTION_MODE', choices=['async', 'sync'])
+    links.add_argument('--subs', dest='TARGET_SUBS', type=lambda v: [s for s in v.split(',') if s],
+                       help="comma-separated subreddits instead of the built-in list")
+
+    comments = sub.add_parser('comments', help="scrape and filter comments of the collected links")
+    comments.add_argument('--input', dest='INPUT_FILE', help="links CSV (url column)")
+    comments.add_argument('--output', dest='OUTPUT_FILE', help="comments CSV")
+    comments.add_argument('--format', dest='OUTPUT_FORMAT', choices=['csv', 'parquet'])
+    comments.add_argument('--parquet-dir', dest='PARQUET_DIR', help="Parquet output directory (--format parquet)")
+    comments.add_argument('--state', dest='STATE_DB', help="crawl state database")
+    comments.add_argument('--index', dest='DEDUP_INDEX', help="comment hash index")
+    comments.add_argument('--archive', dest='ARCHIVE_DIR', help="also archive raw comments here")
+    comments.add_argument('--seen-ids', dest='SEEN_IDS_INDEX', help="skip comment IDs recorded in this index")
+    comments.add_argument('--crawl-mode', dest='CRAWL_MODE', choices=['single', 'sharded'])
+    comments.add_argument('--workers', dest='SHARD_WORKERS', type=int, help="worker processes (sharded mode)")
+    comments.add_argument('--concurrency', dest='CONCURRENT_REQUESTS', type=int, help="fetch workers per process")
+    comments.add_argument('--no-fasttext', action='store_true', help="keyword-only classification")
+
+    refilter = sub.add_parser('refilter', help="re-run the filter over the raw archive (no network)")
+    refilter.add_argument('--archive', dest='ARCHIVE_DIR', help="archive directory")
+    refilter.add_argument('--output', dest='OUTPUT_FILE', help="regenerated comments CSV")
+    refilter.add_argument('--format', dest='OUTPUT_FORMAT', choices=['csv', 'parquet'])
+    refilter.add_argument('--parquet-dir', dest='PARQUET_DIR', help="regenerated Parquet directory (--format parquet)")
+    refilter.add_argument('--index', dest='DEDUP_INDEX', help="rebuilt comment hash index")
+    refilter.add_argument('--workers', dest='WORKERS', type=int, help="classifier processes")
+    refilter.add_argument('--overwrite', dest='OVERWRITE', action='store_const', const=True,
+                          help="replace an existing output")
+    refilter.add_argument('--no-fasttext', action='store_true', help="keyword-only classification")
+
+    for p in (links, comments, refilter):
+        p.add_argument('--set', dest='assignments', action='append', default=[], type=parse_assignment,
+                       metavar='NAME=VALUE', help="override any configuration constant of the script")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    overrides = {name: value for name, value in vars(args).items()
+                 if name.isupper() and value is not None}
+    overrides.update(args.assignments)
+
+    script = load_script(args.command)
+    for name, value in overrides.items():
+        if not hasattr(script, name):
+            print(f"❌ {os.path.basename(SCRIPTS[args.command])} has no setting {name}", file=sys.stderr)
+            return 2
+        setattr(script, name, value)
+    if getattr(args, 'no_fasttext', False):
+        # The classifier lives in CommentScraper (RefilterArchive imports it); its
+        # worker processes are handed its settings, this one included
+        load_script('comments').FASTTEXT_AVAILABLE = False
+    if hasattr(script, 'configure'):
+        # Objects built from the settings at import (the keyword scorer) pick up the overrides
+        script.configure()
+
+    script.main()
+    return 0
@@ -0,0 +1,275 @@
+"""
+Per-post crawl state, stored in SQLite and keyed by Reddit post ID.
+
+Each post moves through pending -> validated -> fetched (or missing/failed).
+Every transition is committed as it happens, so after a crash the scraper
+resumes from exactly the posts that were not finished, whatever the order or
+content of the links file. Editing or reordering links1.csv is harmless:
+links are matched by post ID, and new IDs are simply appended as pending.
+
+Fetched posts also keep the thread's num_comments and the IDs of every
+comment seen (a packed array of base36 IDs as integers), so a later revisit
+can skip unchanged threads and only process comments it has not seen yet.
+
+Nothing here loads the whole table: links are registered chunk by chunk and
+pending posts are paged out in link-file order, overall or per subreddit.
+"""
+import re
+import sqlite3
+import time
+from array import array
+
+from .scheduler import subreddit_of
+
+PENDING = "pending"
+VALIDATED = "validated"
+MISSING = "missing"
+FETCHED = "fetched"
+FAILED = "failed"
+
+_POST_ID_RE = re.compile(r'/comments/([a-z0-9]+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    post_id        TEXT PRIMARY KEY,
+    url            TEXT NOT NULL,
+    subreddit      TEXT,
+    seq            INTEGER NOT NULL,
+    status         TEXT NOT NULL DEFAULT 'pending',
+    attempts       INTEGER NOT NULL DEFAULT 0,
+    comments_seen  INTEGER,
+    comments_kept  INTEGER,
+    num_comments   INTEGER,
+    comment_ids    BLOB,
+    added_at       REAL NOT NULL,
+    updated_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_status_seq ON posts (status, seq);
+CREATE TABLE IF NOT EXISTS yields (
+    subreddit  TEXT PRIMARY KEY,
+    posts      INTEGER NOT NULL,
+    kept       INTEGER NOT NULL,
+    requests   INTEGER NOT NULL
+);
+"""
+
+
+def post_id_from_url(url):
+    match = _POST_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def _base36(n):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+
+def pack_ids(ids):
+    """Sorted uint64 array of base36 comment IDs, as bytes."""
+    return array('Q', sorted(int(i, 36) for i in ids)).tobytes()
+
+
+def unpack_ids(blob):
+    packed = array('Q')
+    packed.frombytes(blob)
+    return {_base36(n) for n in packed}
+
+
+class CrawlState:
+    """
+        state = CrawlState("crawl_state1.sqlite")
+        state.sync_links(links)                 # new post IDs become pending
+        state.requeue_failed()                  # retry earlier failures
+        for post_id, url, seq, status in state.next_pending(20):
+            ...
+            state.mark(post_id, FETCHED, comments_seen=120, comments_kept=14)
+    """
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        # Databases from older versions lack the newer columns
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(posts)")}
+        for column, kind in (('num_comments', 'INTEGER'), ('comment_ids', 'BLOB'), ('subreddit', 'TEXT')):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE posts ADD COLUMN {column} {kind}")
+        if 'subreddit' not in columns:
+            self._backfill_subreddits()
+        self.db.execute("CREATE INDEX IF NOT EXISTS posts_sub_status_seq ON posts (subreddit, status, seq)")
+        self.db.commit()
+
+    def _backfill_subreddits(self, chunk=10_000):
+        last = ""
+        while True:
+            rows = self.db.execute(
+                "SELECT post_id, url FROM posts WHERE post_id > ? ORDER BY post_id LIMIT ?", (last, chunk)
+            ).fetchall()
+            if not rows:
+                return
+            self.db.executemany("UPDATE posts SET subreddit = ? WHERE post_id = ?",
+                                [(subreddit_of(url), pid) for pid, url in rows])
+            last = rows[-1][0]
+
+    def sync_links(self, urls):
+        """Register links; returns how many post IDs were not known yet."""
+        now = time.time()
+        (next_seq,) = self.db.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM posts").fetchone()
+        rows = []
+        seen = set()
+        for url in urls:
+            post_id = post_id_from_url(url)
+            if post_id and post_id not in seen:
+                seen.add(post_id)
+                rows.append((post_id, url, subreddit_of(url), next_seq + len(rows), now, now))
+        before = self.db.total_changes
+        self.db.executemany(
+            "INSERT OR IGNORE INTO posts (post_id, url, subreddit, seq, added_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.db.commit()
+        return self.db.total_changes - before
+
+    def requeue_failed(self):
+        """Put failed posts with attempts left back in the queue (call once per run)."""
+        cur = self.db.execute(
+            "UPDATE posts SET status = ? WHERE status = ? AND attempts < ?",
+            (PENDING, FAILED, self.max_attempts),
+        )
+        self.db.commit()
+        return cur.rowcount
+
+    def requeue_stale(self, max_age):
+        """Queue fetched posts older than max_age seconds for a revisit; returns how many."""
+        cur = self.db.execute(
+            "UPDATE posts SET status = ?, attempts = 0 WHERE status = ? AND updated_at < ?",
+            (PENDING, FETCHED, time.time() - max_age),
+        )
+        self.db.commit()
+        return cur.rowcount
+
+    def known_counts(self, post_ids):
+        """{post_id: num_comments at the last fetch} for the given posts that have one."""
+        post_ids = list(post_ids)
+        out = {}
+        for i in range(0, len(post_ids), 500):
+            chunk = post_ids[i:i + 500]
+            out.update(self.db.execute(
+                f"SELECT post_id, num_comments FROM posts WHERE num_comments IS NOT NULL "
+                f"AND post_id IN ({','.join('?' * len(chunk))})", chunk,
+            ).fetchall())
+        return out
+
+    def comment_ids(self, post_id):
+        """Set of comment IDs seen in this thread so far, or None if it was never fetched."""
+        row = self.db.execute("SELECT comment_ids FROM posts WHERE post_id = ?", (post_id,)).fetchone()
+        return unpack_ids(row[0]) if row and row[0] is not None else None
+
+    def mark_unchanged(self, post_ids):
+        """Revisited posts whose comment count did not grow: done again without a fetch."""
+        now = time.time()
+        self.db.executemany(
+            "UPDATE posts SET status = ?, updated_at = ? WHERE post_id = ?",
+            [(FETCHED, now, pid) for pid in post_ids],
+        )
+        self.db.commit()
+
+    def next_pending(self, n, after_seq=-1):
+        """
+        Next n unfinished (pending or validated) posts in link-file order, as
+        (post_id, url, seq, status). Pass the last seq seen as `after_seq` to
+        page forward without waiting for earlier posts to finish.
+        """
+        return self.db.execute(
+            "SELECT post_id, url, seq, status FROM posts WHERE status IN (?, ?) AND seq > ? "
+            "ORDER BY seq LIMIT ?",
+            (PENDING, VALIDATED, after_seq, n),
+        ).fetchall()
+
+    def pending_by_subreddit(self):
+        """{subreddit: number of unfinished posts}"""
+        return dict(self.db.execute(
+            "SELECT subreddit, COUNT(*) FROM posts WHERE status IN (?, ?) GROUP BY subreddit",
+            (PENDING, VALIDATED),
+        ).fetchall())
+
+    def next_pending_in(self, subreddit, n, after_seq=-1):
+        """next_pending restricted to one subreddit."""
+        return self.db.execute(
+            "SELECT post_id, url, seq, status FROM posts WHERE subreddit = ? AND status IN (?, ?) "
+            "AND seq > ? ORDER BY seq LIMIT ?",
+            (subreddit, PENDING, VALIDATED, after_seq, n),
+        ).fetchall()
+
+    def mark(self, post_id, status, comments_seen=None, comments_kept=None):
+        """Record a status transition (fetched/failed also count an attempt)."""
+        attempt = 1 if status in (FETCHED, FAILED) else 0
+        self.db.execute(
+            "UPDATE posts SET status = ?, attempts = attempts + ?, "
+            "comments_seen = COALESCE(?, comments_seen), comments_kept = COALESCE(?, comments_kept), "
+            "updated_at = ? WHERE post_id = ?",
+            (status, attempt, comments_seen, comments_kept, time.time(), post_id),
+        )
+        self.db.commit()
+
+    def mark_results(self, results, threads=()):
+        """
+        Commit finished posts at once: [(post_id, status, comments_seen, comments_kept)],
+        plus [(post_id, num_comments, comment_ids)] for the fetched threads.
+        """
+        now = time.time()
+        self.db.executemany(
+            "UPDATE posts SET status = ?, attempts = attempts + 1, comments_seen = ?, "
+            "comments_kept = ?, updated_at = ? WHERE post_id = ?",
+            [(status, seen, kept, now, pid) for pid, status, seen, kept in results],
+        )
+        self.db.executemany(
+            "UPDATE posts SET num_comments = ?, comment_ids = ? WHERE post_id = ?",
+            [(num, pack_ids(ids), pid) for pid, num, ids in threads],
+        )
+        self.db.commit()
+
+    def mark_many(self, post_ids, status):
+        now = time.time()
+        self.db.executemany(
+            "UPDATE posts SET status = ?, updated_at = ? WHERE post_id = ?",
+            [(status, now, pid) for pid in post_ids],
+        )
+        self.db.commit()
+
+    def yield_totals(self):
+        """{subreddit: (posts, kept, requests)} accumulated over all runs."""
+        return {sub: (posts, kept, requests) for sub, posts, kept, requests
+                in self.db.execute("SELECT subreddit, posts, kept, requests FROM yields")}
+
+    def add_yields(self, deltas):
+        """Add {subreddit: (posts, kept, requests)} to the stored totals."""
+        self.db.executemany(
+            "INSERT INTO yields (subreddit, posts, kept, requests) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(subreddit) DO UPDATE SET posts = posts + excluded.posts, "
+            "kept = kept + excluded.kept, requests = requests + excluded.requests",
+            [(sub, *t) for sub, t in deltas.items()],
+        )
+        self.db.commit()
+
+    def remaining(self):
+        (n,) = self.db.execute(
+            "SELECT COUNT(*) FROM posts WHERE status IN (?, ?)", (PENDING, VALIDATED)
+        ).fetchone()
+        return n
+
+    def counts(self):
+        """{status: number of posts}"""
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM posts GROUP BY status").fetchall())
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,194 @@
+"""
+Persistent content-hash index for comment dedup across runs.
+
+Comments are normalized (lowercased, whitespace collapsed) and hashed to a
+64-bit digest. Digests live in a sorted, memory-mapped table of fixed-width
+uint64s (`<path>`), plus a small in-memory delta backed by an append-only log
+(`<path>.log`). Lookups are a binary search in the table and a set check in
+the delta. When the delta passes `merge_threshold` it is merged into the
+table in chunks no larger than the delta, so RAM stays bounded (about
+twice `merge_threshold` entries) while the table grows to tens of millions of entries (8 bytes each on disk).
+
+The same file can be shared by the Fast and Slow scrapers (one process at a
+time), so a comment stored by any earlier run is never stored again.
+
+CommentIdIndex uses the same table for Reddit comment IDs: a base36 ID is
+already a 64-bit integer, so it is stored as is instead of hashed. It lets
+the scrapers skip comments they have processed before (kept or rejected)
+before reading their text at all.
+"""
+import hashlib
+import os
+import shutil
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")   # only needed once an index is opened
+
+DIGEST_DTYPE = '<u8'
+MERGE_THRESHOLD = 200_000   # Delta entries kept in RAM before merging to disk
+MERGE_CHUNK = 1_000_000     # Most table entries processed per merge step
+
+
+def normalize_text(text):
+    """Case- and whitespace-insensitive form used for dedup."""
+    return ' '.join(text.lower().split())
+
+
+def text_digest(text):
+    """64-bit digest of the normalized text, as an int."""
+    raw = hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(raw, 'little')
+
+
+class DigestIndex:
+    """
+        index = DigestIndex("comment_hashes.idx")
+        if index.add(text):     # True only the first time this text is seen
+            keep(text)
+        index.flush()           # fsync the log (cheap, per checkpoint)
+        index.close()           # merges the delta into the table
+    """
+
+    def __init__(self, path, merge_threshold=MERGE_THRESHOLD):
+        self.path = path
+        self.log_path = path + ".log"
+        self.merge_threshold = merge_threshold
+        self.merge_chunk = max(1, min(MERGE_CHUNK, merge_threshold))
+        self._base = self._open_base()
+        self._delta = set()
+        if os.path.exists(self.log_path):
+            # Replay digests added since the last merge
+            logged = np.fromfile(self.log_path, dtype=DIGEST_DTYPE)
+            self._delta.update(int(d) for d in logged if not self._in_base(int(d)))
+        self._log = open(self.log_path, 'ab')
+
+    def _open_base(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return np.empty(0, dtype=DIGEST_DTYPE)
+        return np.memmap(self.path, dtype=DIGEST_DTYPE, mode='r')
+
+    def _in_base(self, digest):
+        base = self._base
+        i = int(np.searchsorted(base, digest))
+        return i < len(base) and int(base[i]) == digest
+
+    def __len__(self):
+        return len(self._base) + len(self._delta)
+
+    def contains_digest(self, digest):
+        return digest in self._delta or self._in_base(digest)
+
+    def __contains__(self, text):
+        return self.contains_digest(text_digest(text))
+
+    def add_digest(self, digest):
+        """Record a digest; returns False if it was already known."""
+        if self.contains_digest(digest):
+            return False
+        self._delta.add(digest)
+        self._log.write(digest.to_bytes(8, 'little'))
+        return True
+
+    def add(self, text):
+        """Record a text; returns False if an equal (normalized) text was seen before."""
+        return self.add_digest(text_digest(text))
+
+    def log_size(self):
+        self._log.flush()
+        return os.fstat(self._log.fileno()).st_size
+
+    def truncate_log(self, size):
+        """Drop log entries past `size` bytes (rollback to a checkpoint)."""
+        self._log.flush()
+        if size >= self.log_size():
+            return
+        self._log.truncate(size)
+        self._delta = set()
+        for d in np.fromfile(self.log_path, dtype=DIGEST_DTYPE):
+            self._delta.add(int(d))
+
+    def flush(self):
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def needs_merge(self):
+        return len(self._delta) >= self.merge_threshold
+
+    def merge(self):
+        """Fold the delta into the sorted table with bounded memory, then clear the log."""
+        self.flush()
+        if not self._delta:
+            return
+        delta = np.fromiter(self._delta, dtype=DIGEST_DTYPE, count=len(self._delta))
+        delta.sort()
+
+        tmp = self.path + ".tmp"
+        with open(tmp, 'wb') as out:
+            base = self._base
+            pos = 0
+            for start in range(0, len(base), self.merge_chunk):
+                chunk = np.array(base[start:start + self.merge_chunk])
+                hi = int(np.searchsorted(delta, chunk[-1], side='right'))
+                np.union1d(chunk, delta[pos:hi]).astype(DIGEST_DTYPE).tofile(out)
+                pos = hi
+            delta[pos:].tofile(out)
+            out.flush()
+            os.fsync(out.fileno())
+
+        # Release the old mapping before replacing the file (required on Windows)
+        self._base = None
+        base = None
+        os.replace(tmp, self.path)
+        self._base = self._open_base()
+        self._delta = set()
+        self._log.truncate(0)
+        self._log.seek(0)
+        self.flush()
+
+    def close(self):
+        if self._log.closed:
+            return
+        self.merge()
+        self._log.close()
+
+
+def snapshot_index(src, dst):
+    """
+    Copy the index at `src` (table + log) to `dst`, which must not be open.
+    Safe while another process still writes `src`: the log is copied before
+    the table, and a merge replaces the table before it empties the log, so
+    an entry can be copied twice but never missed. A record cut short at the
+    end of the log is left out.
+    """
+    src_log, dst_log = src + ".log", dst + ".log"
+    with open(dst_log + ".tmp", 'wb') as out:
+        if os.path.exists(src_log):
+            with open(src_log, 'rb') as f:
+                data = f.read()
+            out.write(data[:len(data) - len(data) % np.dtype(DIGEST_DTYPE).itemsize])
+    if os.path.exists(src):
+        shutil.copyfile(src, dst + ".tmp")
+        os.replace(dst + ".tmp", dst)
+    os.replace(dst_log + ".tmp", dst_log)
+
+
+class CommentIdIndex(DigestIndex):
+    """
+        seen = CommentIdIndex("comment_ids.idx")
+        if cid not in seen:     # base36 comment ID, e.g. "kx3b9q1"
+            process(comment)
+        seen.add(cid)           # once its output is durable
+        seen.flush()
+    """
+
+    def __contains__(self, comment_id):
+        return self.contains_digest(int(comment_id, 36))
+
+    def add(self, comment_id):
+        """Record a comment ID; returns False if it was already known."""
+        return self.add_digest(int(comment_id, 36))
+
+    def add_many(self, comment_ids):
+        """Record several IDs; returns how many were new."""
+        return sum(self.add(cid) for cid in comment_ids if cid)
@@ -0,0 +1,105 @@
+"""
+On-disk cache of Reddit JSON responses.
+
+Bodies of successful GETs are stored zlib-compressed in a single SQLite file,
+keyed by the normalized request (lowercased scheme/host, no trailing slash,
+query string and params merged and sorted). Entries expire after `ttl`
+seconds, and once the stored bytes pass `max_bytes` the least recently used
+entries are evicted. Callers check the cache *before* taking a rate-limiter
+slot, so a hit costs no request budget at all; reruns after tweaking the
+filter replay from disk instead of re-downloading every thread.
+"""
+import sqlite3
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key          TEXT PRIMARY KEY,
+    body         BLOB NOT NULL,
+    size         INTEGER NOT NULL,
+    stored_at    REAL NOT NULL,
+    last_access  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+"""
+
+
+def cache_key(url, params=None):
+    """Normalized request identity used as the cache key."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    path = parts.path.rstrip('/') or '/'
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}?{urlencode(sorted(query))}"
+
+
+class ResponseCache:
+    """
+        cache = ResponseCache("response_cache.sqlite", ttl=7 * 86400, max_bytes=2 * 1024**3)
+        raw = cache.get(url, params)       # bytes or None
+        cache.put(url, params, raw)
+    """
+
+    def __init__(self, path, ttl=7 * 86400, max_bytes=2 * 1024 ** 3, level=6):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.level = level
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        (self.total_bytes,) = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def get(self, url, params=None):
+        key = cache_key(url, params)
+        row = self.db.execute("SELECT body, size, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        body, size, stored_at = row
+        if self.ttl is not None and now - stored_at > self.ttl:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+            self.total_bytes -= size
+            self.misses += 1
+            return None
+        self.db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self.db.commit()
+        self.hits += 1
+        return zlib.decompress(body)
+
+    def put(self, url, params, raw):
+        key = cache_key(url, params)
+        body = zlib.compress(raw, self.level)
+        now = time.time()
+        old = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (key, body, size, stored_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, body, len(body), now, now),
+        )
+        self.total_bytes += len(body) - (old[0] if old else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+        self.db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until 90% of max_bytes."""
+        target = self.max_bytes * 0.9
+        doomed = []
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+        self.db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,316 @@
+"""
+Pooled HTTP clients shared by the link collector and the comment scraper.
+
+Both stages talk to the same few Reddit hosts over and over, so every
+request goes through one long-lived client instead of a fresh connection:
+
+    async with AsyncClient(headers, rate_limiter, connections=8, cache=cache) as client:
+        status, data, resp_headers = await client.get_json(url, params, endpoint="thread")
+
+    client = SyncClient(headers)
+    status, data, resp_headers = client.get_json(url, params, endpoint="listing")
+    client.close()
+
+- Keep-alive pools: connections stay open for KEEPALIVE_SECONDS between
+  requests (aiohttp's default is 15 s, shorter than the gap between requests
+  at Reddit's unauthenticated budget), so TCP/TLS handshakes happen once per
+  pooled connection, not once per request.
+- DNS answers are cached for DNS_CACHE_SECONDS (aiohttp; the sync client
+  only resolves when its pool opens a connection).
+- gzip/deflate is always accepted, and brotli too when a decoder (brotli or
+  brotlicffi) is installed.
+- One RetryPolicy: timeouts, connection errors, undecodable bodies, 408 and
+  5xx are retried with capped exponential backoff and jitter. A 429 pauses
+  the shared rate limiter (or sleeps, without one) until X-Ratelimit-Reset
+  and then retries. Any other status is returned to the caller.
+- Timeouts are per endpoint (TIMEOUTS), since a 500-comment thread takes
+  longer than an /api/info batch.
+- Endpoints in UNCACHED_ENDPOINTS always go to the network: /api/info
+  answers (comment counts, removals) are what decides whether a thread is
+  fetched again, so a cached one would hide every change since.
+
+get_json() returns (status, data, response_headers); data is None unless
+status is 200. Requests, retries, latency, limiter waits and opened
+connections are recorded in the shared metrics registry under `endpoint`.
+"""
+import asyncio
+import json
+import random
+import time
+
+from .lazy import lazy_import, is_installed
+from .metrics import metrics, REQUEST_BUCKETS, WAIT_BUCKETS
+
+aiohttp = lazy_import("aiohttp")
+requests = lazy_import("requests")
+
+KEEPALIVE_SECONDS = 75
+DNS_CACHE_SECONDS = 300
+# (connect, read) seconds per endpoint; read covers the whole response
+TIMEOUTS = {
+    'listing': (10, 30),
+    'thread': (10, 30),
+    'info': (10, 20),
+    'morechildren': (10, 20),
+}
+DEFAULT_TIMEOUT = (10, 30)
+# Never read from or written to the response cache
+UNCACHED_ENDPOINTS = {'info'}
+
+
+def accept_encoding():
+    """Accept-Encoding value for the content codings that can be decoded here."""
+    if is_installed("brotli") or is_installed("brotlicffi"):
+        return "gzip, deflate, br"
+    return "gzip, deflate"
+
+
+def retry_after(headers, default=60):
+    """Seconds until the rate-limit window resets, from a 429's headers."""
+    try:
+        return int(float(headers.get('X-Ratelimit-Reset', default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class RetryPolicy:
+    """
+        policy = RetryPolicy(attempts=5)
+        policy.delay(attempt)       # ~1, 2, 4, 8 ... s (+-jitter), at most `cap`
+    """
+
+    def __init__(self, attempts=5, base=1.0, cap=60.0, jitter=0.25):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        wait = min(self.cap, self.base * 2 ** attempt)
+        return wait * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    @staticmethod
+    def retryable(status):
+        return status == 408 or status >= 500
+
+
+class _Client:
+    """What the async and sync clients share: headers, timeouts, retry decisions, metrics."""
+
+    def __init__(self, headers, rate_limiter=None, connections=10, cache=None, retry=None, timeouts=None):
+        self.headers = {'Accept-Encoding': accept_encoding(), **headers}
+        self.rate_limiter = rate_limiter
+        self.connections = connections
+        self.cache = cache
+        self.retry = retry or RetryPolicy()
+        self.timeouts = TIMEOUTS if timeouts is None else timeouts
+
+    def timeout(self, endpoint):
+        return self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    def _cached(self, url, params, endpoint):
+        if self.cache is None or endpoint in UNCACHED_ENDPOINTS:
+            return None
+        raw = self.cache.get(url, params)
+        if raw is None:
+            return None
+        metrics.inc('requests', endpoint=endpoint, status='cache')
+        return 200, json.loads(raw), {}
+
+    def _decode(self, url, params, raw, endpoint):
+        data = json.loads(raw)
+        if self.cache is not None and endpoint not in UNCACHED_ENDPOINTS:
+            self.cache.put(url, params, raw)
+        return data
+
+    def _record(self, endpoint, status, start, stats):
+        metrics.inc('requests', endpoint=endpoint, status=status)
+        metrics.observe('request_seconds', time.perf_counter() - start, REQUEST_BUCKETS, endpoint=endpoint)
+        if stats is not None:
+            stats['requests'] = stats.get('requests', 0) + 1
+
+    def _retry_later(self, attempt, endpoint, reason):
+        """Backoff before the next attempt, or None if this was the last one."""
+        if attempt >= self.retry.attempts - 1:
+            return None
+        metrics.inc('request_retries', endpoint=endpoint, reason=reason)
+        return self.retry.delay(attempt)
+
+    def _after_status(self, attempt, status, headers, endpoint):
+        """Seconds to wait before retrying a non-200 response, or None to return it as is."""
+        if status == 429:
+            # Everyone holds off until the window resets (sleep here only without a shared limiter)
+            reset = retry_after(headers)
+            print(f"   ⚠️ 429 on {endpoint}, pausing requests {reset}s...")
+            if self.rate_limiter is not None:
+                self.rate_limiter.penalize(reset + 1)
+            if self._retry_later(attempt, endpoint, '429') is None:
+                return None
+            return 0 if self.rate_limiter is not None else reset + 1
+        if not self.retry.retryable(status):
+            return None
+        return self._retry_later(attempt, endpoint, str(status))
+
+    def _learn(self, headers):
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(headers)
+            metrics.set('ratelimit_requests_per_minute', self.rate_limiter.requests_per_minute)
+
+
+class AsyncClient(_Client):
+    """
+    aiohttp session with a keep-alive pool of up to `connections` connections
+    per host. Requests wait for a slot of `rate_limiter` (an
+    AdaptiveRateLimiter) and feed its X-Ratelimit-* headers back; responses
+    found in `cache` (a ResponseCache) skip both the limiter and the network.
+    """
+
+    def __init__(self, headers, rate_limiter=None, connections=10, cache=None, retry=None, timeouts=None):
+        super().__init__(headers, rate_limiter, connections, cache, retry, timeouts)
+        self.session = None
+
+    async def __aenter__(self):
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._connection_opened)
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.connections,
+                                         keepalive_timeout=KEEPALIVE_SECONDS,
+                                         use_dns_cache=True, ttl_dns_cache=DNS_CACHE_SECONDS)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, trace_configs=[trace])
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @staticmethod
+    async def _connection_opened(session, context, params):
+        metrics.inc('http_connections_opened', client='async')
+
+    async def _wait_for_slot(self, endpoint):
+        if self.rate_limiter is None:
+            return
+        wait_start = time.perf_counter()
+        await self.rate_limiter.acquire()
+        metrics.observe('ratelimit_wait_seconds', time.perf_counter() - wait_start, WAIT_BUCKETS, endpoint=endpoint)
+
+    async def get_json(self, url, params=None, endpoint="thread", stats=None):
+        """
+        GET a JSON endpoint, retrying per the policy. If `stats` is a dict,
+        stats['requests'] counts the requests sent (retries included, cache
+        hits not). The last error is raised if every attempt failed with one.
+        """
+        cached = self._cached(url, params, endpoint)
+        if cached is not None:
+            return cached
+        connect, read = self.timeout(endpoint)
+        timeout = aiohttp.ClientTimeout(total=connect + read, sock_connect=connect)
+
+        for attempt in range(self.retry.attempts):
+            await self._wait_for_slot(endpoint)
+            start = time.perf_counter()
+            raw = None
+            try:
+                async with self.session.get(url, params=params, timeout=timeout) as response:
+                    status, resp_headers = response.status, response.headers
+                    if status == 200:
+                        raw = await response.read()
+                self._learn(resp_headers)
+                self._record(endpoint, str(status), start, stats)
+                if status == 200:
+                    return 200, self._decode(url, params, raw, endpoint), resp_headers
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                if raw is None:
+                    # No complete response: settle the reservation and count the failure
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.release()
+                    self._record(endpoint, type(e).__name__, start, stats)
+                wait = self._retry_later(attempt, endpoint, type(e).__name__)
+                if wait is None:
+                    raise
+                await asyncio.sleep(wait)
+                continue
+
+            wait = self._after_status(attempt, status, resp_headers, endpoint)
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+        return status, None, resp_headers
+
+
+class SyncClient(_Client):
+    """
+    requests.Session with a keep-alive pool of up to `connections`
+    connections per host, for the synchronous collection mode. Pacing is
+    the caller's unless a `rate_limiter` is given (acquire_blocking).
+    """
+
+    def __init__(self, headers, rate_limiter=None, connections=10, cache=None, retry=None, timeouts=None):
+        super().__init__(headers, rate_limiter, connections, cache, retry, timeouts)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=connections, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapter = adapter
+        self._opened = 0
+
+    def close(self):
+        self.session.close()
+
+    def _count_connections(self):
+        # urllib3 counts the connections each host pool has created
+        pools = self._adapter.poolmanager.pools
+        opened = sum(pools[key].num_connections for key in pools.keys())
+        if opened > self._opened:
+            metrics.inc('http_connections_opened', opened - self._opened, client='sync')
+        self._opened = max(opened, self._opened)
+
+    def get_json(self, url, params=None, endpoint="listing", stats=None):
+        """Same as AsyncClient.get_json, blocking."""
+        cached = self._cached(url, params, endpoint)
+        if cached is not None:
+            return cached
+
+        for attempt in range(self.retry.attempts):
+            if self.rate_limiter is not None:
+                wait_start = time.perf_counter()
+                self.rate_limiter.acquire_blocking()
+                metrics.observe('ratelimit_wait_seconds', time.perf_counter() - wait_start, WAIT_BUCKETS,
+                                endpoint=endpoint)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout(endpoint))
+            except requests.exceptions.RequestException as e:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.release()
+                self._record(endpoint, type(e).__name__, start, stats)
+                wait = self._retry_later(attempt, endpoint, type(e).__name__)
+                if wait is None:
+                    raise
+                time.sleep(wait)
+                continue
+            finally:
+                self._count_connections()
+
+            status, resp_headers = response.status_code, response.headers
+            self._learn(resp_headers)
+            self._record(endpoint, str(status), start, stats)
+            if status == 200:
+                try:
+                    return 200, self._decode(url, params, response.content, endpoint), resp_headers
+                except ValueError:
+                    wait = self._retry_later(attempt, endpoint, 'ValueError')
+                    if wait is None:
+                        raise
+                    time.sleep(wait)
+                    continue
+
+            wait = self._after_status(attempt, status, resp_headers, endpoint)
+            if wait is None:
+                break
+            time.sleep(wait)
+        return status, None, resp_headers
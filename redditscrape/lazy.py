@@ -0,0 +1,35 @@
+"""
+Deferred imports for heavy dependencies.
+
+    pd = lazy_import("pandas")      # nothing imported yet
+    pd.read_csv(...)                # pandas is imported here, once
+
+Importing pandas, aiohttp or numpy costs 100-400 ms each, which every script
+used to pay at startup even for `--help`, a dry run, or a tool that only
+needs one helper function. The returned module is a real module object
+whose body runs on the first attribute access (importlib's LazyLoader), and
+it is registered in sys.modules, so later plain imports share it.
+If the package is not installed, the ImportError is raised right away.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_installed(name):
+    """True if `name` can be imported, without importing it."""
+    return name in sys.modules or importlib.util.find_spec(name) is not None
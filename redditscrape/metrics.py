@@ -0,0 +1,248 @@
+"""
+Process-wide metrics: counters, gauges and fixed-bucket histograms, exported
+as JSON or OpenMetrics text.
+
+Both scripts record into the shared `metrics` registry:
+
+    from redditscrape.metrics import metrics, MetricsExporter
+    metrics.inc('requests', endpoint='thread', status='200')
+    metrics.observe('request_seconds', elapsed, REQUEST_BUCKETS, endpoint='thread')
+    with metrics.time('phase_seconds', PHASE_BUCKETS, phase='1_validate'):
+        ...
+
+and a MetricsExporter writes a snapshot to a file every few seconds (atomic
+replace; `.json` -> JSON, anything else -> OpenMetrics) and/or serves it on
+http://127.0.0.1:<port>/metrics (OpenMetrics) and /metrics.json, so a long
+run can be watched without parsing console output. Counters are exported
+with a `_total` suffix.
+
+Histograms are plain picklable objects, so worker processes can fill one
+locally and the parent merges it in with `metrics.merge`.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+WAIT_BUCKETS = (0, 0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120)
+PHASE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+CLASSIFY_BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 1e-3, 1e-2, 0.1)
+
+
+class Histogram:
+    """Fixed upper-bound buckets (`le`), plus sum and count."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        if other.buckets != self.buckets:
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self):
+        """[(le, cumulative count)], ending with ('+Inf', count)."""
+        out, running = [], 0
+        for le, n in zip(self.buckets + ('+Inf',), self.counts):
+            running += n
+            out.append((le, running))
+        return out
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """Thread-safe registry. Series are identified by name + label values."""
+
+    def __init__(self, prefix="redditscrape_"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def _histogram(self, name, buckets, labels):
+        key = (name, _label_key(labels))
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram(buckets)
+        return hist
+
+    def observe(self, name, value, buckets=REQUEST_BUCKETS, **labels):
+        with self._lock:
+            self._histogram(name, buckets, labels).observe(value)
+
+    def merge(self, name, histogram, **labels):
+        with self._lock:
+            self._histogram(name, histogram.buckets, labels).merge(histogram)
+
+    @contextmanager
+    def time(self, name, buckets=REQUEST_BUCKETS, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, buckets, **labels)
+
+    # -- export ----------------------------------------------------------
+    def snapshot(self):
+        """JSON-ready copy of every series."""
+        def series(items, value):
+            out = {}
+            for (name, key), item in sorted(items):
+                out.setdefault(self.prefix + name, []).append({'labels': dict(key), **value(item)})
+            return out
+
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'counters': series(self.counters.items(), lambda v: {'value': v}),
+                'gauges': series(self.gauges.items(), lambda v: {'value': v}),
+                'histograms': series(self.histograms.items(), lambda h: {
+                    'buckets': [[le, n] for le, n in h.cumulative()], 'sum': h.sum, 'count': h.count,
+                }),
+            }
+
+    def to_openmetrics(self):
+        lines = []
+        with self._lock:
+            for kind, table in (('counter', self.counters), ('gauge', self.gauges)):
+                families = {}
+                for (name, key), value in sorted(table.items()):
+                    families.setdefault(name, []).append((key, value))
+                for name, samples in families.items():
+                    full = self.prefix + name
+                    lines.append(f"# TYPE {full} {kind}")
+                    suffix = "_total" if kind == 'counter' else ""
+                    lines.extend(f"{full}{suffix}{_format_labels(key)} {value}" for key, value in samples)
+
+            families = {}
+            for (name, key), hist in sorted(self.histograms.items()):
+                families.setdefault(name, []).append((key, hist))
+            for name, samples in families.items():
+                full = self.prefix + name
+                lines.append(f"# TYPE {full} histogram")
+                for key, hist in samples:
+                    for le, n in hist.cumulative():
+                        lines.append(f"{full}_bucket{_format_labels(key, [('le', str(le))])} {n}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{full}_count{_format_labels(key)} {hist.count}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Atomically write a snapshot; JSON for *.json, OpenMetrics otherwise."""
+        text = json.dumps(self.snapshot()) if path.endswith('.json') else self.to_openmetrics()
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+metrics = Metrics()
+
+
+class MetricsExporter:
+    """
+    Publishes a registry while a script runs:
+        exporter = MetricsExporter(metrics, path="scrape_metrics.prom", interval=15, port=9108)
+        ...
+        exporter.close()   # final write
+    Either output is optional. Runs on daemon threads, so it works the same
+    for the sync and async scripts.
+    """
+
+    def __init__(self, registry, path=None, interval=15.0, port=None, host="127.0.0.1"):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._threads = []
+        self.server = None
+        if path:
+            self._start(self._flush_loop)
+        if port is not None:
+            self.server = ThreadingHTTPServer((host, port), self._handler())
+            self.server.daemon_threads = True
+            self._start(self.server.serve_forever)
+
+    def _start(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        if self.path:
+            try:
+                self.registry.write(self.path)
+            except OSError as e:
+                print(f"   ⚠️ Could not write metrics to {self.path}: {e}")
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = registry.to_openmetrics().encode()
+                    ctype = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    body = json.dumps(registry.snapshot()).encode()
+                    ctype = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.flush()
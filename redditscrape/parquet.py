@@ -0,0 +1,289 @@
+"""
+Columnar output: Parquet partitioned by subreddit, with per-comment metadata.
+
+The CSV output holds only the text. This backend keeps every kept comment
+as a row of
+
+    comment_id, post_id, subreddit, score, created_utc, classifier_score, text
+
+in a hive-partitioned dataset (`<dir>/subreddit=<name>/part-<run>-<n>.parquet`),
+so readers can load a few columns of a few subreddits without touching the
+rest:
+
+    table = read_comments("commentsScrape1_parquet", columns=["text"],
+                          subreddits=["pakistan"], where=field("score") >= 5)
+
+Parquet files cannot be appended to, and a file is unreadable until its
+footer is written, so rows are not written straight to Parquet. Each flush
+appends one record batch to an Arrow IPC stream (`_staging.arrows`) and
+fsyncs it, and a checkpoint (`_staging.ckpt`) records how many bytes of the
+stream and of the dedup index log are durable, exactly like the CSV writer.
+compact() and close() then publish the staged rows as Parquet, in row groups
+of up to ROW_GROUP_ROWS, streaming from the memory-mapped stream, and delete
+it. Rows staged by a run that
+crashed are rolled back to its last checkpoint and published when the
+directory is opened again. Output files carry the run ID, so publishing a
+staging file again after an interrupted publish replaces its files instead
+of duplicating them.
+
+pyarrow is optional (pip install -e .[parquet]); it is only imported when a
+dataset is opened.
+"""
+import glob
+import json
+import os
+import uuid
+
+from .dedup import DigestIndex, MERGE_THRESHOLD
+from .writer import _atomic_write_json
+
+COLUMNS = ('comment_id', 'post_id', 'subreddit', 'score', 'created_utc', 'classifier_score', 'text')
+PARTITION = 'subreddit'
+ROW_GROUP_ROWS = 32 * 1024
+STAGING = "_staging.arrows"
+STAGING_CKPT = "_staging.ckpt"
+
+
+def require_pyarrow():
+    """pyarrow with the submodules used here, or an ImportError with an install hint."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow (or pip install -e .[parquet])") from e
+    return pyarrow
+
+
+def schema():
+    pa = require_pyarrow()
+    return pa.schema([
+        ('comment_id', pa.string()),
+        ('post_id', pa.string()),
+        ('subreddit', pa.string()),
+        ('score', pa.int64()),
+        ('created_utc', pa.int64()),
+        ('classifier_score', pa.float32()),
+        ('text', pa.string()),
+    ])
+
+
+def output_row(record, text, classifier_score):
+    """Output row for a kept comment, from its archive record (see archive.comment_record)."""
+    link_id = record.get('link_id') or ''
+    subreddit = record.get('subreddit')
+    created = record.get('created_utc')
+    return {
+        'comment_id': record.get('id'),
+        'post_id': link_id[3:] if link_id.startswith('t3_') else link_id or None,
+        'subreddit': subreddit.lower() if subreddit else None,
+        'score': record.get('score'),
+        'created_utc': int(created) if created is not None else None,
+        'classifier_score': classifier_score,
+        'text': text,
+    }
+
+
+def open_dataset(directory):
+    """pyarrow Dataset over the published Parquet files (staged rows are not included)."""
+    pa = require_pyarrow()
+    files = sorted(glob.glob(os.path.join(directory, f"{PARTITION}=*", "*.parquet")))
+    partitioning = pa.dataset.partitioning(pa.schema([(PARTITION, pa.string())]), flavor="hive")
+    return pa.dataset.dataset(files, schema=schema(), format="parquet",
+                              partitioning=partitioning, partition_base_dir=directory)
+
+
+def comment_filter(subreddits=None, where=None):
+    """Combine a subreddit list and an optional pyarrow expression into one filter (or None)."""
+    pa = require_pyarrow()
+    expr = None
+    if subreddits is not None:
+        expr = pa.dataset.field(PARTITION).isin([s.lower() for s in subreddits])
+    if where is not None:
+        expr = where if expr is None else expr & where
+    return expr
+
+
+def read_comments(directory, columns=None, subreddits=None, where=None):
+    """
+    Load comments as a pyarrow Table. Only the given columns are read, only
+    the partitions of `subreddits` are opened, and `where` (a pyarrow
+    expression, e.g. field("created_utc") >= 1700000000) is pushed down to
+    skip row groups by their statistics.
+    """
+    return open_dataset(directory).to_table(columns=columns, filter=comment_filter(subreddits, where))
+
+
+def iter_batches(directory, columns=None, subreddits=None, where=None, batch_size=64 * 1024):
+    """Same as read_comments, as a stream of record batches (bounded memory)."""
+    scanner = open_dataset(directory).scanner(columns=columns, filter=comment_filter(subreddits, where),
+                                              batch_size=batch_size)
+    yield from scanner.to_batches()
+
+
+class StreamingParquetWriter:
+    """
+    Same interface as StreamingCSVWriter, taking output_row() dicts:
+
+        writer = StreamingParquetWriter("commentsScrape1_parquet", "comment_hashes.idx")
+        writer.write_batch(rows)    # stages unseen rows, then flushes
+        writer.compact()            # publishes the staged rows as Parquet
+        writer.close()
+
+    Rows are deduplicated on their text through the shared DigestIndex.
+    """
+
+    def __init__(self, directory, index_path, row_group_rows=ROW_GROUP_ROWS, merge_threshold=MERGE_THRESHOLD):
+        self.pa = require_pyarrow()
+        self.schema = schema()
+        self.directory = directory
+        self.row_group_rows = row_group_rows
+        self.staging_path = os.path.join(directory, STAGING)
+        self.ckpt_path = os.path.join(directory, STAGING_CKPT)
+        os.makedirs(directory, exist_ok=True)
+        self.index = DigestIndex(index_path, merge_threshold)
+        self.pending_rows = 0
+        self._buffer = []
+        self._stream = None
+        self._sink = None
+        self._recover()
+
+    # -- startup --------------------------------------------------------
+    def _recover(self):
+        """Publish rows staged by an earlier run up to its checkpoint; index a dataset without one."""
+        try:
+            with open(self.ckpt_path) as f:
+                ckpt = json.load(f)
+        except (OSError, ValueError):
+            ckpt = None
+
+        if ckpt is not None:
+            self.index.truncate_log(ckpt['index_log_bytes'])
+            self.count = ckpt['rows']
+            self.run = ckpt['run']
+            self._publish(ckpt['staging_bytes'])
+            return
+
+        # No checkpoint yet: register existing Parquet output (text column only) in the index.
+        dataset = open_dataset(self.directory)
+        self.count = dataset.count_rows()
+        if self.count and len(self.index) == 0:
+            for batch in dataset.scanner(columns=['text']).to_batches():
+                for text in batch.column(0).to_pylist():
+                    self.index.add(text)
+            self.index.merge()
+        self.run = None
+        self._publish(0)
+
+    def _write_checkpoint(self, staging_bytes):
+        _atomic_write_json(self.ckpt_path, {
+            'staging_bytes': staging_bytes,
+            'index_log_bytes': self.index.log_size(),
+            'rows': self.count,
+            'run': self.run,
+        })
+
+    def _publish(self, staging_bytes):
+        """
+        Rewrite the first `staging_bytes` of the staging stream as partitioned
+        Parquet, drop the stream and start a new run with an empty checkpoint.
+        The stream is memory-mapped and converted batch by batch, so at most
+        about ROW_GROUP_ROWS rows per subreddit are held in memory.
+        """
+        if staging_bytes and os.path.exists(self.staging_path):
+            # Files of an interrupted publish of the same run are replaced, not duplicated
+            for path in glob.glob(os.path.join(self.directory, f"{PARTITION}=*", f"part-{self.run}-*.parquet")):
+                os.remove(path)
+            with self.pa.memory_map(self.staging_path) as source:
+                reader = self.pa.ipc.open_stream(source.read_buffer(staging_bytes))
+                self.pa.dataset.write_dataset(
+                    reader, self.directory, format="parquet",
+                    partitioning=[PARTITION], partitioning_flavor="hive",
+                    basename_template=f"part-{self.run}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                    max_rows_per_group=self.row_group_rows,
+                    min_rows_per_group=self.row_group_rows,
+                    file_visitor=lambda written: _fsync_path(written.path),
+                )
+        if os.path.exists(self.staging_path):
+            os.remove(self.staging_path)
+        self.run = uuid.uuid4().hex[:12]
+        self._write_checkpoint(0)
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._sink.close()
+            self._stream = None
+
+    # -- writing --------------------------------------------------------
+    def write_batch(self, rows, flush=True):
+        """
+        Stage rows whose text was not seen before; returns how many were added.
+        With flush=False rows are buffered until the next flush() (they are
+        rolled back if the process dies first).
+        """
+        added = 0
+        for row in rows:
+            if not self.index.add(row['text']):
+                continue
+            self._buffer.append(row)
+            added += 1
+        self.count += added
+        self.pending_rows += added
+        if added and flush:
+            self.flush()
+        return added
+
+    def flush(self):
+        """fsync one staged record batch, then the index log, then advance the checkpoint."""
+        if self._buffer:
+            if self._stream is None:
+                self._sink = open(self.staging_path, 'wb')
+                self._stream = self.pa.ipc.new_stream(
+                    self._sink, self.schema, options=self.pa.ipc.IpcWriteOptions(compression='zstd'))
+            columns = {name: [row[name] for row in self._buffer] for name in COLUMNS}
+            self._stream.write_batch(self.pa.RecordBatch.from_pydict(columns, schema=self.schema))
+            self._buffer = []
+            self._sink.flush()
+            os.fsync(self._sink.fileno())
+        self.index.flush()
+        self.pending_rows = 0
+        self._write_checkpoint(self._staged_bytes())
+        if self.index.needs_merge():
+            self.index.merge()
+            self._write_checkpoint(self._staged_bytes())
+
+    def _staged_bytes(self):
+        return self._sink.tell() if self._stream is not None else 0
+
+    def compact(self):
+        """End of run: publish the staged rows and fold the index delta into its table."""
+        self.flush()
+        staged = self._staged_bytes()
+        self._close_stream()
+        self.index.merge()
+        self._publish(staged)
+
+    def close(self):
+        """Publish what the last checkpoint covers; rows buffered after it are rolled back."""
+        if self.index is None:
+            return
+        with open(self.ckpt_path) as f:
+            ckpt = json.load(f)
+        self._close_stream()
+        self._buffer = []
+        self.count = ckpt['rows']
+        self.index.truncate_log(ckpt['index_log_bytes'])
+        self._publish(ckpt['staging_bytes'])
+        self.index.close()
+        self.index = None
+
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,180 @@
+"""
+Adaptive, header-driven rate limiter shared by the link collector and the
+comment scraper.
+
+Reddit reports the real budget on every response:
+    X-Ratelimit-Used       requests used in the current window
+    X-Ratelimit-Remaining  requests left in the current window
+    X-Ratelimit-Reset      seconds until the window resets
+The limiter learns these from every response (not only from 429s) and
+spreads the remaining budget evenly over the time left in the window,
+instead of bursting up to a fixed count and then stalling. Before any
+header has been seen it falls back to the configured requests_per_minute.
+
+Callers reserve a send slot and then sleep *outside* any lock, so many
+waiters queue up in order without serializing behind one sleeper.
+
+When several processes share one client budget (sharded crawl), each gets
+`share` of it: the learned window size and remaining budget are scaled by
+that fraction, so together they spend the remaining budget evenly.
+"""
+import asyncio
+import time
+
+
+def _header_float(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+        limiter = AdaptiveRateLimiter(requests_per_minute=10)
+        await limiter.acquire()
+        async with session.get(...) as resp:
+            limiter.update(resp.headers)
+            if resp.status == 429:
+                limiter.penalize(reset_seconds)
+
+    Budget is tracked per rate-limit window. A reservation consumes budget in
+    the window its slot falls into; `out` counts reservations in a window
+    that have not been answered yet, so the server's Remaining header (which
+    only knows about requests it has received) can be corrected for them.
+    """
+
+    def __init__(self, requests_per_minute, window=60.0, reserve=1, share=1.0):
+        self.share = share
+        self.window_limit = requests_per_minute   # learned as (used + remaining) * share
+        self.window = window
+        self.reserve = reserve                    # kept back once real headers are known
+        self.learned = False
+        now = time.monotonic()
+        self.windows = [{'end': now + window, 'left': requests_per_minute, 'out': 0}]
+        self.next_slot = now
+        self.blocked_until = 0.0
+
+    def _current(self, now):
+        """Drop expired windows; return the list starting with the live one."""
+        windows = self.windows
+        while windows and windows[0]['end'] <= now:
+            ended = windows.pop(0)
+            if not windows:
+                # Continue the window grid from where the last one ended
+                end = ended['end']
+                while end <= now:
+                    end += self.window
+                windows.append({'end': end, 'left': self.window_limit, 'out': 0})
+            # Requests still in flight at the boundary reach the server in the new window
+            windows[0]['out'] += ended['out']
+            windows[0]['left'] -= ended['out']
+        return windows
+
+    def _window_for(self, slot):
+        windows = self.windows
+        i = 0
+        while True:
+            if i == len(windows):
+                windows.append({'end': windows[-1]['end'] + self.window, 'left': self.window_limit, 'out': 0})
+            if slot < windows[i]['end']:
+                return windows[i]
+            i += 1
+
+    def _reserve_slot(self):
+        """Pick the send time for one request and account for it -> (wait, window)."""
+        now = time.monotonic()
+        self._current(now)
+        reserve = self.reserve if self.learned else 0
+        slot = max(now, self.next_slot, self.blocked_until)
+        while True:
+            w = self._window_for(slot)
+            budget = w['left'] - reserve
+            if budget > 0:
+                break
+            slot = w['end']   # Window exhausted: first slot of the next one
+        # Spread this window's remaining budget evenly over its remaining time
+        self.next_slot = slot + (w['end'] - slot) / budget
+        w['left'] -= 1
+        w['out'] += 1
+        return slot - now, w
+
+    def _cancel(self, window):
+        """Give back a reservation whose request was never sent."""
+        windows = self._current(time.monotonic())
+        if not any(w is window for w in windows):
+            window = windows[0]   # Its window expired: the reservation moved into the live one
+        window['left'] += 1
+        window['out'] = max(window['out'] - 1, 0)
+
+    async def acquire(self):
+        while True:
+            wait, window = self._reserve_slot()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if time.monotonic() >= self.blocked_until:
+                return
+            self._cancel(window)   # A 429 arrived while we slept: take a new slot
+
+    def acquire_blocking(self):
+        """Same as acquire() for synchronous code."""
+        while True:
+            wait, window = self._reserve_slot()
+            if wait > 0:
+                time.sleep(wait)
+            if time.monotonic() >= self.blocked_until:
+                return
+            self._cancel(window)
+
+    def _settle(self, now):
+        current = self._current(now)[0]
+        current['out'] = max(current['out'] - 1, 0)
+        return current
+
+    def update(self, headers):
+        """Learn the real budget from a response's X-Ratelimit-* headers."""
+        now = time.monotonic()
+        current = self._settle(now)
+        remaining = _header_float(headers, 'X-Ratelimit-Remaining')
+        reset = _header_float(headers, 'X-Ratelimit-Reset')
+        if remaining is None or reset is None:
+            return   # No headers: the reservation already counted against the budget
+        used = _header_float(headers, 'X-Ratelimit-Used')
+        if used is not None:
+            self.window_limit = int((used + remaining) * self.share)
+        self.learned = True
+        current['left'] = remaining * self.share - current['out']
+        current['end'] = now + reset
+        end = current['end']
+        for w in self.windows[1:]:
+            end += self.window
+            w['end'] = end
+        # If the real budget is larger than assumed, let the next request go sooner
+        budget = current['left'] - self.reserve
+        if budget > 0:
+            self.next_slot = max(now, min(self.next_slot, now + reset / budget))
+
+    def release(self):
+        """Settle a reservation whose request never got a response (counted as used)."""
+        self._settle(time.monotonic())
+
+    def penalize(self, seconds):
+        """After a 429: nobody sends again until the window resets."""
+        now = time.monotonic()
+        current = self._current(now)[0]
+        current['left'] = 0
+        current['end'] = now + seconds
+        end = current['end']
+        for w in self.windows[1:]:
+            end += self.window
+            w['end'] = end
+        self.blocked_until = max(self.blocked_until, current['end'])
+        self.next_slot = max(self.next_slot, self.blocked_until)
+
+    @property
+    def requests_per_minute(self):
+        """Current effective rate (what the live window's budget allows)."""
+        now = time.monotonic()
+        current = self._current(now)[0]
+        left = max(current['end'] - now, 1e-3)
+        return max(current['left'], 0) / left * 60
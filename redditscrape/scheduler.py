@@ -0,0 +1,163 @@
+"""
+Yield-aware ordering of pending posts for the comment scraper.
+
+Roman Urdu yield (kept comments per request) differs a lot between
+subreddits, so instead of walking the links file top to bottom the scraper
+asks a YieldScheduler which posts to validate and fetch next:
+
+    scheduler = YieldScheduler(totals=state.yield_totals())
+    scheduler.add_source(state.pending_by_subreddit(), state.next_pending_in)
+    rows = scheduler.take(100)                # next posts to check/fetch
+    scheduler.observe("karachi", kept=14, requests=2)
+
+Each subreddit's yield is estimated as (kept + k * mean) / (requests + k):
+its own history, shrunk towards the mean over all subreddits, so a
+subreddit with little data starts near the average instead of at 0 or at a
+lucky first thread. Posts are then handed out by stride scheduling: every
+subreddit with pending posts advances a "pass" value by 1 / weight per post,
+and the one with the lowest pass goes next. The weight is
+(yield / mean) ** sharpness, so high-yield subreddits get most of the
+requests, but it never drops below `floor`, so every link is still processed
+eventually. Within a subreddit posts keep their links-file order.
+
+Pending posts can be queued as rows (add) or, for crawls too large to hold
+in memory, as per-subreddit counts plus a function that pages rows in on
+demand (add_source), so only `page` rows per subreddit are ever loaded.
+"""
+import re
+from collections import deque
+
+_SUBREDDIT_RE = re.compile(r'/r/([^/]+)/', re.IGNORECASE)
+
+
+def subreddit_of(url):
+    match = _SUBREDDIT_RE.search(url)
+    return match.group(1).lower() if match else ""
+
+
+class PagedQueue:
+    """
+    A subreddit's pending rows, loaded `page` at a time through
+    fetch(subreddit, n, after_seq). len() is the number not yet taken.
+    """
+
+    def __init__(self, sub, count, fetch, page=500):
+        self.sub = sub
+        self.remaining = count
+        self.fetch = fetch
+        self.page = page
+        self.rows = deque()
+        self.after_seq = -1
+
+    def __len__(self):
+        return self.remaining
+
+    def popleft(self):
+        if not self.rows:
+            self.rows.extend(self.fetch(self.sub, self.page, self.after_seq))
+            if not self.rows:
+                # Finished elsewhere in the meantime
+                self.remaining = 0
+                raise IndexError("pop from an empty PagedQueue")
+            self.after_seq = self.rows[-1][2]
+        self.remaining -= 1
+        return self.rows.popleft()
+
+
+class YieldScheduler:
+    def __init__(self, totals=None, prior_requests=20.0, floor=0.05, sharpness=2.0):
+        """`totals`: {subreddit: (posts, kept, requests)} learned by earlier runs."""
+        self.prior_requests = prior_requests
+        self.floor = floor
+        self.sharpness = sharpness
+        self.totals = {sub: list(t) for sub, t in (totals or {}).items()}
+        self.unsaved = {}   # subreddit -> [posts, kept, requests] since the last take_unsaved()
+        self.queues = {}    # subreddit -> deque of pending rows
+        self.passes = {}
+
+    # -- estimates -------------------------------------------------------
+    def mean_yield(self):
+        kept = sum(t[1] for t in self.totals.values())
+        requests = sum(t[2] for t in self.totals.values())
+        return kept / requests if requests else 1.0
+
+    def estimate(self, sub, mean=None):
+        mean = self.mean_yield() if mean is None else mean
+        _, kept, requests = self.totals.get(sub, (0, 0, 0))
+        return (kept + self.prior_requests * mean) / (requests + self.prior_requests)
+
+    def observe(self, sub, kept, requests):
+        """Record one processed post: `kept` comments for `requests` requests."""
+        for table in (self.totals, self.unsaved):
+            t = table.setdefault(sub, [0, 0, 0])
+            t[0] += 1
+            t[1] += kept
+            t[2] += requests
+
+    def take_unsaved(self):
+        """Per-subreddit deltas since the last call, for persisting: {sub: (posts, kept, requests)}."""
+        unsaved, self.unsaved = self.unsaved, {}
+        return {sub: tuple(t) for sub, t in unsaved.items()}
+
+    def snapshot(self):
+        """{subreddit: {'posts', 'kept', 'requests', 'yield', 'pending'}}, highest yield first."""
+        mean = self.mean_yield()
+        subs = set(self.totals) | set(self.queues)
+        rows = {}
+        for sub in subs:
+            posts, kept, requests = self.totals.get(sub, (0, 0, 0))
+            rows[sub] = {'posts': posts, 'kept': kept, 'requests': requests,
+                         'yield': self.estimate(sub, mean), 'pending': len(self.queues.get(sub, ()))}
+        return dict(sorted(rows.items(), key=lambda item: -item[1]['yield']))
+
+    # -- ordering --------------------------------------------------------
+    def _start_pass(self):
+        # Joining (or rejoining) subreddits start at the current pass, not behind it
+        return min((self.passes[sub] for sub in self.queues), default=max(self.passes.values(), default=0.0))
+
+    def add(self, rows):
+        """Queue pending rows (post_id, url, seq, status), in links-file order."""
+        start = self._start_pass()
+        for row in rows:
+            sub = subreddit_of(row[1])
+            if sub not in self.queues:
+                self.queues[sub] = deque()
+                self.passes[sub] = max(self.passes.get(sub, start), start)
+            self.queues[sub].append(row)
+
+    def add_source(self, counts, fetch, page=500):
+        """
+        Queue pending posts without loading them: `counts` is {subreddit:
+        pending posts}, fetch(subreddit, n, after_seq) returns that
+        subreddit's next n rows (post_id, url, seq, status) after seq.
+        """
+        start = self._start_pass()
+        for sub, count in counts.items():
+            if count and sub not in self.queues:
+                self.queues[sub] = PagedQueue(sub, count, fetch, page)
+                self.passes[sub] = max(self.passes.get(sub, start), start)
+
+    def pending(self):
+        return sum(len(q) for q in self.queues.values())
+
+    def weight(self, sub, mean=None):
+        mean = self.mean_yield() if mean is None else mean
+        if mean <= 0:
+            return 1.0
+        return max((self.estimate(sub, mean) / mean) ** self.sharpness, self.floor)
+
+    def take(self, n):
+        """Up to n rows, highest expected yield first (with a floor share for every subreddit)."""
+        mean = self.mean_yield()
+        out = []
+        while len(out) < n and self.queues:
+            sub = min(self.queues, key=self.passes.__getitem__)
+            queue = self.queues[sub]
+            try:
+                out.append(queue.popleft())
+                self.passes[sub] += 1.0 / self.weight(sub, mean)
+            except IndexError:
+                pass
+            if not queue:
+                del self.queues[sub]
+        return out
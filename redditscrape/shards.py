@@ -0,0 +1,162 @@
+"""
+Shard assignment and lease files for running the comment scraper as many
+worker processes, on one machine or on several machines sharing a
+filesystem.
+
+Posts are split into `num_shards` shards by a stable hash of the post ID
+(`shard_of`), so every worker computes the same partition from the same
+links file. A worker owns a shard while it holds that shard's lease.
+
+Leases are plain files, so they work on any shared filesystem that honours
+O_EXCL creation (local disks, NFSv3+, SMB):
+
+    leases/shard-0007.gen-000003   {"worker": ..., "host": ..., "pid": ..., "expires": ...}
+    leases/shard-0007.done
+
+The lease with the highest generation is the current one. Claiming a free or
+expired shard means creating the *next* generation with O_EXCL, which
+exactly one contender can win. The owner renews by rewriting its own
+generation's expiry; if it finds a higher generation it has lost the shard
+(it stalled past the expiry and someone reclaimed it) and must stop. A
+finished shard gets a `.done` marker. Expiry uses wall-clock time, so hosts
+sharing a lease directory need roughly synchronized clocks (NTP).
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import socket
+import time
+
+LEASE_RE = re.compile(r"shard-(\d+)\.gen-(\d+)$")
+
+
+def shard_of(post_id, num_shards):
+    """Stable shard number for a post ID (same on every host and Python run)."""
+    digest = hashlib.blake2b(post_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % num_shards
+
+
+def shard_name(shard):
+    return f"shard-{shard:04d}"
+
+
+class ShardLeases:
+    """
+        leases = ShardLeases("shards/leases", num_shards=64, worker_id="host-a-1")
+        shard = leases.claim()            # None if nothing is claimable right now
+        leases.renew(shard)               # False -> lease lost, stop working on it
+        leases.release(shard, done=True)
+    """
+
+    def __init__(self, directory, num_shards, worker_id=None, ttl=120.0):
+        self.directory = directory
+        self.num_shards = num_shards
+        self.ttl = ttl
+        self.host = socket.gethostname()
+        self.worker_id = worker_id or f"{self.host}-{os.getpid()}"
+        self.held = {}   # shard -> generation
+        os.makedirs(directory, exist_ok=True)
+
+    def _lease_path(self, shard, gen):
+        return os.path.join(self.directory, f"{shard_name(shard)}.gen-{gen:06d}")
+
+    def _done_path(self, shard):
+        return os.path.join(self.directory, f"{shard_name(shard)}.done")
+
+    def _current(self, shard):
+        """(generation, lease dict or None) of the newest lease; (0, None) if never leased."""
+        gens = []
+        for path in glob.glob(os.path.join(self.directory, f"{shard_name(shard)}.gen-*")):
+            match = LEASE_RE.search(os.path.basename(path))
+            if match:
+                gens.append(int(match.group(2)))
+        if not gens:
+            return 0, None
+        gen = max(gens)
+        try:
+            with open(self._lease_path(shard, gen)) as f:
+                return gen, json.load(f)
+        except (OSError, ValueError):
+            # Being created or rewritten right now: treat as live
+            return gen, {'expires': float('inf')}
+
+    def _write(self, path, exclusive):
+        lease = {'worker': self.worker_id, 'host': self.host, 'pid': os.getpid(),
+                 'expires': time.time() + self.ttl}
+        if exclusive:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(lease, f)
+            return
+        tmp = f"{path}.{self.worker_id}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(lease, f)
+        os.replace(tmp, path)
+
+    def is_done(self, shard):
+        return os.path.exists(self._done_path(shard))
+
+    def all_done(self):
+        return all(self.is_done(s) for s in range(self.num_shards))
+
+    def claim(self, prefer=0):
+        """
+        Take the first free or expired shard, scanning from `prefer` so
+        workers spread out instead of racing for shard 0. Returns the shard
+        number, or None if every unfinished shard is held by a live worker.
+        """
+        for i in range(self.num_shards):
+            shard = (prefer + i) % self.num_shards
+            if shard in self.held or self.is_done(shard):
+                continue
+            gen, lease = self._current(shard)
+            if lease is not None and lease['expires'] > time.time():
+                continue
+            try:
+                self._write(self._lease_path(shard, gen + 1), exclusive=True)
+            except FileExistsError:
+                continue   # Another worker won this generation
+            self.held[shard] = gen + 1
+            if self.is_done(shard):
+                # Finished between the check and the claim: expire the lease just written
+                self.release(shard)
+                continue
+            return shard
+        return None
+
+    def renew(self, shard):
+        """Extend our lease; False if it was reclaimed by someone else."""
+        gen = self.held.get(shard)
+        if gen is None:
+            return False
+        current, _ = self._current(shard)
+        if current != gen:
+            self.held.pop(shard, None)
+            return False
+        self._write(self._lease_path(shard, gen), exclusive=False)
+        return True
+
+    def release(self, shard, done=False):
+        """Give the shard up (expire our lease); mark it finished if `done`."""
+        gen = self.held.pop(shard, None)
+        if done:
+            open(self._done_path(shard), 'a').close()
+        if gen is not None and self._current(shard)[0] == gen:
+            tmp = f"{self._lease_path(shard, gen)}.{self.worker_id}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'worker': self.worker_id, 'host': self.host, 'pid': os.getpid(), 'expires': 0}, f)
+            os.replace(tmp, self._lease_path(shard, gen))
+
+    def status(self):
+        """{'done': n, 'leased': n, 'free': n} across all shards."""
+        counts = {'done': 0, 'leased': 0, 'free': 0}
+        now = time.time()
+        for shard in range(self.num_shards):
+            if self.is_done(shard):
+                counts['done'] += 1
+                continue
+            _, lease = self._current(shard)
+            counts['leased' if lease is not None and lease['expires'] > now else 'free'] += 1
+        return counts
@@ -0,0 +1,16 @@
+"""
+English stopword list used by the Roman Urdu filter.
+
+A copy of NLTK's English stopwords (198 words) ships in data/ so the
+scrapers neither import nltk nor download the corpus at startup. The list
+only changes if the file is edited; regenerate it with
+    python -c "from nltk.corpus import stopwords; print('\\n'.join(stopwords.words('english')))"
+"""
+import os
+
+STOPWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "english_stopwords.txt")
+
+
+def english_stopwords():
+    with open(STOPWORDS_FILE, encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
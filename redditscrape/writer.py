@@ -0,0 +1,132 @@
+"""
+Append-only, crash-safe CSV output for scraped comments.
+
+Instead of rebuilding a DataFrame and rewriting the whole file at every
+checkpoint, new rows are appended and deduplicated against a persistent
+DigestIndex (see dedup.py). A tiny checkpoint file (`<output>.ckpt`) records
+how many bytes of the CSV and of the index log were fsynced at the last
+flush; on reopen anything written after it (a half-written batch from a
+crash) is rolled back. Checkpoint cost is therefore proportional to the
+batch, not to the corpus, and earlier output is never reloaded.
+"""
+import csv
+import json
+import os
+
+from .dedup import DigestIndex, MERGE_THRESHOLD
+
+
+def _atomic_write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class StreamingCSVWriter:
+    """
+    Append-only single-column CSV writer with on-disk dedup.
+
+        writer = StreamingCSVWriter("commentsScrape1.csv", "comment_hashes.idx")
+        writer.write_batch(texts)   # appends unseen rows, then flushes
+        writer.compact()            # once, at the end of the run
+        writer.close()
+
+    Output accumulates across runs: a comment already recorded in the index
+    (by this or any other run sharing it) is never written again.
+    """
+
+    def __init__(self, path, index_path, column="text", merge_threshold=MERGE_THRESHOLD):
+        self.path = path
+        self.column = column
+        self.ckpt_path = path + ".ckpt"
+        self.index = DigestIndex(index_path, merge_threshold)
+        self.pending_rows = 0
+        self._recover()
+        self._csv_file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._csv = csv.writer(self._csv_file)
+        if self._csv_file.tell() == 0:
+            self._csv.writerow([self.column])
+            self.flush()
+
+    # -- startup --------------------------------------------------------
+    def _recover(self):
+        """Roll the CSV and index log back to the last checkpoint, or index a legacy CSV."""
+        try:
+            with open(self.ckpt_path) as f:
+                ckpt = json.load(f)
+        except (OSError, ValueError):
+            ckpt = None
+
+        if ckpt is not None and os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(ckpt['csv_bytes'])
+            self.index.truncate_log(ckpt['index_log_bytes'])
+            self.count = ckpt['rows']
+            return
+
+        # No checkpoint yet: register an existing CSV in the index once.
+        self.count = 0
+        if os.path.exists(self.path):
+            with open(self.path, newline='', encoding='utf-8') as src:
+                reader = csv.reader(src)
+                header = next(reader, None)
+                col = header.index(self.column) if header and self.column in header else 0
+                for row in reader:
+                    if len(row) > col and row[col]:
+                        self.index.add(row[col])
+                        self.count += 1
+            self.index.merge()
+            self._write_checkpoint(os.path.getsize(self.path))
+
+    def _write_checkpoint(self, csv_bytes):
+        _atomic_write_json(self.ckpt_path, {
+            'csv_bytes': csv_bytes,
+            'index_log_bytes': self.index.log_size(),
+            'rows': self.count,
+        })
+
+    # -- writing --------------------------------------------------------
+    def write_batch(self, texts, flush=True):
+        """
+        Append texts not seen before; returns how many rows were added.
+        With flush=False rows are buffered until the next flush() (they are
+        rolled back if the process dies first).
+        """
+        added = 0
+        for text in texts:
+            if not self.index.add(text):
+                continue
+            self._csv.writerow([text])
+            added += 1
+        self.count += added
+        self.pending_rows += added
+        if added and flush:
+            self.flush()
+        return added
+
+    def flush(self):
+        """fsync the CSV, then the index log, then atomically advance the checkpoint."""
+        self._csv_file.flush()
+        os.fsync(self._csv_file.fileno())
+        self.index.flush()
+        self.pending_rows = 0
+        csv_bytes = os.fstat(self._csv_file.fileno()).st_size
+        self._write_checkpoint(csv_bytes)
+        if self.index.needs_merge():
+            # Merge only right after a checkpoint, then checkpoint the empty log
+            self.index.merge()
+            self._write_checkpoint(csv_bytes)
+
+    def compact(self):
+        """End of run: fold the index delta into its sorted table."""
+        self.flush()
+        self.index.merge()
+        self._write_checkpoint(os.fstat(self._csv_file.fileno()).st_size)
+
+    def close(self):
+        if not self._csv_file.closed:
+            self._csv_file.close()
+        self.index.close()
@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pytest
+
+from redditscrape.cli import load_script
+
+BODIES = [
+    "yaar main kal office nahi aa sakta hun, tabiyat theek nahi",
+    "This is a perfectly ordinary English comment about the match",
+    "",
+    "یار یہ تو بہت اچھی بات ہے",
+    "acha",
+    "bhai ye policy bilkul bekaar hai, koi faida nahi hoga",
+    "Je ne suis pas d'accord avec toi sur ce point",
+    "mujhe lagta hai ke hum sab ko mil kar kaam karna chahiye",
+    "lol same",
+    "kya baat hai, bohat khoob likha aap ne",
+]
+
+
+def records_for(bodies):
+    return [{'id': f"c{i}", 'link_id': "t3_p1", 'subreddit': "Pakistan", 'score': i,
+             'created_utc': 1_700_000_000 + i, 'body': body} for i, body in enumerate(bodies)]
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    module = load_script('comments')
+    # Keyword tiers only: deterministic and no model download; the process
+    # workers get the setting through the pool initializer
+    monkeypatch.setattr(module, 'FASTTEXT_AVAILABLE', False)
+    return module
+
+
+def run_stage(scraper, mode, bodies, records=None):
+    async def go():
+        stage = scraper.ClassificationStage(mode=mode, workers=2, chunk_size=7, max_pending=2)
+        try:
+            return await stage.classify(bodies, records)
+        finally:
+            stage.close()
+    return asyncio.run(go())
+
+
+def test_executors_keep_the_same_comments_in_the_same_order(scraper):
+    bodies = [f"{body} {i // len(BODIES)}" if body else body for i, body in enumerate(BODIES * 5)]
+    expected = scraper.filter_comment_bodies(bodies)
+    assert expected and len(expected) < len(bodies)
+    for mode in ("inline", "thread", "process"):
+        assert run_stage(scraper, mode, bodies) == expected, mode
+
+
+def test_executors_map_records_to_the_same_rows(scraper):
+    bodies = BODIES * 3
+    records = records_for(bodies)
+    expected = scraper.filter_comment_records(records)
+    assert {row['comment_id'] for row in expected} < {r['id'] for r in records}
+    for mode in ("inline", "thread", "process"):
+        rows = run_stage(scraper, mode, bodies, records)
+        assert rows == expected, mode
+        for row in rows:
+            # Each row comes from the record at its body's position, across chunk boundaries
+            assert records[int(row['comment_id'][1:])]['body'].replace("\n", " ").strip() == row['text']
+
+
+def test_set_override_reaches_the_scorer_and_the_workers(scraper, monkeypatch):
+    from redditscrape import cli
+
+    bodies = ["the durian sandwich was quite excellent today"] * 3
+    assert scraper.filter_comment_bodies(bodies) == []
+    # Restored on teardown, like the other patched settings
+    monkeypatch.setattr(scraper, 'URDU_BIGRAMS', scraper.URDU_BIGRAMS)
+    monkeypatch.setattr(scraper, 'ROMAN_URDU_SCORER', scraper.ROMAN_URDU_SCORER)
+    monkeypatch.setattr(scraper, 'main', lambda: None)
+    assert cli.main(['comments', '--set', "URDU_BIGRAMS={'durian sandwich', 'quite excellent'}"]) == 0
+    assert scraper.filter_comment_bodies(bodies) == bodies
+    assert run_stage(scraper, "thread", bodies) == bodies
+    # Spawned workers (the Windows/macOS default) re-import the module, so they
+    # only see the override through the pool initializer
+    spawn = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(scraper, 'ProcessPoolExecutor', partial(ProcessPoolExecutor, mp_context=spawn))
+    assert run_stage(scraper, "process", bodies) == bodies
@@ -0,0 +1,91 @@
+from redditscrape.crawlstate import CrawlState, FAILED, FETCHED, MISSING, PENDING, VALIDATED
+
+
+def url(sub, post_id):
+    return f"https://www.reddit.com/r/{sub}/comments/{post_id}/title/"
+
+
+LINKS = [url("pakistan", "a1"), url("karachi", "b2"), url("pakistan", "c3"), url("lahore", "d4")]
+
+
+def pending_ids(state):
+    return [row[0] for row in state.next_pending(100)]
+
+
+def test_resume_continues_with_unfinished_posts(tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    state = CrawlState(path)
+    assert state.sync_links(LINKS) == 4
+    state.mark("b2", VALIDATED)
+    state.mark_results([("a1", FETCHED, 12, 3), ("c3", MISSING, 0, 0)],
+                       [("a1", 12, ["k1", "k2", "zz9"])])
+    state.close()
+
+    state = CrawlState(path)
+    # Validated but not fetched counts as unfinished, in link-file order
+    assert state.next_pending(100) == [("b2", LINKS[1], 1, VALIDATED), ("d4", LINKS[3], 3, PENDING)]
+    assert state.remaining() == 2
+    assert state.comment_ids("a1") == {"k1", "k2", "zz9"}
+    assert state.comment_ids("b2") is None
+    assert state.known_counts(["a1", "b2"]) == {"a1": 12}
+    assert state.counts() == {FETCHED: 1, MISSING: 1, VALIDATED: 1, PENDING: 1}
+    state.close()
+
+
+def test_reordered_links_file_only_adds_new_posts(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.sqlite"))
+    state.sync_links(LINKS)
+    state.mark("a1", FETCHED)
+    assert state.sync_links([LINKS[3], url("pakistan", "e5"), LINKS[0]]) == 1
+    assert pending_ids(state) == ["b2", "c3", "d4", "e5"]
+    # Paging forward from a seq, and per subreddit
+    assert [row[0] for row in state.next_pending(2, after_seq=1)] == ["c3", "d4"]
+    assert [row[0] for row in state.next_pending_in("pakistan", 10)] == ["c3", "e5"]
+    assert state.pending_by_subreddit() == {"pakistan": 2, "karachi": 1, "lahore": 1}
+    state.close()
+
+
+def test_failed_posts_are_retried_until_max_attempts(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.sqlite"), max_attempts=2)
+    state.sync_links(LINKS[:1])
+    for expected in (1, 0):
+        state.mark("a1", FAILED)
+        assert state.requeue_failed() == expected
+    assert state.counts() == {FAILED: 1}
+    state.close()
+
+
+def test_stale_fetched_posts_are_requeued(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.sqlite"))
+    state.sync_links(LINKS[:2])
+    state.mark_results([("a1", FETCHED, 5, 1), ("b2", FETCHED, 5, 1)])
+    assert state.requeue_stale(max_age=3600) == 0
+    assert state.requeue_stale(max_age=-1) == 2
+    assert pending_ids(state) == ["a1", "b2"]
+    state.close()
+
+
+def test_finished_post_survives_a_crash_with_its_rows(tmp_path):
+    from redditscrape.cli import load_script
+    from redditscrape.writer import StreamingCSVWriter
+
+    scraper = load_script('comments')
+    out, idx, db = str(tmp_path / "comments.csv"), str(tmp_path / "comments.idx"), str(tmp_path / "crawl.sqlite")
+    state = CrawlState(db)
+    state.sync_links(LINKS[:2])
+    writer = StreamingCSVWriter(out, idx)
+    checkpointer = scraper.Checkpointer(writer, state)
+    checkpointer.record("a1", FETCHED, ["yaar ye to kamal hai", "bohat acha laga"], 2,
+                        thread=(2, {"k1", "k2"}))
+    # Crash: nothing is flushed or closed after record()
+    writer._csv_file.close()
+    writer.index._log.close()
+    state.close()
+
+    state = CrawlState(db)
+    assert pending_ids(state) == ["b2"]
+    assert state.comment_ids("a1") == {"k1", "k2"}
+    writer = StreamingCSVWriter(out, idx)
+    assert writer.count == 2
+    writer.close()
+    state.close()
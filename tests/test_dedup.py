@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+
+from redditscrape.dedup import DIGEST_DTYPE, CommentIdIndex, DigestIndex, snapshot_index, text_digest
+
+
+def abandon(index):
+    """Close the log as a crash would leave it: flushed, never merged."""
+    index.flush()
+    index._log.close()
+
+
+def test_merge_writes_a_sorted_table_and_empties_the_log(tmp_path):
+    path = str(tmp_path / "hashes.idx")
+    index = DigestIndex(path, merge_threshold=3)
+    texts = [f"comment number {i}" for i in range(10)]
+    for text in texts[:5]:
+        assert index.add(text)
+    assert index.needs_merge()
+    index.merge()
+    for text in texts[5:]:
+        index.add(text)
+    index.merge()
+
+    table = np.fromfile(path, dtype=DIGEST_DTYPE)
+    assert list(table) == sorted(text_digest(t) for t in texts)
+    assert os.path.getsize(path + ".log") == 0
+    assert len(index) == 10
+    assert not index.add(texts[0]) and not index.add(texts[9])
+    index.close()
+
+
+def test_log_is_replayed_on_reopen(tmp_path):
+    path = str(tmp_path / "hashes.idx")
+    index = DigestIndex(path)
+    index.add("merged earlier")
+    index.merge()
+    index.add("only in the log")
+    index.add("Only  IN the LOG")   # same text once normalized
+    abandon(index)
+
+    index = DigestIndex(path)
+    assert len(index) == 2
+    assert "merged earlier" in index and "only in the log" in index
+    assert not index.add("only in the log")
+    index.close()
+
+
+def test_truncate_log_forgets_entries_past_the_checkpoint(tmp_path):
+    path = str(tmp_path / "hashes.idx")
+    index = DigestIndex(path)
+    index.add("kept")
+    checkpoint = index.log_size()
+    index.add("rolled back")
+    index.truncate_log(checkpoint)
+    assert "kept" in index and "rolled back" not in index
+    index.close()
+
+
+def test_snapshot_copies_table_and_log_and_drops_a_torn_record(tmp_path):
+    src, dst = str(tmp_path / "ids.gen-000001.idx"), str(tmp_path / "ids.gen-000002.idx")
+    index = CommentIdIndex(src)
+    index.add_many(["k1", "k2"])
+    index.merge()
+    index.add("k3")
+    abandon(index)
+    with open(src + ".log", 'ab') as f:
+        f.write(b"\x01\x02\x03")   # half-written record at the end
+
+    snapshot_index(src, dst)
+    copy = CommentIdIndex(dst)
+    assert all(cid in copy for cid in ("k1", "k2", "k3"))
+    assert "k4" not in copy
+    assert os.path.getsize(dst + ".log") % 8 == 0
+    # The copy is independent of the source
+    copy.add("k4")
+    copy.close()
+    source = CommentIdIndex(src)
+    assert "k4" not in source
+    source.close()
@@ -0,0 +1,82 @@
+import pytest
+
+from redditscrape.cli import load_script
+from redditscrape.writer import StreamingCSVWriter
+
+
+class FakeClient:
+    """Answers listing requests from a script: (status, data) tuples or exceptions, in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.afters = []
+
+    def get_json(self, url, params=None, endpoint="listing", stats=None):
+        self.afters.append((params or {}).get('after'))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        status, data = response
+        return status, data, {}
+
+
+def page(ids, after):
+    children = [{'kind': 't3', 'data': {'id': pid, 'permalink': f"/r/pakistan/comments/{pid}/title/",
+                                        'created_utc': 1_700_000_000 + int(pid, 36)}} for pid in ids]
+    return 200, {'data': {'children': children, 'after': after}}
+
+
+@pytest.fixture
+def links(tmp_path, monkeypatch):
+    module = load_script('links')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(module, 'high_water', {"pakistan/new": {'newest_id': "a0", 'finished': 1.0}})
+    store = StreamingCSVWriter(str(tmp_path / "links.csv"), str(tmp_path / "links.idx"), column="url")
+    yield module, store
+    store.close()
+
+
+@pytest.mark.parametrize("failure", [ConnectionError("reset"), (503, None)])
+def test_failed_page_does_not_advance_the_high_water_mark(links, failure):
+    module, store = links
+    cursors = {}
+    client = FakeClient([page(["z9", "z8"], "t3_z8"), failure])
+    assert module.scrape_subreddit(client, "pakistan", "new", store, cursors, []) == 2
+    assert module.high_water["pakistan/new"] == {'newest_id': "a0", 'finished': 1.0}
+    assert cursors["pakistan/new"]['done'] is False
+
+
+def test_listing_end_advances_the_high_water_mark(links):
+    module, store = links
+    cursors = {}
+    client = FakeClient([page(["z9", "z8"], "t3_z8"), page(["z7", "a0", "9z"], "t3_9z")])
+    assert module.scrape_subreddit(client, "pakistan", "new", store, cursors, []) == 3
+    mark = module.high_water["pakistan/new"]
+    assert mark['newest_id'] == "z9" and mark['finished'] > 1.0
+    assert cursors["pakistan/new"]['done'] is True
+
+
+def test_failed_sort_resumes_from_its_saved_page(links):
+    module, store = links
+    cursors = {}
+    client = FakeClient([page(["z9", "z8"], "t3_z8"), ConnectionError("reset")])
+    module.scrape_subreddit(client, "pakistan", "new", store, cursors, [])
+    saved = module.load_progress()['cursors']["pakistan/new"]
+    assert (saved['after'], saved['pages'], saved['done']) == ("t3_z8", 1, False)
+
+    # Next run: the progress file's cursor picks up at the page that failed
+    cursors = module.load_progress()['cursors']
+    client = FakeClient([page(["z7", "a0"], "t3_a0")])
+    assert module.scrape_subreddit(client, "pakistan", "new", store, cursors, []) == 1
+    assert client.afters == ["t3_z8"]
+    assert module.high_water["pakistan/new"]['newest_id'] == "z9"
+    assert cursors["pakistan/new"]['done'] is True
+
+
+def test_failed_sort_is_not_held_back_by_its_refresh_interval(links):
+    module, store = links
+    cursors = {}
+    module.scrape_subreddit(FakeClient([(500, None)]), "pakistan", "top", store, cursors, [])
+    assert 'finished' not in module.high_water.get("pakistan/top", {})
+    assert module.sort_due("pakistan", "top")
+    assert not cursors["pakistan/top"]['done']
@@ -0,0 +1,42 @@
+import json
+
+from redditscrape.httpcache import ResponseCache
+from redditscrape.httpclient import SyncClient
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self.content = json.dumps(body).encode()
+
+
+def client_answering(tmp_path, monkeypatch, answers):
+    client = SyncClient({}, cache=ResponseCache(str(tmp_path / "cache.sqlite")))
+    sent = []
+
+    def get(url, params=None, timeout=None):
+        sent.append(url)
+        return FakeResponse(answers[len(sent) - 1])
+
+    monkeypatch.setattr(client.session, 'get', get)
+    return client, sent
+
+
+def test_thread_responses_are_replayed_from_the_cache(tmp_path, monkeypatch):
+    client, sent = client_answering(tmp_path, monkeypatch, [{'n': 1}])
+    url = "https://www.reddit.com/r/pakistan/comments/a1/title.json"
+    assert client.get_json(url, endpoint="thread")[1] == {'n': 1}
+    assert client.get_json(url, endpoint="thread")[1] == {'n': 1}
+    assert len(sent) == 1
+    client.close()
+
+
+def test_info_checks_always_reach_the_network(tmp_path, monkeypatch):
+    # num_comments changed between the two checks: a cached answer would hide it
+    client, sent = client_answering(tmp_path, monkeypatch, [{'num_comments': 5}, {'num_comments': 9}])
+    url = "https://api.reddit.com/api/info?id=t3_a1"
+    assert client.get_json(url, endpoint="info")[1] == {'num_comments': 5}
+    assert client.get_json(url, endpoint="info")[1] == {'num_comments': 9}
+    assert len(sent) == 2 and client.cache.get(url) is None
+    client.close()
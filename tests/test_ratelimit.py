@@ -0,0 +1,41 @@
+from redditscrape import ratelimit
+from redditscrape.ratelimit import AdaptiveRateLimiter
+
+
+class FakeClock:
+    """time.monotonic/time.sleep for the limiter; `during_sleep` runs once per sleep before waking."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.during_sleep = None
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if self.during_sleep is not None:
+            self.during_sleep()
+        self.now += seconds
+
+
+def test_reservation_abandoned_for_a_429_is_given_back(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    limiter = AdaptiveRateLimiter(requests_per_minute=2)
+    for _ in range(2):
+        limiter.acquire_blocking()
+        limiter.release()
+    # The first window is spent, so the next caller sleeps towards a slot in the second one
+    assert limiter.windows[0]['left'] == 0
+
+    def answer_429():
+        clock.during_sleep = None
+        limiter.penalize(90)
+    clock.during_sleep = answer_429
+    limiter.acquire_blocking()
+
+    # Only the request that is actually sent counts against the window after
+    # the block; the slot abandoned for the 429 is given back
+    live = limiter._current(clock.now)[0]
+    assert clock.now >= limiter.blocked_until
+    assert (live['left'], live['out']) == (limiter.window_limit - 1, 1)
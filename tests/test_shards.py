@@ -0,0 +1,61 @@
+import json
+import os
+
+from redditscrape.shards import ShardLeases, shard_of
+
+
+def test_shard_of_is_stable_and_in_range():
+    assert shard_of("1abcde", 64) == shard_of("1abcde", 64)
+    assert {shard_of(f"post{i}", 8) for i in range(500)} == set(range(8))
+
+
+def test_live_lease_is_not_claimed_twice(tmp_path):
+    a = ShardLeases(str(tmp_path), num_shards=2, worker_id="a")
+    b = ShardLeases(str(tmp_path), num_shards=2, worker_id="b")
+    assert a.claim() == 0
+    assert b.claim() == 1
+    assert b.claim() is None
+    assert a.renew(0)
+    assert a.status() == {'done': 0, 'leased': 2, 'free': 0}
+
+
+def test_expired_lease_is_taken_over_and_the_old_owner_stops(tmp_path):
+    old = ShardLeases(str(tmp_path), num_shards=1, worker_id="old", ttl=0)
+    new = ShardLeases(str(tmp_path), num_shards=1, worker_id="new")
+    assert old.claim() == 0 and old.held == {0: 1}
+    # ttl=0: the lease expired as soon as it was written
+    assert new.claim() == 0 and new.held == {0: 2}
+    assert os.path.exists(os.path.join(str(tmp_path), "shard-0000.gen-000002"))
+    assert not old.renew(0)
+    assert old.held == {}
+    # Releasing a lost lease must not touch the new owner's generation
+    old.release(0)
+    assert new.renew(0)
+
+
+def test_done_shard_is_never_claimed_again(tmp_path):
+    a = ShardLeases(str(tmp_path), num_shards=1, worker_id="a")
+    b = ShardLeases(str(tmp_path), num_shards=1, worker_id="b")
+    assert a.claim() == 0
+    a.release(0, done=True)
+    assert a.all_done()
+    assert b.claim() is None
+    assert b.status() == {'done': 1, 'leased': 0, 'free': 0}
+
+
+def test_released_shard_can_be_claimed_at_once(tmp_path):
+    a = ShardLeases(str(tmp_path), num_shards=1, worker_id="a")
+    b = ShardLeases(str(tmp_path), num_shards=1, worker_id="b")
+    assert a.claim() == 0
+    a.release(0)
+    assert b.claim() == 0 and b.held == {0: 2}
+
+
+def test_claim_expires_its_lease_if_the_shard_finished_meanwhile(tmp_path, monkeypatch):
+    leases = ShardLeases(str(tmp_path), num_shards=1, worker_id="a")
+    answers = iter([False, True])   # not done at the check, done right after the claim
+    monkeypatch.setattr(leases, 'is_done', lambda shard: next(answers, True))
+    assert leases.claim() is None
+    assert leases.held == {}
+    with open(os.path.join(str(tmp_path), "shard-0000.gen-000001")) as f:
+        assert json.load(f)['expires'] == 0
@@ -0,0 +1,55 @@
+import csv
+
+from redditscrape.writer import StreamingCSVWriter
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def crash(writer):
+    """Let buffered rows reach the files, then drop the writer without a checkpoint."""
+    writer._csv_file.flush()
+    writer._csv_file.close()
+    writer.index._log.flush()
+    writer.index._log.close()
+
+
+def test_unflushed_rows_are_rolled_back_on_reopen(tmp_path):
+    out, idx = str(tmp_path / "comments.csv"), str(tmp_path / "comments.idx")
+    writer = StreamingCSVWriter(out, idx)
+    assert writer.write_batch(["yaar kya haal hai", "bohat acha laga"]) == 2
+    assert writer.write_batch(["ye to kamal ho gaya", "phir milte hain"], flush=False) == 2
+    crash(writer)
+    assert len(read_rows(out)) == 5   # header + 4: the unflushed rows did reach the file
+
+    writer = StreamingCSVWriter(out, idx)
+    assert writer.count == 2
+    assert read_rows(out) == [["text"], ["yaar kya haal hai"], ["bohat acha laga"]]
+    # The rolled-back rows are not in the index any more, so they can be written again
+    assert writer.write_batch(["ye to kamal ho gaya", "yaar kya haal hai"]) == 1
+    writer.close()
+    assert read_rows(out)[-1] == ["ye to kamal ho gaya"]
+
+
+def test_dedup_survives_restart_and_merge(tmp_path):
+    out, idx = str(tmp_path / "comments.csv"), str(tmp_path / "comments.idx")
+    writer = StreamingCSVWriter(out, idx, merge_threshold=2)
+    assert writer.write_batch(["ek", "do", "teen"]) == 3
+    writer.compact()
+    writer.close()
+
+    writer = StreamingCSVWriter(out, idx, merge_threshold=2)
+    assert writer.write_batch(["EK", "  do ", "char"]) == 1
+    writer.close()
+    assert [r[0] for r in read_rows(out)] == ["text", "ek", "do", "teen", "char"]
+
+
+def test_existing_csv_without_checkpoint_is_indexed(tmp_path):
+    out, idx = tmp_path / "comments.csv", str(tmp_path / "comments.idx")
+    out.write_text("text\nmain theek hun\nap kaise ho\n", encoding='utf-8')
+    writer = StreamingCSVWriter(str(out), idx)
+    assert writer.count == 2
+    assert writer.write_batch(["ap kaise ho", "sab khairiyat"]) == 1
+    writer.close()